@@ -0,0 +1,97 @@
+import os
+import pandas as pd
+from common.charts import interval_bar_chart, hist_chart, heatmap_chart
+from common.pipeline import Pipeline
+from titanic_features import TitanicFeatures
+from titanic_cube import SurvivalCube
+
+# =========================
+# Titanic survival analysis as pipeline stages (run it with Titanic.py)
+# The fill values and category codes are fitted once (clean) and applied in
+# one pass (features) by titanic_features.py; aggregate saves them as
+# titanic_features.json, so test.csv or a bigger file can be transformed the
+# same way (python titanic_features.py transform ...).
+# Survival rates come from a SurvivalCube (titanic_cube.py): survivors and
+# passengers per Pclass x Sex x Embarked x age group from one groupby. The
+# printed rates and the bar charts are rolled up from its cells, with Wilson
+# 95% intervals. It's saved as survival_cube.csv.
+# =========================
+
+def load(_, ctx):
+    df = pd.read_csv(ctx.input)
+
+    # First look at the data
+    print(df.head())
+    print(df.info())
+    print(df.describe())
+
+    # Check missing values
+    print(df.isnull().sum())
+    return df
+
+
+def clean(df, ctx):
+    # Learn the fill values (Age/Fare median, Embarked mode) and the category
+    # codes once; kept on ctx for features and aggregate
+    ctx.feature_stats = TitanicFeatures().fit(df).stats
+    return df
+
+
+def features(df, ctx):
+    # One pass: fill missing values, Sex (male=0, female=1) and Embarked (S=0, C=1, Q=2)
+    # to uint8 codes, drop Cabin (too many missing values), compact dtypes
+    return TitanicFeatures(ctx.feature_stats).transform(df)
+
+
+def aggregate(df, ctx):
+    os.makedirs(ctx.out_dir, exist_ok=True)
+    TitanicFeatures(ctx.feature_stats).save(os.path.join(ctx.out_dir, "titanic_features.json"))
+
+    # One pass over the passengers; every rate below is a roll-up of the cube's cells
+    cube = SurvivalCube.build(df)
+    cube.save(os.path.join(ctx.out_dir, "survival_cube.csv"))
+
+    # Overall survival rate
+    print("Overall survival rate:", cube.rates()["rate"].iloc[0])
+
+    # Survival by gender
+    print(cube.rates(["Sex"]))
+
+    # Survival by class
+    print(cube.rates(["Pclass"]))
+
+    # Survival by gender and class
+    print(cube.rates(["Pclass", "Sex"]))
+
+    # Correlation of the numeric columns only
+    return {"passengers": df, "cube": cube, "corr": df.select_dtypes(include=["number"]).corr()}
+
+
+def render(data, ctx):
+    df, cube = data["passengers"], data["cube"]
+
+    # Survival by gender / passenger class / age group (rate with Wilson 95% CI, from the cube)
+    for by, path, title in [("Sex", "survival_by_gender.png", "Survival Rate by Gender"),
+                            ("Pclass", "survival_by_class.png", "Survival Rate by Class"),
+                            ("AgeGroup", "survival_by_age_group.png", "Survival Rate by Age Group")]:
+        r = cube.rates([by])
+        ctx.charts.submit(interval_bar_chart(r["rate"], r["lo"], r["hi"], path,
+                                             title=title, xlabel=by, ylabel="Survived"))
+
+    # Age distribution by survival
+    ctx.charts.submit(hist_chart([(df.loc[df["Survived"] == 1, "Age"], {"color": "green", "label": "Survived"}),
+                                  (df.loc[df["Survived"] == 0, "Age"], {"color": "red", "label": "Not Survived"})],
+                                 "age_by_survival.png", bins=30, kde=True,
+                                 title="Age Distribution by Survival", xlabel="Age", ylabel="Count"))
+
+    # Correlation heatmap
+    ctx.charts.submit(heatmap_chart(data["corr"], "correlation_heatmap.png", figsize=(10, 6),
+                                    title="Correlation Heatmap"))
+    return data
+
+
+PIPELINE = Pipeline(
+    "titanic",
+    [("load", load), ("clean", clean), ("features", features), ("aggregate", aggregate), ("render", render)],
+    args=[(("input",), {"help": "Kaggle Titanic train.csv"})],
+)
@@ -0,0 +1,169 @@
+import time
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Mergeable quantile sketches for RFM scoring on very large customer bases
+# Build one sketch per partition (file, chunk, worker), merge them, read the
+# quartile/decile cut points off the merged sketch and score every partition
+# with a single searchsorted pass - no global sort, no qcut.
+#
+# KLLSketch   approximate, O(k log n) memory, rank error ~ eps
+# ExactSketch same interface, keeps every value (exact-mode fallback)
+# Sketches that get merged must not share a random stream: with the same seed
+# they keep the same (odd or even) half at every compaction and the errors add
+# up instead of cancelling, so rfm_cut_points spawns one child seed per sketch.
+# -----------------------------
+
+def k_for_eps(eps):
+    # Empirical KLL error curve (normalized rank error ~ 2.296 / k^0.9723)
+    return max(int(np.ceil((2.296 / eps) ** (1 / 0.9723))), 8)
+
+
+class KLLSketch:
+    # seed: int, np.random.SeedSequence (e.g. one of SeedSequence(s).spawn(n)) or None
+    def __init__(self, eps=0.01, k=None, seed=None):
+        self.k = k or k_for_eps(eps)
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                m = len(level) - len(level) % 2       # compact an even number of items
+                promoted = level[self.rng.integers(2):m:2]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                self.levels[h] = level[m:]
+            h += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64").ravel()
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        # feed big batches in slices so level 0 never holds more than a few k items
+        step = max(self.k * 8, 1)
+        for i in range(0, len(values), step):
+            self.levels[0] = np.concatenate([self.levels[0], values[i:i + step]])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(l), 2.0 ** h) for h, l in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        values, cum = self._weighted()
+        if len(values) == 0:
+            return np.full(len(qs), np.nan)
+        idx = np.searchsorted(cum, np.asarray(qs) * cum[-1], side="left")
+        return values[np.minimum(idx, len(values) - 1)]
+
+
+class ExactSketch:
+    """Exact fallback: keeps all values; quantiles match Series.quantile / qcut edges."""
+
+    def __init__(self, **_):
+        self.parts = []
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64").ravel()
+        self.parts.append(values[~np.isnan(values)])
+        return self
+
+    def merge(self, other):
+        self.parts.extend(other.parts)
+        return self
+
+    @property
+    def n(self):
+        return sum(len(p) for p in self.parts)
+
+    def quantiles(self, qs):
+        values = np.concatenate(self.parts) if self.parts else np.empty(0)
+        return np.quantile(values, qs) if len(values) else np.full(len(qs), np.nan)
+
+
+def bin_scores(values, cuts, labels):
+    """Assign labels by cut points with qcut's right-closed bins: (c[i-1], c[i]].
+    Like qcut, returns an ordered Categorical of the labels; missing values stay missing."""
+    values = np.asarray(values, dtype="float64")
+    codes = np.searchsorted(np.asarray(cuts), values, side="left")
+    codes[np.isnan(values)] = -1
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+RFM_LABELS = {"Recency": [4, 3, 2, 1], "Frequency": [1, 2, 3, 4], "Monetary": [1, 2, 3, 4]}
+
+
+def rfm_cut_points(partitions, n_bins=4, exact=False, eps=0.01, seed=None):
+    """Merge per-partition sketches of each RFM metric; returns {metric: inner cut points}."""
+    make = ExactSketch if exact else KLLSketch
+    qs = np.arange(1, n_bins) / n_bins
+    seeds = np.random.SeedSequence(seed)
+    sketches = {}
+    for part in partitions:
+        for metric in RFM_LABELS:
+            sk = make(eps=eps, seed=seeds.spawn(1)[0]).update(part[metric].to_numpy())
+            sketches[metric] = sketches[metric].merge(sk) if metric in sketches else sk
+    return {metric: sk.quantiles(qs) for metric, sk in sketches.items()}
+
+
+# -----------------------------
+# Accuracy / throughput vs qcut: python quantile_sketch.py [customers] [partitions]
+# -----------------------------
+def _bench(n_customers=5_000_000, n_parts=10, eps=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    rfm = pd.DataFrame({
+        "Recency": rng.integers(1, 374, n_customers),
+        "Frequency": rng.geometric(0.05, n_customers),
+        "Monetary": rng.lognormal(6, 1.2, n_customers).round(2),
+    })
+    bounds = np.linspace(0, n_customers, n_parts + 1).astype(int)
+    parts = [rfm.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    t0 = time.perf_counter()
+    exact = pd.qcut(rfm["Monetary"], 4, labels=[1, 2, 3, 4]).to_numpy()
+    t_qcut = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    seeds = np.random.SeedSequence(seed).spawn(n_parts + 1)
+    sk = KLLSketch(eps=eps, seed=seeds[0])
+    for p, part_seed in zip(parts, seeds[1:]):
+        sk.merge(KLLSketch(eps=eps, seed=part_seed).update(p["Monetary"].to_numpy()))
+    cuts = sk.quantiles([0.25, 0.5, 0.75])
+    approx = np.concatenate([bin_scores(p["Monetary"], cuts, [1, 2, 3, 4]).codes + 1 for p in parts])
+    t_sketch = time.perf_counter() - t0
+
+    sorted_m = np.sort(rfm["Monetary"].to_numpy())
+    rank_err = np.abs(np.searchsorted(sorted_m, cuts, side="right") / n_customers - [0.25, 0.5, 0.75]).max()
+    agree = (approx == exact.astype(int)).mean()
+    print(f"customers={n_customers:,} partitions={n_parts} k={sk.k}  qcut={t_qcut:.2f}s  "
+          f"sketch+score={t_sketch:.2f}s  max rank error={rank_err:.4f} (eps={eps})  "
+          f"same score={agree:.2%}")
+
+
+if __name__ == "__main__":
+    import sys
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000,
+           int(sys.argv[2]) if len(sys.argv) > 2 else 10)
@@ -0,0 +1,205 @@
+import pandas as pd
+import os
+from common.charts import hist_chart, heatmap_chart, line_chart
+from common.dedup import DEDUP_ARGS, from_args
+from common.excel_cache import read_excel_cached
+from common.pipeline import Pipeline
+from cohorts import MEASURES, CohortStore, cohort_matrix, retention, retention_curve
+from rfm import compute_rfm, score_rfm
+from rfm_store import RFMStore
+
+# -----------------------------
+# Customer Analytics with RFM as pipeline stages
+#   QUARTILES (task-3.py):   Frequency = invoice lines, qcut quartiles, RFMScore string
+#   SCORES    (task-3.1.py): Frequency = InvoiceNo count, score_rfm, optional RFMStore
+#   COHORTS   (task-3.2.py): monthly acquisition cohorts and retention (cohorts.py),
+#                            optional CohortStore
+# The rfm table (features) is kept in the stage cache, so reruns on the same
+# workbook start from it.
+# -----------------------------
+DTYPES = {"InvoiceNo": str, "StockCode": str, "CustomerID": "Int64"}
+
+
+def load(_, ctx):
+    # Excel is parsed once, then loaded from a columnar cache (see common/excel_cache.py);
+    # a CSV export with the same columns works too
+    if ctx.input.lower().endswith(".csv"):
+        df = pd.read_csv(ctx.input, parse_dates=["InvoiceDate"], dtype=DTYPES)
+    else:
+        df = read_excel_cached(ctx.input, parse_dates=["InvoiceDate"], dtype=DTYPES)
+
+    print(df.head())
+    print(df.info())
+    return df
+
+
+def clean(df, ctx):
+    # Drop duplicates: whole rows or --dedup-key columns, plus rows an earlier run
+    # saved to --dedup-store (64-bit row fingerprints, see common/dedup.py)
+    dedup = from_args(ctx)
+    df = dedup.drop(df, source=ctx.input)
+    dedup.save()
+    print("Duplicate rows:")
+    print(dedup.report().to_string())
+
+    # Create Amount column
+    df["Amount"] = df["Quantity"] * df["UnitPrice"]
+    return df
+
+
+def clean_known_customers(df, ctx):
+    df = clean(df, ctx)
+
+    # Now drop rows with missing values
+    df.dropna(subset=["CustomerID", "InvoiceDate", "Amount"], inplace=True)
+
+    # Ensure correct datatypes
+    df["CustomerID"] = df["CustomerID"].astype(str)
+    return df
+
+
+def reference_date(df):
+    # latest transaction + 1 day
+    return df["InvoiceDate"].max() + pd.Timedelta(days=1)
+
+
+def features_lines(df, ctx):
+    # Recency = days since last purchase, Frequency = count, Monetary = sum
+    # (single vectorized pass, see rfm.py)
+    rfm = compute_rfm(df, reference_date(df), freq_col="InvoiceDate")
+
+    print("\nRFM table:")
+    print(rfm.head())
+    return rfm
+
+
+def features_invoices(df, ctx):
+    # Recency / Frequency (InvoiceNo count) / Monetary in one vectorized pass (rfm.py).
+    # With --store, per-customer RFM state is kept on disk and only invoices it
+    # hasn't seen yet are merged (point the input at just the new batch).
+    if ctx.store:
+        store = RFMStore.load(ctx.store)
+        print("New invoice lines merged:", store.update(df))
+        store.save()
+        return store.rfm(reference_date(df))
+    return compute_rfm(df, reference_date(df), freq_col="InvoiceNo")
+
+
+def aggregate_quartiles(rfm, ctx):
+    # Segmentation with Quartiles
+    rfm["R_quartile"] = pd.qcut(rfm["Recency"], 4, labels=[4, 3, 2, 1])
+    rfm["F_quartile"] = pd.qcut(rfm["Frequency"], 4, labels=[1, 2, 3, 4])
+    rfm["M_quartile"] = pd.qcut(rfm["Monetary"], 4, labels=[1, 2, 3, 4])
+
+    # Combine into RFM Score
+    rfm["RFMScore"] = (
+        rfm["R_quartile"].astype(str) +
+        rfm["F_quartile"].astype(str) +
+        rfm["M_quartile"].astype(str)
+    )
+
+    print("\nSegmented RFM table:")
+    print(rfm.head())
+    return rfm
+
+
+def aggregate_scores(rfm, ctx):
+    # Quartile scores (only needs the customer table)
+    rfm = score_rfm(rfm)
+
+    print(rfm.head())
+    print(rfm.sort_values("RFM_Score", ascending=False).head(10))  # Top customers
+    return rfm
+
+
+def features_cohorts(df, ctx):
+    # Cohort x months-since-first-purchase matrices (customers, revenue), see cohorts.py.
+    # With --store, the per customer-month cells are kept on disk and only invoices
+    # it hasn't seen yet are merged (point the input at just the new months).
+    if ctx.store:
+        store = CohortStore.load(ctx.store)
+        print("New invoice lines merged:", store.update(df))
+        store.save()
+        return {measure: store.matrix(measure) for measure in MEASURES}
+    return {measure: cohort_matrix(df, measure) for measure in MEASURES}
+
+
+def aggregate_cohorts(matrices, ctx):
+    out = {}
+    for measure, matrix in matrices.items():
+        out[measure] = {"matrix": matrix, "retention": retention(matrix), "curve": retention_curve(matrix)}
+        matrix.to_csv(os.path.join(ctx.out_dir, f"cohort_{measure}.csv"))
+        out[measure]["retention"].to_csv(os.path.join(ctx.out_dir, f"retention_{measure}.csv"))
+
+    curves = pd.DataFrame({measure: r["curve"] for measure, r in out.items()})
+    curves.to_csv(os.path.join(ctx.out_dir, "retention_curves.csv"))
+    print("\nCohort sizes (customers):")
+    print(matrices["customers"][0].astype(int).to_string())
+    print("\nRetention by months since first purchase:")
+    print(curves.round(3).to_string())
+    return out
+
+
+def render_cohorts(results, ctx):
+    for measure, r in results.items():
+        ctx.charts.submit(heatmap_chart(r["retention"], f"retention_{measure}.png", fmt=".0%", cmap="Blues",
+                                        figsize=(12, 7), title=f"Monthly Cohort Retention ({measure})",
+                                        xlabel="Months since first purchase", ylabel="Cohort"))
+        ctx.charts.submit(line_chart(r["curve"].index, r["curve"].to_numpy(), f"retention_curve_{measure}.png",
+                                     marker="o", title=f"Retention Curve ({measure})",
+                                     xlabel="Months since first purchase", ylabel="Retention"))
+    return results
+
+
+def render_quartiles(rfm, ctx):
+    for col, kde, color in [("Recency", True, "blue"), ("Frequency", False, "green"),
+                            ("Monetary", True, "orange")]:
+        ctx.charts.submit(hist_chart([(rfm[col], {"color": color})], f"{col.lower()}_distribution.png",
+                                     bins=30, kde=kde, figsize=(8, 5), title=f"{col} Distribution",
+                                     xlabel=col, ylabel="Count"))
+
+    # Heatmap for correlation
+    ctx.charts.submit(heatmap_chart(rfm[["Recency", "Frequency", "Monetary"]].corr(), "rfm_correlation.png",
+                                    figsize=(6, 4), title="RFM Correlation Heatmap"))
+    return rfm
+
+
+def render_scores(rfm, ctx):
+    for col in ["Recency", "Frequency", "Monetary"]:
+        ctx.charts.submit(hist_chart(rfm[col], f"{col.lower()}_distribution.png", bins=30, kde=True,
+                                     title=f"{col} Distribution", xlabel=col, ylabel="Count"))
+    return rfm
+
+
+INPUT_ARG = (("input",), {"help": "Online Retail.xlsx (or a CSV export of it)"})
+
+QUARTILES = Pipeline(
+    "task-3",
+    [("load", load), ("clean", clean_known_customers), ("features", features_lines),
+     ("aggregate", aggregate_quartiles), ("render", render_quartiles)],
+    args=[INPUT_ARG, *DEDUP_ARGS],
+    cached=["features"],
+    inputs=lambda ctx: [ctx.input, ctx.dedup_store],
+)
+
+SCORES = Pipeline(
+    "task-3.1",
+    [("load", load), ("clean", clean), ("features", features_invoices),
+     ("aggregate", aggregate_scores), ("render", render_scores)],
+    args=[INPUT_ARG,
+          (("--store",), {"metavar": "NPZ", "help": "incremental RFM state file, e.g. rfm_state.npz"}),
+          *DEDUP_ARGS],
+    cached=["features"],
+    inputs=lambda ctx: [ctx.input, ctx.store, ctx.dedup_store],   # the stores' content is part of the key
+)
+
+COHORTS = Pipeline(
+    "task-3.2",
+    [("load", load), ("clean", clean_known_customers), ("features", features_cohorts),
+     ("aggregate", aggregate_cohorts), ("render", render_cohorts)],
+    args=[INPUT_ARG,
+          (("--store",), {"metavar": "NPZ", "help": "incremental cohort state file, e.g. cohort_state.npz"}),
+          *DEDUP_ARGS],
+    cached=["features"],
+    inputs=lambda ctx: [ctx.input, ctx.store, ctx.dedup_store],
+)
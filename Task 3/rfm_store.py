@@ -0,0 +1,87 @@
+import os
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Incremental RFM store
+# Keeps per-customer state (last purchase, invoice line count, amount sum)
+# in a compact .npz file and merges new invoice lines into it, so a daily
+# batch doesn't mean re-reading the whole history.
+# Invoices already merged are skipped (idempotent on InvoiceNo), which
+# assumes an invoice's lines arrive together in one batch.
+# -----------------------------
+
+class RFMStore:
+    def __init__(self, path=None):
+        self.path = path
+        self.customers = pd.Index([], dtype="Int64", name="CustomerID")
+        self.last = np.zeros(0, dtype="int64")      # last purchase, ns since epoch (NaT = int64 min)
+        self.freq = np.zeros(0, dtype="int64")
+        self.money = np.zeros(0, dtype="float64")
+        self.invoices = set()
+
+    @classmethod
+    def load(cls, path):
+        """Open the store at path (empty if the file doesn't exist yet)."""
+        store = cls(path)
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as z:
+                customers = z["customers"]
+                if customers.dtype.kind == "i":
+                    customers = pd.array(customers, dtype="Int64")
+                store.customers = pd.Index(customers, name="CustomerID")
+                store.last, store.freq, store.money = z["last"], z["freq"], z["money"]
+                store.invoices = set(z["invoices"].tolist())
+        return store
+
+    def save(self, path=None):
+        path = path or self.path
+        np.savez_compressed(
+            path, customers=self.customers.to_numpy(getattr(self.customers.dtype, "numpy_dtype", None)),
+            last=self.last,
+            freq=self.freq, money=self.money,
+            invoices=np.array(sorted(self.invoices), dtype=str),
+        )
+
+    def update(self, df, customer_col="CustomerID", date_col="InvoiceDate",
+               invoice_col="InvoiceNo", amount_col="Amount"):
+        """Merge a batch of invoice lines; returns the number of lines applied."""
+        inv = df[invoice_col].astype(str)
+        new_invoices = [i for i in inv.unique() if i not in self.invoices]
+        batch = df[inv.isin(new_invoices)]
+        self.invoices.update(new_invoices)
+
+        agg = batch.groupby(customer_col).agg(
+            last=(date_col, "max"), freq=(invoice_col, "count"), money=(amount_col, "sum"),
+        )
+        last = agg["last"].to_numpy(dtype="datetime64[ns]").view("int64")
+        freq = agg["freq"].to_numpy(dtype="int64")
+        money = agg["money"].to_numpy(dtype="float64")
+
+        # Existing customers: update in place (only the batch's rows are touched)
+        pos = self.customers.get_indexer(agg.index)
+        old = pos >= 0
+        p = pos[old]
+        self.last[p] = np.maximum(self.last[p], last[old])
+        self.freq[p] += freq[old]
+        self.money[p] += money[old]
+
+        # New customers: append
+        if (~old).any():
+            self.customers = self.customers.append(agg.index[~old]).rename(customer_col)
+            self.last = np.concatenate([self.last, last[~old]])
+            self.freq = np.concatenate([self.freq, freq[~old]])
+            self.money = np.concatenate([self.money, money[~old]])
+        return len(batch)
+
+    def rfm(self, reference_date=None):
+        """Recency/Frequency/Monetary table against reference_date (default: last purchase + 1 day)."""
+        last = pd.to_datetime(self.last.view("datetime64[ns]"))
+        if reference_date is None:
+            reference_date = last.max() + pd.Timedelta(days=1)
+        rfm = pd.DataFrame({
+            "Recency": (reference_date - last).days,
+            "Frequency": self.freq,
+            "Monetary": self.money,
+        }, index=self.customers)
+        return rfm.sort_index()
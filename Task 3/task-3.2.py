@@ -0,0 +1,14 @@
+# Monthly acquisition cohorts and retention (customers and revenue) from the
+# same Online Retail invoices. The stages live in rfm_pipeline.py (COHORTS);
+# cohort/retention CSVs and charts are saved to --out-dir.
+#
+#   python task-3.2.py "path/to/Online Retail.xlsx" [--store cohort_state.npz] [--out-dir DIR] [--show]
+#                      [--profile STAGE] [--report FILE]
+
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.pipeline import main
+from rfm_pipeline import COHORTS
+
+if __name__ == "__main__":
+    main(COHORTS)
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.salary import normalize_salaries, parse_salary, PER_YEAR, USD_RATES
+
+# =========================
+# Compensation parsing: the midpoint annualized in USD, from the shared salary
+# normalizer (common/salary.py)
+# parse_comp is the per-answer version, parse_comp_series what the pipelines
+# use: it parses each distinct answer once. Both give the same numbers.
+# (The original regex parse took the first two numbers as a range: it gave
+# 10,005 for the 2018 bucket "10-20,000", 55 for "50-60k", and ignored
+# hourly/monthly pay and non-USD currencies.)
+# =========================
+
+
+def parse_comp(s):
+    if pd.isna(s): return np.nan
+    return parse_salary(s if isinstance(s, str) else str(s)).annual_usd
+
+
+def parse_comp_series(s):
+    """Annualized USD compensation per answer (NaN where there is no figure)."""
+    return pd.Series(normalize_salaries(s)["annual_usd"].to_numpy(), index=s.index, name=s.name)
+
+
+# =========================
+# Comparison with parse_comp + benchmark
+# python comp_parser.py [rows]
+# =========================
+SAMPLE_ANSWERS = [
+    "$0-999", "1,000-1,999", "10,000-14,999", "100,000-124,999",
+    "125,000-149,999", "150,000-199,999", "200,000-249,999",
+    "300,000-500,000", "> $500,000", "$500,000-999,999", "50,000",
+    "I do not wish to disclose my approximate yearly compensation",
+    "nan", "", "40-50", "7.5–10", None, np.nan,
+    "10-20,000", "500,000+", "50-60k", "$20 an hour", "£30,000",
+]
+# Answers the original regex parse got wrong, and what they give now
+KNOWN_ANSWERS = {
+    "10-20,000": 15_000.0,                      # 2018 bucket shorthand (was 10,005)
+    "50-60k": 55_000.0,                         # "k" suffix (was 55)
+    "$20 an hour": 20 * PER_YEAR["hour"],       # hourly pay, annualized (was 20)
+    "£30,000": 30_000 * USD_RATES["GBP"],       # non-USD, converted (was 30,000)
+}
+
+
+def _bench(n_rows=1_000_000, seed=0):
+    rng = np.random.default_rng(seed)
+    s = pd.Series(np.array(SAMPLE_ANSWERS, dtype=object)[rng.integers(0, len(SAMPLE_ANSWERS), n_rows)])
+
+    t0 = time.perf_counter()
+    expected = s.apply(parse_comp)
+    t_apply = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = parse_comp_series(s)
+    t_vec = time.perf_counter() - t0
+
+    np.testing.assert_array_equal(got.to_numpy(), expected.to_numpy(dtype="float64"))
+    for answer, value in KNOWN_ANSWERS.items():
+        assert parse_comp(answer) == value, (answer, parse_comp(answer))
+    print(f"rows={n_rows:,}  apply={t_apply:.3f}s  batched={t_vec:.3f}s  "
+          f"speedup={t_apply / t_vec:.1f}x  (outputs identical)")
+
+
+if __name__ == "__main__":
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,124 @@
+import json
+import time
+import numpy as np
+import pandas as pd
+
+# =========================
+# Label encoding with persisted vocabularies
+# Codes are the position in the sorted vocabulary (same numbering as the old
+# dict-map loop), stored as the smallest int dtype that fits.
+# Reserved codes: MISSING for NaN, UNSEEN for values not in the vocabulary
+# (e.g. new answers in a later survey wave encoded against a saved mapping).
+# =========================
+MISSING = -1
+UNSEEN = -2
+
+
+def code_dtype(n_categories):
+    for dt in ("int8", "int16", "int32"):
+        if n_categories <= np.iinfo(dt).max:
+            return dt
+    return "int64"
+
+
+class LabelEncoder:
+    def __init__(self, vocab=None):
+        self.vocab = {c: list(v) for c, v in (vocab or {}).items()}
+
+    def _learn(self, c, uniques, extend):
+        values = sorted(uniques)
+        if extend and c in self.vocab:
+            known = set(self.vocab[c])
+            self.vocab[c] = self.vocab[c] + [v for v in values if v not in known]
+        else:
+            self.vocab[c] = values
+
+    def fit(self, df, columns=None, extend=False):
+        """Learn sorted vocabularies; extend=True keeps existing codes and appends new values."""
+        for c in (columns if columns is not None else df.columns):
+            self._learn(c, pd.unique(df[c].dropna()), extend)
+        return self
+
+    def encode(self, s, uniques=None, codes=None):
+        # One hash pass over the rows (factorize); the vocabulary lookup only
+        # touches the distinct values.
+        if codes is None:
+            codes, uniques = pd.factorize(s)
+        cats = self.vocab[s.name]
+        pos = {v: i for i, v in enumerate(cats)}
+        lut = np.array([pos.get(u, UNSEEN) for u in uniques] + [MISSING], dtype=code_dtype(len(cats)))
+        return pd.Series(lut[codes], index=s.index, name=s.name)
+
+    def transform(self, df):
+        out = df.copy()
+        for c in self.vocab:
+            if c in out.columns:
+                out[c] = self.encode(out[c])
+        return out
+
+    def fit_transform(self, df, columns=None, extend=False):
+        out = df.copy()
+        for c in (columns if columns is not None else df.columns):
+            codes, uniques = pd.factorize(out[c])
+            self._learn(c, uniques, extend)
+            out[c] = self.encode(out[c], uniques, codes)
+        return out
+
+    def mappings(self):
+        return {c: {k: i for i, k in enumerate(v)} for c, v in self.vocab.items()}
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"missing": MISSING, "unseen": UNSEEN, "vocab": self.vocab},
+                      f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["vocab"])
+
+
+# =========================
+# Benchmark against the dict-map loop
+# python label_encoder.py [rows]
+# =========================
+def _dict_map_encode(df):
+    encoded = df.copy()
+    label_maps = {}
+    for c in encoded.columns:
+        if encoded[c].dtype == "object":
+            cats = pd.Series(encoded[c].dropna().unique()).sort_values()
+            mapping = {k:i for i,k in enumerate(cats, start=0)}
+            label_maps[c] = mapping
+            encoded[c] = encoded[c].map(mapping).astype("float")
+    return encoded
+
+
+def _bench(n_rows=1_000_000, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = {"country": 60, "gender": 5, "education": 7, "role": 15, "comp": 25}
+    df = pd.DataFrame({
+        c: pd.Series(np.array([f"{c}_{i}" for i in range(k)] + [None], dtype=object)[
+            rng.integers(0, k + 1, n_rows)], dtype=object)
+        for c, k in sizes.items()
+    })
+
+    t0 = time.perf_counter()
+    old = _dict_map_encode(df)
+    t_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    new = LabelEncoder().fit_transform(df)
+    t_new = time.perf_counter() - t0
+
+    for c in df.columns:
+        np.testing.assert_array_equal(new[c].replace(MISSING, np.nan).to_numpy(dtype="float64"),
+                                      old[c].to_numpy())
+    mb = lambda d: d.memory_usage(deep=True).sum() / 1e6
+    print(f"rows={n_rows:,}  dict-map={t_old:.3f}s ({mb(old):.1f} MB)  "
+          f"encoder={t_new:.3f}s ({mb(new):.1f} MB)  speedup={t_old / t_new:.1f}x  (codes identical)")
+
+
+if __name__ == "__main__":
+    import sys
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import time
+import shutil
+import numpy as np
+import pandas as pd
+from comp_parser import parse_comp_series
+from survey_utils import COLUMN_CANDIDATES, normalize_gender, normalize_education
+
+# =========================
+# Year-partitioned survey dataset (Parquet, one directory per survey year)
+# The flat outputs resolve each canonical column once, with first_match on the
+# union of all years' columns. Here every year gets its own map, built from the
+# question codes that year actually answered. So 2018's compensation comes from
+# the column 2018 used, not from whichever candidate matched first. The maps
+# are saved next to the data as _columns.json.
+#
+#   survey_by_year/year=2017/part-0-0.parquet ... year=2021/...
+#
+# Readers go through pyarrow.dataset. A year filter prunes whole partition
+# directories, and only the requested columns are read from the files that
+# are left. So "2021 compensation by country" opens one partition and reads
+# two column chunks:
+#
+#   python survey_dataset.py OUT_DIR/survey_by_year [--year 2021]
+# =========================
+DATASET_DIR = "survey_by_year"
+COLUMN_MAP = "_columns.json"   # a leading "_" keeps it out of dataset discovery
+
+
+def survey_years(s):
+    """Survey year per row as float (NaN where the cell isn't a year, e.g. a question-text row)."""
+    return pd.to_numeric(np.asarray(s, dtype=object), errors="coerce").astype("float64")
+
+
+def year_presence(df, year_col, columns):
+    """years x columns table: does any row of that year answer the column?"""
+    columns = [c for c in columns if c != year_col]
+    year = survey_years(df[year_col])
+    known = ~np.isnan(year)
+    return df.loc[known, columns].notna().groupby(year[known].astype("int64")).any()
+
+
+def year_frame(df, year_col, year_cols):
+    """Canonical columns for every row of a known year, each year read from its own question codes."""
+    year = survey_years(df[year_col])
+    keep = np.isin(year, [int(y) for y in year_cols])
+    df, year = df[keep], year[keep].astype("int64")
+
+    out = pd.DataFrame({"year": year.astype("int16")}, index=df.index)
+    for name in COLUMN_CANDIDATES:
+        values = np.full(len(df), None, dtype=object)
+        for y, cols in year_cols.items():
+            if cols[name]:
+                rows = year == int(y)
+                values[rows] = df[cols[name]].to_numpy(dtype=object)[rows]
+        # "string" keeps the Parquet type the same in every file, even for all-missing chunks
+        s = pd.Series(values, index=df.index, dtype="string").str.strip()
+        out[name] = s.mask(s == "")
+
+    out["gender"] = normalize_gender(out["gender"])
+    out["education"] = normalize_education(out["education"])
+    out["compensation_usd"] = parse_comp_series(out["compensation"])
+    return out
+
+
+def write_partitions(frame, root, part=0):
+    """Add frame's rows to the dataset at root (year=YYYY/part-<part>-<n>.parquet)."""
+    frame.to_parquet(root, partition_cols=["year"], index=False,
+                     basename_template=f"part-{part}-{{i}}.parquet")
+
+
+def reset_dataset(root, year_cols):
+    """Empty the dataset directory and save the per-year column map into it."""
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+    with open(os.path.join(root, COLUMN_MAP), "w", encoding="utf-8") as f:
+        json.dump(year_cols, f, indent=2)
+
+
+def load_column_map(root):
+    with open(os.path.join(root, COLUMN_MAP), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _dataset(root, years):
+    import pyarrow.dataset as ds
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    flt = None if years is None else ds.field("year").isin([int(y) for y in years])
+    return dataset, flt
+
+
+def read_years(root, years=None, columns=None):
+    """Rows of the given survey years (all if None), only `columns` (all if None).
+    Partitions of other years are never opened."""
+    dataset, flt = _dataset(root, years)
+    return dataset.to_table(columns=columns, filter=flt).to_pandas()
+
+
+def scan_stats(root, years=None, columns=None):
+    """Files and compressed column bytes a read_years() call touches, vs the whole dataset."""
+    dataset, flt = _dataset(root, years)
+    stats = dict.fromkeys(["files", "bytes", "total_files", "total_bytes"], 0)
+    touched = {f.path for f in dataset.get_fragments(filter=flt)}
+    for fragment in dataset.get_fragments():
+        meta = fragment.metadata
+        chunks = [meta.row_group(i).column(j) for i in range(meta.num_row_groups)
+                  for j in range(meta.num_columns)]
+        stats["total_files"] += 1
+        stats["total_bytes"] += sum(c.total_compressed_size for c in chunks)
+        if fragment.path in touched:
+            stats["files"] += 1
+            stats["bytes"] += sum(c.total_compressed_size for c in chunks
+                                  if columns is None or c.path_in_schema in columns)
+    return stats
+
+
+def compensation_by_country(frame):
+    """Respondents and median compensation (USD) per country, largest first."""
+    g = frame.groupby("country")["compensation_usd"]
+    return (pd.DataFrame({"respondents": g.size(), "median_usd": g.median()})
+              .sort_values(["respondents", "median_usd"], ascending=False, kind="stable"))
+
+
+# -----------------------------
+# Benchmark: "compensation by country for one year"
+# -----------------------------
+def _bench(root, year=2021, repeat=5):
+    columns = ["country", "compensation_usd"]
+
+    def flat():
+        # what a query over the flat output costs: every year, every column
+        df = read_years(root)
+        return compensation_by_country(df[df["year"] == year])
+
+    def pushdown():
+        return compensation_by_country(read_years(root, [year], columns))
+
+    timings = {}
+    for name, query in [("flat", flat), ("pushdown", pushdown)]:
+        runs = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result = query()
+            runs.append(time.perf_counter() - t0)
+        timings[name] = (min(runs), result)
+    pd.testing.assert_frame_equal(timings["flat"][1], timings["pushdown"][1])
+
+    print(f"{year} compensation by country ({root})")
+    print(timings["pushdown"][1].head(10).to_string())
+    for name, years, cols in [("flat", None, None), ("pushdown", [year], columns)]:
+        s = scan_stats(root, years, cols)
+        print(f"  {name:<9} {timings[name][0] * 1e3:7.1f} ms  files {s['files']}/{s['total_files']}  "
+              f"column bytes {s['bytes']:,}/{s['total_bytes']:,}")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("root", help=f"the {DATASET_DIR} directory of a task4_survey_cleaning.py run")
+    parser.add_argument("--year", type=int, default=2021)
+    args = parser.parse_args()
+    if not os.path.isdir(args.root):
+        sys.exit(f"no dataset at {args.root}")
+    print("Columns by year:", load_column_map(args.root).get(str(args.year)))
+    _bench(args.root, args.year)
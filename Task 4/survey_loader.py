@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.dedup import Deduplicator, csv_keep_mask
+from survey_utils import standardize_columns, resolve_columns, tool_like_columns, candidate_columns
+
+# =========================
+# Two-phase loader for the survey CSV
+#   1) read the header only, resolve the columns we actually use and probe a
+#      small sample to decide dtypes (category for low-cardinality answers)
+#   2) re-read with usecols + that dtype plan
+# Besides the resolved columns, the plan loads the year column and every other
+# candidate question code, for the per-year column maps (survey_dataset.py).
+# The plan is cached next to the input (<file>.plan.json), keyed on a hash of
+# the header, so repeated runs skip the probe.
+# Exact whole-row duplicates are found from the raw CSV records, hashed without
+# parsing them (common/dedup.py). --dedup-loaded-columns dedupes on the loaded
+# columns instead, from the same read, but then rows that differ only in
+# columns the cleaning never reads are merged.
+#
+#   python survey_loader.py [rows] [columns]   # benchmark vs read_csv + drop_duplicates on a wide survey
+# =========================
+PROBE_ROWS = 5000
+CATEGORY_MAX_RATIO = 0.5   # unique/non-null in the sample at or below this -> category
+PLAN_VERSION = 2          # bump when the plan's contents change (cached plans are re-probed)
+
+
+def header_hash(columns):
+    return hashlib.sha1("\x1f".join(map(str, columns)).encode("utf-8")).hexdigest()
+
+
+def plan_path(input_path):
+    return f"{input_path}.plan.json"
+
+
+def probe_plan(input_path, header):
+    std_cols = standardize_columns(pd.Index(header))
+    raw_cols = resolve_columns(std_cols)
+    tool_cols = tool_like_columns(std_cols)
+    std_to_raw = dict(zip(std_cols, header))
+
+    wanted = list(dict.fromkeys([c for c in raw_cols.values() if c] + tool_cols + candidate_columns(std_cols)))
+    usecols = [std_to_raw[c] for c in wanted]
+
+    sample = pd.read_csv(input_path, usecols=usecols, nrows=PROBE_ROWS, dtype=str)
+    dtypes = {}
+    for c in usecols:
+        s = sample[c].dropna()
+        if len(s) and pd.to_numeric(s, errors="coerce").notna().all():
+            continue  # numeric: let read_csv infer it
+        if len(s) == 0 or s.nunique() / len(s) <= CATEGORY_MAX_RATIO:
+            dtypes[c] = "category"
+        else:
+            dtypes[c] = "object"
+
+    return {
+        "version": PLAN_VERSION,
+        "header_hash": header_hash(header),
+        "usecols": usecols,
+        "dtypes": dtypes,
+        "raw_cols": raw_cols,
+        "tool_cols": tool_cols,
+    }
+
+
+def load_plan(input_path, use_cache=True):
+    """Return the load plan for input_path, probing only if the cached one is stale."""
+    header = list(pd.read_csv(input_path, nrows=0).columns)
+    path = plan_path(input_path)
+    if use_cache and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            plan = json.load(f)
+        if plan.get("version") == PLAN_VERSION and plan.get("header_hash") == header_hash(header):
+            return plan
+
+    plan = probe_plan(input_path, header)
+    if use_cache:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(plan, f, indent=2)
+    return plan
+
+
+def load_survey(input_path, use_cache=True, dedup=None, loaded_columns=False):
+    """Load only the planned columns with the planned dtypes.
+
+    Duplicate rows are already removed from the result: by default exact
+    whole-row duplicates (as drop_duplicates() on the full frame, from a pass
+    that hashes the raw records), or whatever the given
+    common.dedup.Deduplicator drops (a key subset of the standardized column
+    names, rows seen by earlier runs). loaded_columns=True dedupes on the
+    planned columns of the frame already read.
+    Returns (df, plan).
+    """
+    plan = load_plan(input_path, use_cache=use_cache)
+    df = pd.read_csv(input_path, usecols=plan["usecols"], dtype=plan["dtypes"])
+    df = df[plan["usecols"]]  # usecols doesn't keep the requested order
+    dedup = dedup or Deduplicator()
+    names = standardize_columns(pd.Index(plan["usecols"]))
+    if (loaded_columns and not dedup.key) or (dedup.key and set(dedup.key) <= set(names)):
+        keep = dedup.keep_mask(df.set_axis(names, axis=1), source=input_path)
+    else:
+        keep = csv_keep_mask(input_path, dedup, rename=standardize_columns)
+    return df[keep], plan
+
+
+def strip_text(s):
+    """s.astype(str).str.strip() that also accepts categoricals (stripping each category once)."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        cats = s.cat.categories.astype(str).str.strip().to_numpy(dtype=object)
+        values = np.append(cats, "nan")[s.cat.codes.to_numpy()]
+        return pd.Series(values, index=s.index, name=s.name, dtype=object)
+    return s.astype(str).str.strip()
+
+
+# -----------------------------
+# Benchmark: a wide survey (the generated survey's questions plus filler
+# multiple-choice columns the cleaning never uses, ~1% repeated rows)
+# -----------------------------
+def _wide_survey(path, n_rows, n_cols, seed=0):
+    from bench.generators import survey_chunk, dup_rows
+    rng = np.random.default_rng(seed)
+    df = survey_chunk(0, n_rows, n_rows, rng)["survey"]
+    answers = np.array([f"Option {i}" for i in range(8)] + [""], dtype=object)
+    filler = pd.DataFrame({f"Q{40 + j // 10}_Part_{j % 10 + 1}": answers[rng.integers(0, len(answers), n_rows)]
+                           for j in range(n_cols - df.shape[1])})
+    dup_rows(pd.concat([df, filler], axis=1), rng, 0.01).to_csv(path, index=False)
+
+
+def _bench(n_rows=40_000, n_cols=313):
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wide_survey.csv")
+        _wide_survey(path, n_rows, n_cols)
+        print(f"{n_rows:,} rows x {n_cols} columns ({os.path.getsize(path) / 1e6:.0f} MB)")
+        load_plan(path)   # probe once; every case below reuses the cached plan
+
+        def baseline():
+            return pd.read_csv(path, low_memory=False).drop_duplicates()
+
+        def projected():
+            plan = load_plan(path)
+            return pd.read_csv(path, usecols=plan["usecols"], dtype=plan["dtypes"])
+
+        cases = [("read_csv + drop_duplicates (baseline)", baseline),
+                 ("usecols read only, no dedup", projected),
+                 ("load_survey (whole rows)", lambda: load_survey(path)[0]),
+                 ("load_survey(loaded_columns=True)", lambda: load_survey(path, loaded_columns=True)[0])]
+        rows = {}
+        for name, fn in cases:
+            t0 = time.perf_counter()
+            rows[name] = len(fn())
+            print(f"  {name:<38} {time.perf_counter() - t0:6.2f}s  {rows[name]:,} rows")
+        assert rows[cases[0][0]] == rows[cases[2][0]]
+
+
+if __name__ == "__main__":
+    _bench(*(int(a) for a in sys.argv[1:3]))
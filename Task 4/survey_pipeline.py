@@ -0,0 +1,244 @@
+import os, re
+import pandas as pd
+import numpy as np
+from common.dedup import DEDUP_ARGS, from_args
+from common.excel_cache import HAS_ARROW, read_excel_cached
+from common.pipeline import Pipeline
+from comp_parser import parse_comp_series
+from label_encoder import LabelEncoder
+from survey_dataset import DATASET_DIR, year_presence, year_frame, reset_dataset, write_partitions
+from survey_loader import load_survey, strip_text
+from survey_utils import (standardize_columns, resolve_columns, tool_like_columns,
+                          year_column, candidate_columns, resolve_year_columns,
+                          normalize_gender, normalize_education,
+                          top5_insights, write_insights, chart_specs)
+
+# =========================
+# Kaggle survey cleaning as pipeline stages (run it with task4_survey_cleaning.py)
+#   PIPELINE: load -> clean -> features -> aggregate -> render, in memory
+#   STREAM:   the same outputs in one chunked pass (--chunksize, survey_stream.py)
+# Detected columns are kept on ctx.raw_cols for the later stages, the per-year
+# maps on ctx.year_cols (survey_dataset.py). clean and
+# features only compute (no file output), so both can be served from the
+# stage cache; every output file is written by aggregate.
+# =========================
+
+# =========================
+# 1) LOAD
+# =========================
+def load(_, ctx):
+    # Works for .csv or .xlsx (requires openpyxl for xlsx; parsed once, then cached)
+    # Duplicate rows are dropped here: whole rows (the loaded columns with
+    # --dedup-loaded-columns) or --dedup-key columns, plus rows an earlier run saved
+    # to --dedup-store (64-bit row fingerprints, common/dedup.py)
+    xlsx = ctx.input.lower().endswith(".xlsx")
+    dedup = from_args(ctx)
+    if xlsx:
+        df = read_excel_cached(ctx.input)
+    else:
+        # Loads only the columns used below, with a cached dtype plan (category for
+        # low-cardinality answers); duplicates are dropped while loading, from a
+        # streamed pass that hashes the raw records (or parses only the key
+        # columns). See survey_loader.py
+        df, _ = load_survey(ctx.input, dedup=dedup, loaded_columns=ctx.dedup_loaded_columns)
+
+    # Standardize column names
+    df.columns = standardize_columns(df.columns)
+    if xlsx:
+        df = dedup.drop(df, source=ctx.input)
+    dedup.save()
+    print("Duplicate rows:")
+    print(dedup.report().to_string())
+
+    # =========================
+    # 2) CANONICAL COLUMN MAPPING (across years)
+    # (We’ll try to detect typical columns with fallbacks.)
+    # =========================
+    # (first_match candidates live in survey_utils.resolve_columns)
+    ctx.raw_cols = resolve_columns(df.columns)
+    ctx.tool_like_cols = tool_like_columns(df.columns)
+
+    # Per-year maps: each year resolves the question codes it actually answered
+    # ({} without a year column; then there is no per-year dataset)
+    ctx.year_col = year_column(df.columns)
+    ctx.year_cols = (resolve_year_columns(year_presence(df, ctx.year_col, candidate_columns(df.columns)))
+                     if ctx.year_col else {})
+    return df
+
+
+# =========================
+# 3) BASIC CLEANING .. 6) CLEAN SUBSET
+# =========================
+def clean(df, ctx):
+    cols = ctx.raw_cols
+
+    # Canonical columns per survey year, for the year-partitioned dataset (from the raw answers)
+    by_year = year_frame(df, ctx.year_col, ctx.year_cols) if ctx.year_cols else None
+
+    # Strip whitespace from text columns
+    for c in df.select_dtypes(include=["object", "category"]).columns:
+        df[c] = strip_text(df[c])
+
+    # Remove "Select all that apply" noise text in headers (common in Kaggle survey)
+    df = df.rename(columns=lambda c: re.sub(r"\(.*?select.*?apply.*?\)", "", c, flags=re.I).strip())
+
+    # Normalize common categoricals (simple, safe mappings; see survey_utils)
+    if cols["gender"]:
+        df[cols["gender"]] = normalize_gender(df[cols["gender"]].astype(str))
+    if cols["education"]:
+        df[cols["education"]] = normalize_education(df[cols["education"]].astype(str))
+
+    # Range-midpoint / single-number parsing lives in comp_parser.py
+    # (vectorized: each distinct answer is parsed once, then mapped back).
+    if cols["compensation"]:
+        df["compensation_usd"] = parse_comp_series(df[cols["compensation"]])
+    else:
+        df["compensation_usd"] = np.nan
+
+    keep_cols = [c for c in [cols["country"], cols["age"], cols["gender"], cols["education"],
+                             cols["compensation"], cols["role"]] if c]
+    keep_cols = list(dict.fromkeys(keep_cols))  # unique & preserve order
+    if "compensation_usd" not in keep_cols:
+        keep_cols = keep_cols + ["compensation_usd"]
+
+    clean = df[keep_cols].copy()
+
+    # Convert age if numeric-like (some years are bins; keep as text then)
+    age_col = cols["age"]
+    if age_col and pd.api.types.is_numeric_dtype(pd.to_numeric(clean[age_col], errors="coerce")):
+        clean[age_col] = pd.to_numeric(clean[age_col], errors="coerce")
+
+    # Drop all-empty rows
+    return {"clean": clean.dropna(how="all"), "by_year": by_year}
+
+
+# =========================
+# 7) LABEL ENCODING
+# (Keep a human-readable copy; create an encoded one for ML)
+# Compact int codes (-1 = missing, -2 = unseen), see label_encoder.py.
+# The vocabulary is saved so later survey waves can be encoded the same way.
+# =========================
+def features(data, ctx):
+    clean = data["clean"]
+    text_cols = [c for c in clean.columns if clean[c].dtype == "object"]
+    if ctx.label_maps:
+        encoder = LabelEncoder.load(ctx.label_maps)
+        encoded = encoder.transform(clean)
+    else:
+        encoder = LabelEncoder()
+        encoded = encoder.fit_transform(clean, text_cols)
+    ctx.label_vocab = encoder.vocab   # saved as label_maps.json by aggregate
+    # Note: compensation_usd stays numeric already.
+    return {**data, "encoded": encoded}
+
+
+# =========================
+# 8) INSIGHTS TABLES + 10) TOP-5 INSIGHTS (AUTO)
+# =========================
+def save_table(df_, path, topn=None):
+    out = df_.copy()
+    if topn: out = out.head(topn)
+    out.to_csv(path, index=True)
+
+
+def aggregate(data, ctx):
+    clean, cols, out_dir = data["clean"], ctx.raw_cols, ctx.out_dir
+    os.makedirs(f"{out_dir}/insights", exist_ok=True)
+
+    # Save outputs
+    LabelEncoder(ctx.label_vocab).save(f"{out_dir}/label_maps.json")
+    clean.to_csv(f"{out_dir}/survey_clean.csv", index=False)
+    data["encoded"].to_csv(f"{out_dir}/survey_encoded.csv", index=False)
+
+    # Year-partitioned Parquet copy (see survey_dataset.py)
+    if data["by_year"] is not None and HAS_ARROW:
+        reset_dataset(f"{out_dir}/{DATASET_DIR}", ctx.year_cols)
+        write_partitions(data["by_year"], f"{out_dir}/{DATASET_DIR}")
+
+    # Top Countries
+    if cols["country"]:
+        top_countries = clean[cols["country"]].value_counts(dropna=False).head(20)
+        save_table(top_countries, f"{out_dir}/insights/top_countries.csv")
+
+    # Gender distribution
+    if cols["gender"]:
+        gender_dist = clean[cols["gender"]].value_counts(dropna=False)
+        save_table(gender_dist, f"{out_dir}/insights/gender_distribution.csv")
+
+    # Education distribution
+    if cols["education"]:
+        edu_dist = clean[cols["education"]].value_counts(dropna=False)
+        save_table(edu_dist, f"{out_dir}/insights/education_distribution.csv")
+
+    # Roles
+    if cols["role"]:
+        role_dist = clean[cols["role"]].value_counts(dropna=False).head(20)
+        save_table(role_dist, f"{out_dir}/insights/top_roles.csv")
+
+    # Compensation summary
+    comp_summary = clean["compensation_usd"].describe().to_frame(name="compensation_usd")
+    comp_summary.to_csv(f"{out_dir}/insights/compensation_summary.csv")
+
+    def vc(col):
+        return clean[col].value_counts() if col else None
+
+    insights = top5_insights(vc(cols["country"]), vc(cols["role"]), vc(cols["gender"]),
+                             vc(cols["education"]), clean["compensation_usd"].median())
+    write_insights(f"{out_dir}/top5_insights.txt", insights)
+    return data
+
+
+# =========================
+# 9) CHARTS
+# =========================
+def render(data, ctx):
+    clean, cols, out_dir = data["clean"], ctx.raw_cols, ctx.out_dir
+
+    for spec in chart_specs(lambda col: clean[col].value_counts(), cols, clean["compensation_usd"]):
+        ctx.charts.submit(spec)
+
+    print("Done ✅")
+    print(f"Outputs saved in: {os.path.abspath(out_dir)}")
+    print("Detected columns:", cols)
+    return data
+
+
+# Streaming mode: same outputs, built chunk by chunk with bounded memory
+def stream(_, ctx):
+    from survey_stream import stream_survey
+    ctx.raw_cols = stream_survey(ctx.input, ctx.out_dir, ctx.chunksize, ctx.label_maps, ctx.charts,
+                                 from_args(ctx), ctx.dedup_loaded_columns)
+    print("Done ✅ (streaming mode)")
+    print(f"Outputs saved in: {os.path.abspath(ctx.out_dir)}")
+    print("Detected columns:", ctx.raw_cols)
+    return None
+
+
+ARGS = [
+    (("input",), {"help": "kaggle_survey_2017_2021.csv (or .xlsx)"}),
+    (("--chunksize",), {"type": int, "default": None,
+                        "help": "stream the CSV in chunks of this many rows (e.g. 200000) for files "
+                                "that don't fit in memory"}),
+    (("--label-maps",), {"default": None,
+                         "help": "label_maps.json from an earlier run: encode with that fixed vocabulary "
+                                 "(unseen answers get code -2)"}),
+    *DEDUP_ARGS,
+    (("--dedup-loaded-columns",), {"action": "store_true",
+                                   "help": "dedupe on the loaded columns only (no extra pass over the file; "
+                                           "rows differing only in other columns are merged)"}),
+]
+
+PIPELINE = Pipeline(
+    "task4-survey",
+    [("load", load), ("clean", clean), ("features", features), ("aggregate", aggregate), ("render", render)],
+    args=ARGS,
+    cached=["clean", "features"],
+    inputs=lambda ctx: [ctx.input, ctx.label_maps, ctx.dedup_store],   # the store's content is part of the key
+)
+
+STREAM = Pipeline("task4-survey-stream", [("stream", stream)], args=ARGS)
+
+
+def pick(args):
+    """STREAM for --chunksize on a CSV, else the in-memory PIPELINE."""
+    return STREAM if args.chunksize and not args.input.lower().endswith(".xlsx") else PIPELINE
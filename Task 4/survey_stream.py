@@ -0,0 +1,222 @@
+import os
+import numpy as np
+import pandas as pd
+from common.dedup import Deduplicator, csv_records, record_fingerprints
+from common.excel_cache import HAS_ARROW
+from comp_parser import parse_comp_series
+from label_encoder import LabelEncoder
+from survey_dataset import DATASET_DIR, year_presence, year_frame, reset_dataset, write_partitions
+from survey_loader import load_plan
+from survey_utils import (standardize_columns, resolve_columns,
+                          year_column, candidate_columns, resolve_year_columns,
+                          normalize_gender, normalize_education,
+                          top5_insights, write_insights, chart_specs)
+
+# =========================
+# Streaming mode for task4_survey_cleaning.py
+# Reads the survey in chunks so memory stays bounded by the chunk size:
+#   pass 0: (with a year column) which question codes each year answered, from
+#           the year + candidate columns only -> per-year column maps
+#   pass 1: dedupe (fingerprints of the raw records or the key columns, common/dedup.py)
+#           -> project -> clean -> append survey_clean.csv
+#           and one Parquet file per year to survey_by_year/,
+#           feed running counters for the insight tables/charts
+#   pass 2: re-read survey_clean.csv in chunks and append survey_encoded.csv
+#           (label codes need the full vocabulary, which pass 1 collects)
+# =========================
+
+class RunningCounts:
+    """Mergeable value_counts(dropna=False); missing values are kept under None."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def update(self, s):
+        for k, n in s.value_counts(dropna=False).items():
+            k = None if pd.isna(k) else k
+            self.counts[k] = self.counts.get(k, 0) + int(n)
+        return self
+
+    def merge(self, other):
+        for k, n in other.counts.items():
+            self.counts[k] = self.counts.get(k, 0) + n
+        return self
+
+    def to_series(self, dropna=True, name=None):
+        items = [(k, n) for k, n in self.counts.items() if not (dropna and k is None)]
+        index = pd.Index([np.nan if k is None else k for k, _ in items], name=name)
+        s = pd.Series([n for _, n in items], index=index, name="count", dtype="int64")
+        return s.sort_values(ascending=False, kind="stable")
+
+    def vocabulary(self):
+        return sorted(k for k in self.counts if k is not None)
+
+
+def weighted_describe(counts):
+    """Series.describe() for a numeric column given as RunningCounts of its values."""
+    vc = counts.to_series(dropna=True)
+    v = vc.index.to_numpy(dtype="float64")
+    w = vc.to_numpy(dtype="float64")
+    order = np.argsort(v, kind="stable")
+    v, w = v[order], w[order]
+    n = w.sum()
+    stats = dict.fromkeys(["count", "mean", "std", "min", "25%", "50%", "75%", "max"], np.nan)
+    stats["count"] = n
+    if n == 0:
+        return pd.Series(stats, name="compensation_usd")
+
+    cum = np.cumsum(w)
+    def at_rank(r):
+        return v[np.searchsorted(cum, r, side="right")]
+    def quantile(q):
+        # linear interpolation, same as pandas' default
+        pos = q * (n - 1)
+        lo, hi = np.floor(pos), np.ceil(pos)
+        return at_rank(lo) + (at_rank(hi) - at_rank(lo)) * (pos - lo)
+
+    mean = (v * w).sum() / n
+    stats.update({
+        "mean": mean,
+        "std": np.sqrt(((v - mean) ** 2 * w).sum() / (n - 1)) if n > 1 else np.nan,
+        "min": v[0], "25%": quantile(0.25), "50%": quantile(0.5),
+        "75%": quantile(0.75), "max": v[-1],
+    })
+    return pd.Series(stats, name="compensation_usd")
+
+
+def clean_chunk(chunk, raw_cols, keep_cols):
+    # Same steps as the in-memory path, restricted to the kept columns
+    age_col, gender_col = raw_cols["age"], raw_cols["gender"]
+    edu_col, comp_col = raw_cols["education"], raw_cols["compensation"]
+
+    out = chunk[[c for c in keep_cols if c != "compensation_usd"]].copy()
+    for c in out.select_dtypes(include="object").columns:
+        out[c] = out[c].astype(str).str.strip()
+    if gender_col:
+        out[gender_col] = normalize_gender(out[gender_col].astype(str))
+    if edu_col:
+        out[edu_col] = normalize_education(out[edu_col].astype(str))
+    out["compensation_usd"] = parse_comp_series(out[comp_col]) if comp_col else np.nan
+    if age_col and pd.api.types.is_numeric_dtype(pd.to_numeric(out[age_col], errors="coerce")):
+        out[age_col] = pd.to_numeric(out[age_col], errors="coerce")
+    return out.dropna(how="all")
+
+
+def stream_year_columns(input_path, std_cols, chunksize=200_000):
+    """Per-year column maps for the year-partitioned dataset, reading only the candidate columns."""
+    candidates = candidate_columns(std_cols)
+    positions = [i for i, c in enumerate(std_cols) if c in set(candidates)]
+    presence = None
+    for chunk in pd.read_csv(input_path, usecols=positions, chunksize=chunksize, dtype=str):
+        chunk.columns = std_cols[positions]
+        p = year_presence(chunk, candidates[0], candidates)
+        presence = p if presence is None else pd.concat([presence, p]).groupby(level=0).any()
+    return resolve_year_columns(presence) if presence is not None else {}
+
+
+def stream_survey(input_path, out_dir, chunksize=200_000, label_maps_path=None, charts=None, dedup=None,
+                  loaded_columns=False):
+    """Run the survey cleaning in streaming mode; returns the detected columns.
+    Chart specs go to `charts` (a common.charts.ChartRenderer), if given.
+    Rows `dedup` (a common.dedup.Deduplicator; default: exact whole-row
+    duplicates) drops are skipped; its store, if any, is saved at the end.
+    loaded_columns=True dedupes on the loader's planned columns, as load_survey."""
+    os.makedirs(f"{out_dir}/insights", exist_ok=True)
+    clean_path = f"{out_dir}/survey_clean.csv"
+    encoded_path = f"{out_dir}/survey_encoded.csv"
+
+    header = pd.read_csv(input_path, nrows=0)
+    std_cols = standardize_columns(header.columns)
+    raw_cols = resolve_columns(std_cols)
+    keep_cols = list(dict.fromkeys(c for c in raw_cols.values() if c))
+    keep_cols = keep_cols + ["compensation_usd"]
+    text_cols = [c for c in keep_cols if c not in (raw_cols["age"], "compensation_usd")]
+
+    # ---- pass 0: per-year column maps (none without a year column or pyarrow)
+    year_col = year_column(std_cols)
+    year_cols = stream_year_columns(input_path, std_cols, chunksize) if year_col and HAS_ARROW else {}
+    if year_cols:
+        reset_dataset(f"{out_dir}/{DATASET_DIR}", year_cols)
+
+    dedup = dedup or Deduplicator()
+    counts = {c: RunningCounts() for c in text_cols}
+    comp_counts = RunningCounts()
+    n_in = n_dup = n_out = 0
+
+    # ---- pass 1: clean + counters
+    # Only the planned columns (plus any dedup key) are parsed. Whole rows are deduped
+    # from the raw records, read alongside in the same chunks
+    wanted = set(standardize_columns(pd.Index(load_plan(input_path)["usecols"]))) | set(dedup.key or [])
+    positions = [i for i, c in enumerate(std_cols) if c in wanted]
+    reader = pd.read_csv(input_path, usecols=positions, chunksize=chunksize, dtype=str)
+    records = csv_records(input_path, chunksize) if not (dedup.key or loaded_columns) else None
+    for i, chunk in enumerate(reader):
+        chunk.columns = std_cols[positions]
+        n_in += len(chunk)
+        if records is None:
+            keep = dedup.keep_mask(chunk, source=input_path)
+        else:
+            fp = record_fingerprints(next(records))
+            if len(fp) != len(chunk):
+                raise ValueError(f"{input_path}: raw records and parsed rows disagree in chunk {i}")
+            keep = dedup.keep_fingerprints(fp, source=input_path)
+        n_dup += int((~keep).sum())
+
+        cleaned = clean_chunk(chunk[keep], raw_cols, keep_cols)
+        if year_cols:
+            write_partitions(year_frame(chunk[keep], year_col, year_cols), f"{out_dir}/{DATASET_DIR}", part=i)
+        del chunk
+        for c in text_cols:
+            counts[c].update(cleaned[c])
+        comp_counts.update(cleaned["compensation_usd"])
+        cleaned.to_csv(clean_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        n_out += len(cleaned)
+
+    # ---- pass 2: label encoding against the full (sorted) vocabulary, or a saved one
+    if label_maps_path:
+        encoder = LabelEncoder.load(label_maps_path)
+    else:
+        encoder = LabelEncoder({c: counts[c].vocabulary() for c in text_cols})
+    encoder.save(f"{out_dir}/label_maps.json")
+    reader = pd.read_csv(clean_path, chunksize=chunksize, keep_default_na=False, na_values=[""],
+                         dtype={c: str for c in text_cols})
+    for i, chunk in enumerate(reader):
+        chunk = encoder.transform(chunk)
+        chunk.to_csv(encoded_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+
+    # ---- insight tables (from counters, no rows kept in memory)
+    country_col, gender_col = raw_cols["country"], raw_cols["gender"]
+    edu_col, role_col = raw_cols["education"], raw_cols["role"]
+
+    def table(col, topn=None):
+        s = counts[col].to_series(dropna=False, name=col)
+        return s.head(topn) if topn else s
+
+    if country_col:
+        table(country_col, 20).to_csv(f"{out_dir}/insights/top_countries.csv", index=True)
+    if gender_col:
+        table(gender_col).to_csv(f"{out_dir}/insights/gender_distribution.csv", index=True)
+    if edu_col:
+        table(edu_col).to_csv(f"{out_dir}/insights/education_distribution.csv", index=True)
+    if role_col:
+        table(role_col, 20).to_csv(f"{out_dir}/insights/top_roles.csv", index=True)
+    comp_summary = weighted_describe(comp_counts)
+    comp_summary.to_frame(name="compensation_usd").to_csv(f"{out_dir}/insights/compensation_summary.csv")
+
+    # ---- charts (rendered by the pipeline's ChartRenderer)
+    def vc(col):
+        return counts[col].to_series(dropna=True, name=col) if col else None
+
+    if charts is not None:
+        comp_vc = comp_counts.to_series(dropna=True)
+        for spec in chart_specs(vc, raw_cols, comp_vc.index.to_numpy(dtype="float64"), comp_vc.to_numpy()):
+            charts.submit(spec)
+
+    # ---- top-5 insights
+    insights = top5_insights(vc(country_col), vc(role_col), vc(gender_col), vc(edu_col),
+                             comp_summary["50%"])
+    write_insights(f"{out_dir}/top5_insights.txt", insights)
+
+    dedup.save()
+    print(f"Streamed {n_in:,} rows ({n_dup:,} duplicates dropped, {n_out:,} clean rows)")
+    return raw_cols
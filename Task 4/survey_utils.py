@@ -0,0 +1,147 @@
+import re
+import numpy as np
+from common.charts import bar_chart, pie_chart, hist_chart
+
+# =========================
+# Shared helpers for the survey cleaning script (in-memory and streaming modes)
+# =========================
+
+def standardize_columns(columns):
+    # Strip, collapse whitespace and lowercase header names
+    return (
+        columns.str.strip()
+               .str.replace("\n", " ", regex=False)
+               .str.replace(r"\s+", " ", regex=True)
+               .str.lower()
+    )
+
+
+def first_match(cols, candidates):
+    for c in candidates:
+        if c in cols: return c
+    return None
+
+
+# Common variants across years (not exhaustive, but practical)
+COLUMN_CANDIDATES = {
+    "country": ["country", "q3"],  # Q3 in many years
+    "age": ["age", "q2"],
+    "gender": ["gender", "q1"],
+    "education": ["education level", "highest level of formal education", "q4", "q6"],
+    "compensation": ["compensation", "salary", "q29", "q24", "q9", "current yearly compensation (approximate)"],
+    "role": ["job title", "jobtitle", "q5"],
+}
+# The combined 2017-2021 file keeps the survey year in a column headed "-"
+YEAR_CANDIDATES = ["year", "survey year", "-"]
+
+
+def resolve_columns(cols):
+    cols = set(cols)
+    return {name: first_match(cols, candidates) for name, candidates in COLUMN_CANDIDATES.items()}
+
+
+def year_column(cols):
+    return first_match(set(cols), YEAR_CANDIDATES)
+
+
+def candidate_columns(cols):
+    """Columns (in file order) that may hold a canonical answer in some year, year column first."""
+    names = set().union(*COLUMN_CANDIDATES.values())
+    year_col = year_column(cols)
+    return ([year_col] if year_col else []) + [c for c in cols if c in names and c != year_col]
+
+
+def resolve_year_columns(presence):
+    """Per-year canonical column map from a years x columns table of "has any answer" flags:
+    each year resolves the question codes it actually used ({"2021": {"country": "q3", ...}})."""
+    return {str(year): resolve_columns(row.index[row.to_numpy(dtype=bool)])
+            for year, row in presence.iterrows()}
+
+
+TOOL_PAT = r"(program|language|tool|python|r\b|sql|excel|tableau|power bi|spark|tensorflow|pytorch)"
+
+def tool_like_columns(columns):
+    # Multi-select programming tools/questions change by year; this heuristic catches columns with "python", "r", "sql", etc.
+    return [c for c in columns if re.search(TOOL_PAT, c)]
+
+
+# Normalize common categoricals (simple, safe mappings)
+def normalize_gender(s):
+    s = s.str.lower().str.replace(r"prefer.*not.*say", "prefer_not_say", regex=True)
+    s = s.str.replace(r"male.*", "male", regex=True)
+    s = s.str.replace(r"female.*", "female", regex=True)
+    s = s.where(~s.isin(["nan","none",""]), other=np.nan)
+    return s
+
+def normalize_education(s):
+    s = s.str.lower()
+    s = s.replace({
+        "primary/elementary school":"primary",
+        "some college/university study without earning a bachelor’s degree":"some_college",
+        "bachelor’s degree":"bachelors",
+        "master’s degree":"masters",
+        "doctoral degree":"phd",
+        "professional degree":"professional",
+        "i prefer not to answer":"prefer_not_say"
+    })
+    return s
+
+
+def top5_insights(country_vc=None, role_vc=None, gender_vc=None, edu_vc=None, comp_median=np.nan):
+    """Build the auto insights from value_counts() style Series (NaN dropped)."""
+    insights = []
+
+    if country_vc is not None and len(country_vc):
+        insights.append(f"Most respondents are from {country_vc.idxmax()}.")
+
+    if role_vc is not None and len(role_vc):
+        insights.append(f"Most common role among respondents: {role_vc.idxmax()}.")
+
+    if gender_vc is not None and len(gender_vc):
+        g = gender_vc / gender_vc.sum() * 100
+        top_gender = g.idxmax()
+        insights.append(f"Largest gender share: {top_gender} at {g[top_gender]:.1f}%.")
+
+    if edu_vc is not None and len(edu_vc):
+        e = edu_vc / edu_vc.sum() * 100
+        top_edu = e.idxmax()
+        insights.append(f"Most common education level: {top_edu} ({e[top_edu]:.1f}%).")
+
+    if not np.isnan(comp_median):
+        insights.append(f"Median reported compensation ≈ ${comp_median:,.0f}.")
+
+    # Ensure exactly 5 (pad if needed)
+    while len(insights) < 5:
+        insights.append("Data varies by year; categories differ across surveys.")
+    return insights[:5]
+
+
+def chart_specs(vc, cols, comp_values, comp_weights=None):
+    """The survey's chart specs, from vc(col) -> value_counts()-style Series (NaN dropped)
+    and the compensation values (weighted by their counts in streaming mode)."""
+    specs = []
+    if cols["country"]:
+        specs.append(bar_chart(vc(cols["country"]).head(10), "charts/top10_countries.png", figsize=(8, 5),
+                               dpi=150, rotation=90, title="Top 10 Countries (Respondents)",
+                               xlabel="Country", ylabel="Count"))
+    if cols["gender"]:
+        specs.append(pie_chart(vc(cols["gender"]), "charts/gender_distribution.png",
+                               dpi=150, autopct="%1.1f%%", title="Gender Distribution"))
+    if cols["education"]:
+        specs.append(bar_chart(vc(cols["education"]).head(8), "charts/top_education.png",
+                               dpi=150, rotation=90, title="Top Education Levels",
+                               xlabel="Education", ylabel="Count"))
+    if cols["role"]:
+        specs.append(bar_chart(vc(cols["role"]).head(10), "charts/top_roles.png",
+                               dpi=150, rotation=90, title="Top 10 Roles", xlabel="Role", ylabel="Count"))
+    specs.append(hist_chart(comp_values, "charts/compensation_hist.png", bins=40, weights=comp_weights, dpi=150,
+                            title="Compensation (USD) — Distribution", xlabel="USD (approx.)",
+                            ylabel="Respondents"))
+    return specs
+
+
+def write_insights(path, insights):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Top 5 Insights\n")
+        f.write("----------------\n")
+        f.write("\n".join(f"- {i}" for i in insights[:5]))
@@ -0,0 +1,271 @@
+# chinook_db.py
+#
+# Chinook analytics over the CSV exports in this folder.
+# The CSVs are bulk-loaded into an embedded SQLite database (chinook.sqlite)
+# with primary keys and indexes on every foreign key; a table is only
+# reloaded when its CSV changed (mtime/size), so reconnecting is instant.
+# The revenue reports read small day-grain summary tables (rebuilt when the
+# invoice tables reload), so they stay in milliseconds as invoices grow.
+#
+#   db = ChinookDB()                      # loads / refreshes as needed
+#   db.revenue_by_genre(start="2012-01-01", end="2013-01-01", limit=5)
+#
+# python chinook_db.py              -> print the standard reports
+# python chinook_db.py bench 1000   -> load Invoice/InvoiceLine scaled 1000x and time the reports
+
+import os
+import csv
+import sys
+import time
+import sqlite3
+import tempfile
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Load order follows the foreign keys (parents first)
+SCHEMA = {
+    "Artist": """
+        ArtistId INTEGER PRIMARY KEY, Name TEXT""",
+    "Album": """
+        AlbumId INTEGER PRIMARY KEY, Title TEXT,
+        ArtistId INTEGER REFERENCES Artist(ArtistId)""",
+    "Genre": """
+        GenreId INTEGER PRIMARY KEY, Name TEXT""",
+    "MediaType": """
+        MediaTypeId INTEGER PRIMARY KEY, Name TEXT""",
+    "Track": """
+        TrackId INTEGER PRIMARY KEY, Name TEXT,
+        AlbumId INTEGER REFERENCES Album(AlbumId),
+        MediaTypeId INTEGER REFERENCES MediaType(MediaTypeId),
+        GenreId INTEGER REFERENCES Genre(GenreId),
+        Composer TEXT, Milliseconds INTEGER, Bytes INTEGER, UnitPrice REAL""",
+    "Playlist": """
+        PlaylistId INTEGER PRIMARY KEY, Name TEXT""",
+    "PlaylistTrack": """
+        PlaylistId INTEGER REFERENCES Playlist(PlaylistId),
+        TrackId INTEGER REFERENCES Track(TrackId),
+        PRIMARY KEY (PlaylistId, TrackId)""",
+    "Employee": """
+        EmployeeId INTEGER PRIMARY KEY, LastName TEXT, FirstName TEXT, Title TEXT,
+        ReportsTo INTEGER REFERENCES Employee(EmployeeId),
+        BirthDate TEXT, HireDate TEXT, Address TEXT, City TEXT, State TEXT, Country TEXT,
+        PostalCode TEXT, Phone TEXT, Fax TEXT, Email TEXT""",
+    "Customer": """
+        CustomerId INTEGER PRIMARY KEY, FirstName TEXT, LastName TEXT, Company TEXT,
+        Address TEXT, City TEXT, State TEXT, Country TEXT, PostalCode TEXT, Phone TEXT,
+        Fax TEXT, Email TEXT, SupportRepId INTEGER REFERENCES Employee(EmployeeId)""",
+    "Invoice": """
+        InvoiceId INTEGER PRIMARY KEY, CustomerId INTEGER REFERENCES Customer(CustomerId),
+        InvoiceDate TEXT, BillingAddress TEXT, BillingCity TEXT, BillingState TEXT,
+        BillingCountry TEXT, BillingPostalCode TEXT, Total REAL""",
+    "InvoiceLine": """
+        InvoiceLineId INTEGER PRIMARY KEY, InvoiceId INTEGER REFERENCES Invoice(InvoiceId),
+        TrackId INTEGER REFERENCES Track(TrackId), UnitPrice REAL, Quantity INTEGER""",
+}
+
+# Foreign-key indexes
+INDEXES = {
+    "Album": ["ArtistId"],
+    "Track": ["AlbumId", "GenreId", "MediaTypeId"],
+    "PlaylistTrack": ["TrackId"],
+    "Customer": ["SupportRepId"],
+    "Invoice": ["CustomerId", "InvoiceDate"],
+    "InvoiceLine": ["InvoiceId", "TrackId"],
+}
+
+# Day-grain summaries the reports run on: at most (days x tracks) and
+# (days x customers) rows, however many invoice lines there are
+SUMMARIES = {
+    "TrackDailySales": """
+        SELECT substr(i.InvoiceDate, 1, 10) AS InvoiceDay, il.TrackId,
+               SUM(il.UnitPrice * il.Quantity) AS Revenue, SUM(il.Quantity) AS Units
+        FROM InvoiceLine il JOIN Invoice i ON i.InvoiceId = il.InvoiceId
+        GROUP BY InvoiceDay, il.TrackId""",
+    "CustomerDailySales": """
+        SELECT substr(InvoiceDate, 1, 10) AS InvoiceDay, CustomerId, BillingCountry,
+               SUM(Total) AS Revenue, COUNT(*) AS Invoices
+        FROM Invoice
+        GROUP BY InvoiceDay, CustomerId, BillingCountry""",
+}
+SUMMARY_SOURCES = {"Invoice", "InvoiceLine"}
+
+
+def _index_name(table, cols):
+    return f"ix_{table}_" + "_".join(c.strip() for c in cols.split(","))
+
+
+class ChinookDB:
+    def __init__(self, csv_dir=HERE, db_path=None):
+        self.csv_dir = csv_dir
+        self.db_path = db_path or os.path.join(csv_dir, "chinook.sqlite")
+        self.con = sqlite3.connect(self.db_path)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("""CREATE TABLE IF NOT EXISTS _source
+                            (tbl TEXT PRIMARY KEY, mtime REAL, size INTEGER)""")
+        self.refresh()
+
+    # -----------------------------
+    # Loading
+    # -----------------------------
+    def refresh(self):
+        """(Re)load every table whose CSV changed since the last load; returns their names."""
+        known = dict((t, (m, s)) for t, m, s in self.con.execute("SELECT tbl, mtime, size FROM _source"))
+        reloaded = []
+        for table in SCHEMA:
+            path = os.path.join(self.csv_dir, f"{table}.csv")
+            if not os.path.exists(path):
+                continue
+            st = os.stat(path)
+            if known.get(table) != (st.st_mtime, st.st_size):
+                self._load_table(table, path, st)
+                reloaded.append(table)
+        have = {r[0] for r in self.con.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        if SUMMARY_SOURCES & set(reloaded) or not set(SUMMARIES) <= have:
+            self._build_summaries()
+        return reloaded
+
+    def _build_summaries(self):
+        t0 = time.perf_counter()
+        with self.con:
+            for name, sql in SUMMARIES.items():
+                self.con.execute(f"DROP TABLE IF EXISTS {name}")
+                self.con.execute(f"CREATE TABLE {name} AS {sql}")
+                self.con.execute(f"CREATE INDEX ix_{name}_day ON {name} (InvoiceDay)")
+        print(f"Built summaries in {time.perf_counter() - t0:.2f}s")
+
+    def _load_table(self, table, path, st):
+        t0 = time.perf_counter()
+        with self.con:   # one transaction per table
+            self.con.execute(f"DROP TABLE IF EXISTS {table}")
+            self.con.execute(f"CREATE TABLE {table} ({SCHEMA[table]})")
+            with open(path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                marks = ", ".join("?" * len(header))
+                rows = ([v if v != "" else None for v in row] for row in reader)
+                self.con.executemany(
+                    f"INSERT INTO {table} ({', '.join(header)}) VALUES ({marks})", rows)
+            # indexes after the bulk insert (much cheaper than maintaining them row by row)
+            for cols in INDEXES.get(table, []):
+                self.con.execute(f"CREATE INDEX {_index_name(table, cols)} ON {table} ({cols})")
+            self.con.execute("INSERT OR REPLACE INTO _source VALUES (?, ?, ?)",
+                             (table, st.st_mtime, st.st_size))
+        self.con.execute(f"ANALYZE {table}")
+        n = self.con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"Loaded {table}: {n:,} rows in {time.perf_counter() - t0:.2f}s")
+
+    # -----------------------------
+    # Reports (all parameterized; start/end filter on the invoice day, end exclusive)
+    # -----------------------------
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self.con, params=params)
+
+    @staticmethod
+    def _period(start, end):
+        return (start or "0000-01-01", end or "9999-12-31")
+
+    def revenue_by_genre(self, start=None, end=None, limit=None):
+        return self.query("""
+            SELECT g.Name AS Genre, SUM(s.Revenue) AS Revenue, SUM(s.Units) AS Units
+            FROM TrackDailySales s
+            JOIN Track t ON t.TrackId = s.TrackId
+            JOIN Genre g ON g.GenreId = t.GenreId
+            WHERE s.InvoiceDay >= ? AND s.InvoiceDay < ?
+            GROUP BY g.GenreId ORDER BY Revenue DESC LIMIT ?""",
+            (*self._period(start, end), limit or -1))
+
+    def revenue_by_artist(self, start=None, end=None, limit=None):
+        return self.query("""
+            SELECT ar.Name AS Artist, SUM(s.Revenue) AS Revenue, SUM(s.Units) AS Units
+            FROM TrackDailySales s
+            JOIN Track t ON t.TrackId = s.TrackId
+            JOIN Album al ON al.AlbumId = t.AlbumId
+            JOIN Artist ar ON ar.ArtistId = al.ArtistId
+            WHERE s.InvoiceDay >= ? AND s.InvoiceDay < ?
+            GROUP BY ar.ArtistId ORDER BY Revenue DESC LIMIT ?""",
+            (*self._period(start, end), limit or -1))
+
+    def revenue_by_country(self, start=None, end=None, limit=None):
+        return self.query("""
+            SELECT BillingCountry AS Country, SUM(Revenue) AS Revenue,
+                   SUM(Invoices) AS Invoices
+            FROM CustomerDailySales
+            WHERE InvoiceDay >= ? AND InvoiceDay < ?
+            GROUP BY BillingCountry ORDER BY Revenue DESC LIMIT ?""",
+            (*self._period(start, end), limit or -1))
+
+    def revenue_by_support_rep(self, start=None, end=None, limit=None):
+        return self.query("""
+            SELECT e.FirstName || ' ' || e.LastName AS SupportRep,
+                   SUM(s.Revenue) AS Revenue, COUNT(DISTINCT s.CustomerId) AS Customers
+            FROM CustomerDailySales s
+            JOIN Customer c ON c.CustomerId = s.CustomerId
+            JOIN Employee e ON e.EmployeeId = c.SupportRepId
+            WHERE s.InvoiceDay >= ? AND s.InvoiceDay < ?
+            GROUP BY e.EmployeeId ORDER BY Revenue DESC LIMIT ?""",
+            (*self._period(start, end), limit or -1))
+
+    REPORTS = ["revenue_by_genre", "revenue_by_artist", "revenue_by_country", "revenue_by_support_rep"]
+
+    def close(self):
+        self.con.close()
+
+
+# -----------------------------
+# Scale-up benchmark
+# -----------------------------
+def write_scaled_csvs(src_dir, out_dir, scale):
+    """Copy the CSVs to out_dir with Invoice/InvoiceLine repeated `scale` times (new ids)."""
+    for table in SCHEMA:
+        src = os.path.join(src_dir, f"{table}.csv")
+        dst = os.path.join(out_dir, f"{table}.csv")
+        with open(src, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        header, body = rows[0], rows[1:]
+        with open(dst, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            if table not in ("Invoice", "InvoiceLine"):
+                w.writerows(body)
+                continue
+            id_cols = [header.index(c) for c in ("InvoiceId", "InvoiceLineId") if c in header]
+            step = {i: max(int(r[i]) for r in body) for i in id_cols}
+            for k in range(scale):
+                for r in body:
+                    r = list(r)
+                    for i in id_cols:
+                        r[i] = str(int(r[i]) + k * step[i])
+                    w.writerow(r)
+
+
+def _bench(scale=1000):
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        write_scaled_csvs(HERE, tmp, scale)
+        print(f"Wrote {scale}x CSVs in {time.perf_counter() - t0:.1f}s")
+
+        t0 = time.perf_counter()
+        db = ChinookDB(tmp)
+        print(f"Cold load: {time.perf_counter() - t0:.1f}s")
+        t0 = time.perf_counter()
+        db.refresh()
+        print(f"Warm refresh (nothing changed): {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+        for name in ChinookDB.REPORTS:
+            for label, kw in [("all time", {}), ("one year", {"start": "2012-01-01", "end": "2013-01-01"})]:
+                t0 = time.perf_counter()
+                getattr(db, name)(limit=10, **kw)
+                print(f"{name:24s} {label:9s} {(time.perf_counter() - t0) * 1000:8.1f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        _bench(int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
+    else:
+        db = ChinookDB()
+        for name in ChinookDB.REPORTS:
+            print(f"\n{name}:")
+            print(getattr(db, name)(limit=5).to_string(index=False))
+        db.close()
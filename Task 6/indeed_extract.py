@@ -0,0 +1,326 @@
+# indeed_extract.py
+#
+# Offline extractor for saved Indeed search-result pages (like indeed_jobs.html).
+# About 90% of such a page is <script>, <style> and inline <svg> icon
+# payload. Each file is streamed in 64 KB chunks through a byte-level filter
+# that drops those bodies before they ever reach the HTML parser. lxml parses
+# the markup that is left at ~30 MB/s, so that is still most of the cost:
+# only the job-card container (#mosaic-provider-jobcards, ~40% of the
+# remaining markup) is fed to an incremental lxml HTMLPullParser that reports
+# only closing <div>s to Python; each job card is read in one pass as soon as
+# it closes, then cleared, and feeding stops when the container closes.
+# Saved pages carry salary and posting age only in the jobcards JSON
+# (window.mosaic.providerData), so the one script that holds it is decoded,
+# every other script body is skipped unparsed, and reading stops once both
+# have been seen. Pages without the container are parsed whole.
+# A directory of pages is spread over a process pool and comes back as one
+# typed table, with the salary snippets normalized (common/salary.py) in one
+# batch.
+#
+#   jobs = extract_pages(["page1.html", "page2.html"], workers=4)
+#
+# python indeed_extract.py PAGE_OR_DIR ... [--out jobs.csv] [--workers N]
+# python indeed_extract.py check          -> extract the bundled page and check known values
+# python indeed_extract.py bench 2000     -> pages/second on copies of the bundled page
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from lxml import etree
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+from common.salary import normalize_salaries
+BUNDLED_PAGE = os.path.join(HERE, "indeed_jobs.html")
+CHUNK = 1 << 16
+
+# column -> dtype of the output table
+COLUMNS = {
+    "page": "string",
+    "jobkey": "string",
+    "title": "string",
+    "company": "string",
+    "location": "string",
+    "salary_snippet": "string",
+    "salary_estimated": "boolean",   # Indeed's own estimate, not a figure from the posting
+    "posted": "string",
+    "age_days": "Int16",             # "30+ days ago" -> 30 (a lower bound), "Today" / "Just posted" -> 0
+    # salary_snippet normalized by common/salary.py
+    "salary_min": "float64",
+    "salary_max": "float64",
+    "salary_period": "category",
+    "salary_annual_usd": "float64",
+}
+RAW_COLUMNS = list(COLUMNS)[:9]
+
+OPEN_TAG = re.compile(rb"<(script|style|svg)\b[^>]*?(/?)>", re.I)
+CLOSE_TAG = {name: re.compile(rb"</" + name + rb"\s*>", re.I) for name in (b"script", b"style", b"svg")}
+JOBCARDS_MARKER = b'window.mosaic.providerData["mosaic-provider-jobcards"]='
+CARDS_ID = "mosaic-provider-jobcards"
+CARDS_START = re.compile(rb"<div\b[^>]*\bid=[\"']?" + CARDS_ID.encode() + rb"\b", re.I)
+AGE = re.compile(r"(\d+)\+?\s+days?\s+ago", re.I)
+
+
+def strip_payloads(chunks, on_script=None, start=None):
+    """Yield the HTML with <script>/<style>/<svg> bodies removed (the tags stay;
+    a self-closing <svg/> has none). on_script(body) sees script bodies that hold
+    the jobcards JSON. With a `start` pattern, markup before its first match is
+    dropped too (no tag is ever split across the pieces, so one search per piece does)."""
+    buf, tag, body = b"", None, []
+    for chunk in chunks:
+        buf += chunk
+        out, pos = [], 0
+        while True:
+            if tag is None:
+                m = OPEN_TAG.search(buf, pos)
+                if m is None:
+                    # hold back a tag that may be cut off at the chunk boundary
+                    cut = buf.rfind(b"<", pos)
+                    cut = cut if cut != -1 and buf.find(b">", cut) == -1 else len(buf)
+                    out.append(buf[pos:cut])
+                    pos = cut
+                    break
+                out.append(buf[pos:m.end()])
+                tag, pos = m.group(1).lower(), m.end()
+                if m.group(2) and tag == b"svg":
+                    tag = None   # <svg/> has no body (<script/> and <style/> still do, as in HTML)
+            else:
+                m = CLOSE_TAG[tag].search(buf, pos)
+                if m is None:
+                    keep = max(pos, len(buf) - 16)   # the tail may hold half of the closing tag
+                    if tag == b"script":
+                        body.append(buf[pos:keep])
+                    pos = keep
+                    break
+                if tag == b"script":
+                    body.append(buf[pos:m.start()])
+                    payload = b"".join(body)
+                    if on_script is not None and JOBCARDS_MARKER in payload:
+                        on_script(payload)
+                body = []
+                out.append(buf[m.start():m.end()])
+                tag, pos = None, m.end()
+        buf = buf[pos:]
+        piece = b"".join(out)
+        if start is not None and piece:
+            m = start.search(piece)
+            piece = b"" if m is None else piece[m.start():]
+            start = None if m is not None else start
+        if piece:
+            # one piece per input chunk: the parser's per-feed overhead is not negligible
+            yield piece
+    if tag is None and buf and start is None:
+        yield buf
+
+
+def _jobcards_json(payload):
+    # {jobkey: result} from the providerData assignment inside a script body
+    text = payload.decode("utf-8", "replace")
+    start = text.index(JOBCARDS_MARKER.decode()) + len(JOBCARDS_MARKER)
+    data, _ = json.JSONDecoder().raw_decode(text, start)
+    results = data["metaData"]["mosaicProviderJobCardsModel"]["results"]
+    return {r["jobkey"]: r for r in results}
+
+
+# field -> (data-testid values, class names) that mark it inside a card; the first match wins
+CARD_FIELDS = {
+    "title": ((), ("jcs-JobTitle",)),
+    "company": (("company-name",), ()),
+    "location": (("text-location",), ()),
+    "salary_snippet": (("attribute_snippet_testid",), ("salary-snippet-container",)),
+    "posted": (("myJobsStateDate",), ("date",)),
+}
+_BY_TESTID = {tid: name for name, (tids, _) in CARD_FIELDS.items() for tid in tids}
+_BY_CLASS = {cls: name for name, (_, classes) in CARD_FIELDS.items() for cls in classes}
+
+
+def _text(elem):
+    return " ".join("".join(elem.itertext()).split()) or None
+
+
+def read_card(elem):
+    """Field texts of one job card element (None where missing), in one pass over its ~50 elements."""
+    found = {}
+    for el in elem.iter(etree.Element):
+        name = _BY_TESTID.get(el.get("data-testid"))
+        if name is None and el.get("class"):
+            name = next((_BY_CLASS[c] for c in el.get("class").split() if c in _BY_CLASS), None)
+        if name is not None and name not in found:
+            found[name] = el
+    card = {name: _text(found[name]) if name in found else None for name in CARD_FIELDS}
+    card["jobkey"] = found["title"].get("data-jk") if "title" in found else None
+    return card
+
+
+def age_days(posted):
+    if not posted:
+        return None
+    m = AGE.search(posted)
+    if m:
+        return int(m.group(1))
+    return 0 if re.search(r"today|just posted", posted, re.I) else None
+
+
+def _read_cards(path, start):
+    # (cards, jobcards JSON by jobkey, whether the card container was found)
+    json_jobs, cards, in_cards, done = {}, [], False, False
+    parser = etree.HTMLPullParser(events=("end",), tag="div", encoding="utf-8")
+
+    def on_script(body):
+        json_jobs.update(_jobcards_json(body))
+
+    with open(path, "rb") as f:
+        chunks = iter(lambda: f.read(CHUNK), b"")
+        for html in strip_payloads(chunks, on_script=on_script, start=start):
+            if done:
+                if json_jobs:
+                    break   # cards read and JSON decoded: the rest of the page is never read
+                continue
+            in_cards = True
+            parser.feed(html)
+            for _, elem in parser.read_events():
+                if start is not None and elem.get("id") == CARDS_ID:
+                    done = True   # the container closed: no more cards
+                if "cardOutline" not in (elem.get("class") or "").split():
+                    continue
+                # aria-hidden cards are placeholders that duplicate a visible one
+                if elem.get("aria-hidden") != "true":
+                    card = read_card(elem)
+                    if card["jobkey"]:
+                        cards.append(card)
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        if in_cards:
+            parser.close()
+    return cards, json_jobs, in_cards
+
+
+def extract_page(path):
+    """Job rows (tuples in RAW_COLUMNS order) from one saved results page."""
+    cards, json_jobs, found = _read_cards(path, CARDS_START)
+    if not found:
+        cards, json_jobs, _ = _read_cards(path, None)   # another layout: parse the whole page
+
+    rows = []
+    for card in cards:
+        extra = json_jobs.get(card["jobkey"], {})
+        salary, estimated = card.get("salary_snippet"), False
+        if salary is None:
+            salary = (extra.get("salarySnippet") or {}).get("text")
+        if salary is None and (extra.get("estimatedSalary") or {}).get("formattedRange"):
+            salary, estimated = extra["estimatedSalary"]["formattedRange"], True
+        posted = card.get("posted") or extra.get("formattedRelativeTime")
+        rows.append((os.path.basename(path), card["jobkey"], card.get("title") or extra.get("displayTitle"),
+                     card.get("company") or extra.get("company"),
+                     extra.get("formattedLocation") or card.get("location"),   # the card adds "(... area)" notes
+                     salary, estimated if salary is not None else None, posted, age_days(posted)))
+    return rows
+
+
+def _pages(paths):
+    for p in paths:
+        if os.path.isdir(p):
+            yield from sorted(os.path.join(p, n) for n in os.listdir(p) if n.lower().endswith((".html", ".htm")))
+        else:
+            yield p
+
+
+def extract_pages(paths, workers=None, chunksize=16):
+    """One typed DataFrame for every page in paths (files or directories), extracted in a process pool."""
+    pages = list(_pages(paths))
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(pages) <= 1:
+        rows = [row for page in pages for row in extract_page(page)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            rows = [row for page_rows in ex.map(extract_page, pages, chunksize=chunksize) for row in page_rows]
+    df = pd.DataFrame.from_records(rows, columns=RAW_COLUMNS)
+    salary = normalize_salaries(df["salary_snippet"])
+    for field in ("min", "max", "period", "annual_usd"):
+        df[f"salary_{field}"] = salary[field]
+    return df.astype(COLUMNS)
+
+
+def _check():
+    jobs = extract_pages([BUNDLED_PAGE], workers=1)
+    assert len(jobs) == 15 and jobs["jobkey"].is_unique, len(jobs)
+    assert "789abcdef0123456" not in set(jobs["jobkey"])   # the aria-hidden placeholder card
+    first = jobs.iloc[0]
+    assert (first["jobkey"], first["title"], first["company"], first["location"]) == \
+        ("de5683a02e8211a4", "Data Analyst", "Cross Catholic Outreach", "Boca Raton, FL 33427"), first
+    assert (first["salary_snippet"], first["salary_estimated"], first["posted"], first["age_days"]) == \
+        ("$74.2K - $94K a year", True, "19 days ago", 19), first
+    by_key = jobs.set_index("jobkey")
+    assert by_key.loc["7c6afff3ec5622f9", "salary_snippet"] == "$55,000 - $65,000 a year"
+    assert not by_key.loc["7c6afff3ec5622f9", "salary_estimated"]
+    assert by_key.loc["233b0ee5b4f51fba", "salary_snippet"] == "$32.39 an hour"
+    assert by_key.loc["233b0ee5b4f51fba", "salary_period"] == "hour"
+    assert abs(by_key.loc["233b0ee5b4f51fba", "salary_annual_usd"] - 32.39 * 2080) < 1e-6
+    assert (first["salary_min"], first["salary_max"], first["salary_annual_usd"]) == (74_200, 94_000, 84_100)
+    assert by_key.loc["81ff3c83086c9e73", "title"] == "Supply Chain Systems & Data Analyst"
+    assert by_key.loc["8a5aab01a3555058", "age_days"] == 30
+    assert jobs["salary_snippet"].notna().all() and jobs["company"].notna().all()
+    assert jobs["salary_annual_usd"].notna().all()
+    assert dict(jobs.dtypes.astype(str)) == COLUMNS
+    print(jobs.drop(columns="page").to_string(index=False))
+    print(f"\n{len(jobs)} jobs from {os.path.basename(BUNDLED_PAGE)}: checks passed")
+
+
+def _full_parse(path):
+    # Baseline: the same fields from a full DOM parse, script and style payloads included
+    from lxml import html
+    tree = html.parse(path)
+    script = tree.xpath("//script[contains(text(), $marker)]", marker=JOBCARDS_MARKER.decode())
+    json_jobs = _jobcards_json(script[0].text.encode()) if script else {}
+    cards = [read_card(el) for el in tree.xpath('//div[contains(concat(" ", @class, " "), " cardOutline ")][not(@aria-hidden="true")]')]
+    return len([c for c in cards if c["jobkey"]]), len(json_jobs)
+
+
+def _bench(n_pages=2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(n_pages):
+            shutil.copyfile(BUNDLED_PAGE, os.path.join(tmp, f"page_{i:05d}.html"))
+        mb = os.path.getsize(BUNDLED_PAGE) * n_pages / 1e6
+        pages = sorted(os.path.join(tmp, name) for name in os.listdir(tmp))
+        print(f"{n_pages} pages, {mb:.0f} MB")
+        rates = {}
+        for name, fn in [("full DOM parse, same fields", _full_parse), ("streaming extract_page", extract_page)]:
+            t0 = time.process_time()
+            for page in pages:
+                fn(page)
+            rates[name] = n_pages / (time.process_time() - t0)
+            print(f"  {name + ', 1 process:':<40} {rates[name]:7.1f} pages/s of CPU")
+        print(f"  streaming / full DOM: {rates['streaming extract_page'] / rates['full DOM parse, same fields']:.2f}x")
+        for workers in sorted({1, os.cpu_count() or 1}):
+            t0 = time.perf_counter()
+            jobs = extract_pages([tmp], workers=workers)
+            dt = time.perf_counter() - t0
+            print(f"  extract_pages, {workers} process(es) (wall): {n_pages / dt:7.1f} pages/s  "
+                  f"{mb / dt:6.1f} MB/s  ({len(jobs):,} jobs)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "check":
+        _check()
+    elif len(sys.argv) > 1 and sys.argv[1] == "bench":
+        _bench(int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
+    else:
+        p = argparse.ArgumentParser(prog="indeed_extract.py")
+        p.add_argument("paths", nargs="*", default=[BUNDLED_PAGE], help="saved pages or folders of them")
+        p.add_argument("--out", help="write the table as CSV (default: print it)")
+        p.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+        args = p.parse_args()
+        jobs = extract_pages(args.paths, args.workers)
+        if args.out:
+            jobs.to_csv(args.out, index=False)
+            print(f"{len(jobs):,} jobs -> {args.out}")
+        else:
+            print(jobs.to_string(index=False))
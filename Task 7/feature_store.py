@@ -0,0 +1,419 @@
+# feature_store.py
+#
+# Out-of-core feature store for the Walmart features.csv data in this folder.
+# Rows are sorted by (Store, Date), so each store is one contiguous,
+# date-sorted slice (offsets.npy). Every column is its own .npy file and is
+# opened memory-mapped, so only the pages a query touches are read:
+#   <dir>/key.npy          int64 Store << 32 | day, the sorted lookup index
+#   <dir>/date.npy         datetime64[D]
+#   <dir>/<column>.npy     float64 (NA -> NaN; MarkDowns are mostly NA before Nov 2011)
+#   <dir>/IsHoliday.npy    bool
+#   <dir>/stores.npy, offsets.npy, meta.json
+#   <dir>/derived/*.npy    features written by lag / rolling / holiday_*
+# Features are computed in blocks of whole stores, so lags and windows never
+# cross a store boundary and memory is bounded by the block, not the file.
+# The store is rebuilt only when the CSV changed (mtime/size).
+#
+#   fs = FeatureStore.build("features.csv", "feature_store")
+#   fs.rolling("Temperature", 4, out=fs.derived("Temperature_ma4"))
+#   fs.lookup(1, "2012-03-01")          # point in time: last row on or before that date
+#
+# python feature_store.py [features.csv]  -> build the store, derive DERIVED, print a sample
+# python feature_store.py bench 100       -> same on a generated 100x features.csv, checked against pandas
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIR = os.path.join(HERE, "..", ".cache", "walmart_features")
+
+STORE_VERSION = 1
+NUMERIC = ["Temperature", "Fuel_Price", "MarkDown1", "MarkDown2", "MarkDown3", "MarkDown4", "MarkDown5",
+           "CPI", "Unemployment"]
+MARKDOWNS = [f"MarkDown{i}" for i in range(1, 6)]
+COLUMNS = NUMERIC + ["IsHoliday"]
+DAY_BIAS = 1 << 31   # keeps the day part of the key non-negative for pre-1970 dates
+
+
+def make_key(stores, dates):
+    days = np.asarray(dates, dtype="datetime64[D]").astype("int64") + DAY_BIAS
+    return (np.asarray(stores, dtype="int64") << 32) | days
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime": st.st_mtime}
+
+
+class FeatureStore:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        load = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        self.key = load("key")
+        self.date = load("date")
+        self.stores = np.load(os.path.join(path, "stores.npy"))
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self.columns = {c: load(c) for c in COLUMNS}
+
+    @property
+    def shape(self):
+        return (len(self.key), len(self.columns))
+
+    # -----------------------------
+    # Build (chunked CSV -> spill files -> sorted .npy columns)
+    # -----------------------------
+    @classmethod
+    def build(cls, csv_path, path, chunksize=500_000, force=False):
+        """Open the store at path, (re)building it from csv_path if missing or stale."""
+        meta_path = os.path.join(path, "meta.json")
+        if not force and os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            stamp = _source_stamp(csv_path)
+            if meta.get("version") == STORE_VERSION and \
+                    (meta["source"]["size"], meta["source"]["mtime"]) == (stamp["size"], stamp["mtime"]):
+                return cls(path)
+
+        tmp = f"{path}.tmp{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        spill = {name: open(os.path.join(tmp, f"{name}.bin"), "wb") for name in ["key"] + COLUMNS}
+        try:
+            for chunk in pd.read_csv(csv_path, chunksize=chunksize, usecols=["Store", "Date"] + COLUMNS,
+                                     dtype={"Store": "int64", **{c: "float64" for c in NUMERIC}}):
+                dates = pd.to_datetime(chunk["Date"], format="%Y-%m-%d").to_numpy()
+                make_key(chunk["Store"].to_numpy(), dates).tofile(spill["key"])
+                for c in NUMERIC:
+                    chunk[c].to_numpy().tofile(spill[c])
+                chunk["IsHoliday"].astype(str).str.upper().eq("TRUE").to_numpy().tofile(spill["IsHoliday"])
+        finally:
+            for f in spill.values():
+                f.close()
+
+        # The sort key and its permutation are the only full-length arrays held in RAM (16 bytes/row)
+        key = np.fromfile(os.path.join(tmp, "key.bin"), dtype="int64")
+        perm = np.argsort(key, kind="stable")
+        key = key[perm]
+        keep = np.ones(len(key), dtype=bool)
+        keep[:-1] = key[1:] != key[:-1]   # duplicate (Store, Date): the later row wins
+        perm, key = perm[keep], key[keep]
+        np.save(os.path.join(tmp, "key.npy"), key)
+        dates = ((key & 0xFFFFFFFF) - DAY_BIAS).astype("datetime64[D]")
+        np.save(os.path.join(tmp, "date.npy"), dates)
+        stores, offsets = np.unique(key >> 32, return_index=True)
+        np.save(os.path.join(tmp, "stores.npy"), stores)
+        np.save(os.path.join(tmp, "offsets.npy"), np.append(offsets, len(key)).astype("int64"))
+
+        nulls = {}
+        for c in COLUMNS:
+            raw_path = os.path.join(tmp, f"{c}.bin")
+            raw = np.memmap(raw_path, dtype=bool if c == "IsHoliday" else "float64", mode="r")
+            out = open_memmap(os.path.join(tmp, f"{c}.npy"), mode="w+", dtype=raw.dtype, shape=(len(perm),))
+            n_null = 0
+            for a in range(0, len(perm), chunksize):
+                block = raw[perm[a:a + chunksize]]
+                out[a:a + chunksize] = block
+                if c != "IsHoliday":
+                    n_null += int(np.isnan(block).sum())
+            nulls[c] = n_null
+            out.flush()
+            del raw, out
+            os.remove(raw_path)
+        os.remove(os.path.join(tmp, "key.bin"))
+
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": STORE_VERSION, "source": _source_stamp(csv_path), "rows": int(len(key)),
+                       "dropped_duplicates": int((~keep).sum()), "nulls": nulls,
+                       "dates": [str(dates.min()), str(dates.max())] if len(dates) else None}, f, indent=2)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+        return cls(path)
+
+    # -----------------------------
+    # Partitions
+    # -----------------------------
+    def partition(self, store):
+        """Row slice of one store."""
+        k = np.searchsorted(self.stores, store)
+        if k == len(self.stores) or self.stores[k] != store:
+            raise KeyError(f"store {store} not in the feature store")
+        return slice(int(self.offsets[k]), int(self.offsets[k + 1]))
+
+    def blocks(self, block_rows=1 << 20):
+        """(first store index, last store index + 1) runs of whole stores, about block_rows rows each."""
+        k0 = 0
+        while k0 < len(self.stores):
+            k1 = int(np.searchsorted(self.offsets, self.offsets[k0] + block_rows, side="right")) - 1
+            k1 = min(max(k1, k0 + 1), len(self.stores))
+            yield k0, k1
+            k0 = k1
+
+    def _bounds(self, k0, k1):
+        # per row of the block: start / end (exclusive) of its store, relative to the block
+        lo = self.offsets[k0]
+        counts = np.diff(self.offsets[k0:k1 + 1])
+        return np.repeat(self.offsets[k0:k1] - lo, counts), np.repeat(self.offsets[k0 + 1:k1 + 1] - lo, counts)
+
+    def column(self, name, rows=slice(None), fill=None):
+        """A column (or a row slice of it) as an in-memory array; fill replaces NA."""
+        x = np.array(self.columns[name][rows])
+        if fill is not None:
+            x[np.isnan(x)] = fill
+        return x
+
+    def frame(self, store=None, columns=None):
+        """Rows of one store (or all) as a DataFrame, with any derived columns asked for."""
+        rows = self.partition(store) if store is not None else slice(None)
+        data = {"Store": (self.key[rows] >> 32).astype("int64"), "Date": self.date[rows].astype("datetime64[ns]")}
+        for c in columns or COLUMNS:
+            data[c] = self.columns[c][rows] if c in self.columns else self.load_derived(c)[rows]
+        return pd.DataFrame(data)
+
+    # -----------------------------
+    # Derived features (blockwise; out is an array or a derived() memmap)
+    # -----------------------------
+    def derived(self, name):
+        os.makedirs(os.path.join(self.path, "derived"), exist_ok=True)
+        return open_memmap(os.path.join(self.path, "derived", f"{name}.npy"), mode="w+", dtype="float64",
+                           shape=(len(self.key),))
+
+    def load_derived(self, name):
+        return np.load(os.path.join(self.path, "derived", f"{name}.npy"), mmap_mode="r")
+
+    def _apply(self, fn, out, block_rows):
+        out = np.empty(len(self.key)) if out is None else out
+        for k0, k1 in self.blocks(block_rows):
+            lo, hi = int(self.offsets[k0]), int(self.offsets[k1])
+            starts, ends = self._bounds(k0, k1)
+            out[lo:hi] = fn(lo, hi, starts, ends)
+        if isinstance(out, np.memmap):
+            out.flush()
+        return out
+
+    def lag(self, name, k=1, out=None, block_rows=1 << 20):
+        """Value k rows earlier in the same store (k < 0: later); NaN at store edges."""
+        def block(lo, hi, starts, ends):
+            x = self.column(name, slice(lo, hi))
+            src = np.arange(hi - lo) - k
+            valid = (src >= starts) & (src < ends)
+            res = np.full(hi - lo, np.nan)
+            res[valid] = x[src[valid]]
+            return res
+        return self._apply(block, out, block_rows)
+
+    def rolling(self, name, window, stat="mean", min_periods=1, out=None, block_rows=1 << 20):
+        """Trailing window of `window` rows (current row included) within each store; NA values are skipped.
+        stat: sum / mean / std / count."""
+        def block(lo, hi, starts, ends):
+            x = self.column(name, slice(lo, hi))
+            ok = ~np.isnan(x)
+            if stat == "std":
+                x = x - np.nanmean(x) if ok.any() else x   # centred, so the sum of squares doesn't cancel
+            x = np.where(ok, x, 0.0)
+            i = np.arange(hi - lo)
+            a = np.maximum(i + 1 - window, starts)
+            cum = lambda v: np.concatenate([[0], np.cumsum(v)])
+            cn, cs = cum(ok), cum(x)
+            n = cn[i + 1] - cn[a]
+            s = cs[i + 1] - cs[a]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                if stat == "sum":
+                    res = s
+                elif stat == "mean":
+                    res = s / n
+                elif stat == "count":
+                    return n.astype("float64")
+                elif stat == "std":
+                    ss = cum(x * x)
+                    var = (ss[i + 1] - ss[a] - s * s / n) / (n - 1)
+                    var[var < 64 * np.finfo("float64").eps * ss[i + 1]] = 0   # rounding noise of the running sums
+                    res = np.sqrt(var)
+                    res[n < 2] = np.nan
+                else:
+                    raise ValueError(f"unknown rolling stat {stat!r}")
+            res[n < max(min_periods, 1)] = np.nan
+            return res
+        return self._apply(block, out, block_rows)
+
+    def _holiday_days(self, lo, hi, starts, ends, direction):
+        h = np.asarray(self.columns["IsHoliday"][lo:hi])
+        days = self.date[lo:hi].astype("int64")
+        i = np.arange(hi - lo)
+        if direction == "since":
+            j = np.maximum.accumulate(np.where(h, i, -1))
+            valid = j >= starts
+        else:
+            j = np.minimum.accumulate(np.where(h, i, hi - lo)[::-1])[::-1]
+            valid = j < ends
+        res = np.full(hi - lo, np.nan)
+        res[valid] = np.abs(days[valid] - days[j[valid]])
+        return res
+
+    def holiday_distance(self, direction="since", out=None, block_rows=1 << 20):
+        """Days since the last (or, direction="until", to the next) holiday week of the same store; NaN if none."""
+        return self._apply(lambda lo, hi, starts, ends: self._holiday_days(lo, hi, starts, ends, direction),
+                           out, block_rows)
+
+    def holiday_window(self, before=1, after=1, out=None, block_rows=1 << 20):
+        """1.0 for weeks within `before` weeks ahead of or `after` weeks past a holiday week, else 0.0."""
+        def block(lo, hi, starts, ends):
+            with np.errstate(invalid="ignore"):
+                return ((self._holiday_days(lo, hi, starts, ends, "until") <= 7 * before) |
+                        (self._holiday_days(lo, hi, starts, ends, "since") <= 7 * after))
+        return self._apply(block, out, block_rows)
+
+    # -----------------------------
+    # Point-in-time lookups (binary search on the sorted key)
+    # -----------------------------
+    def lookup(self, store, date, columns=None, exact=False):
+        """Row of `store` as of `date`: the last week on or before it (exact=True: that date only)."""
+        rows = self.partition(store)
+        d = np.datetime64(date, "D")
+        j = rows.start + int(np.searchsorted(self.date[rows], d, side="right")) - 1
+        if j < rows.start or (exact and self.date[j] != d):
+            raise KeyError(f"no row for store {store} {'on' if exact else 'on or before'} {d}")
+        row = {"Store": store, "Date": self.date[j]}
+        row.update({c: self.columns[c][j] if c in self.columns else self.load_derived(c)[j]
+                    for c in columns or COLUMNS})
+        return pd.Series(row)
+
+    def lookup_many(self, stores, dates, columns=None, exact=False):
+        """Vectorized lookup(): one row per (store, date) pair; NaN where nothing matches."""
+        stores = np.asarray(stores, dtype="int64")
+        q = make_key(stores, dates)
+        j = np.searchsorted(self.key, q, side="right") - 1
+        jc = np.maximum(j, 0)
+        found = (j >= 0) & ((self.key[jc] >> 32) == stores)
+        if exact:
+            found &= self.key[jc] == q
+        hit = jc[found]
+        out = pd.DataFrame({"Store": stores, "Date": np.asarray(dates, dtype="datetime64[ns]")})
+        matched = np.full(len(q), np.datetime64("NaT"), dtype="datetime64[D]")
+        matched[found] = self.date[hit]
+        out["matched_date"] = matched.astype("datetime64[ns]")
+        for c in columns or COLUMNS:
+            src = self.columns[c] if c in self.columns else self.load_derived(c)
+            vals = np.full(len(q), np.nan)
+            vals[found] = src[hit]
+            out[c] = vals
+        return out
+
+
+# name -> (FeatureStore method, args)
+DERIVED = {
+    "Temperature_ma4": ("rolling", "Temperature", 4, "mean"),
+    "Temperature_std13": ("rolling", "Temperature", 13, "std"),
+    "Fuel_Price_lag1": ("lag", "Fuel_Price", 1),
+    "Fuel_Price_ma13": ("rolling", "Fuel_Price", 13, "mean"),
+    "CPI_lag4": ("lag", "CPI", 4),
+    "Unemployment_lag13": ("lag", "Unemployment", 13),
+    **{f"{md}_ma4": ("rolling", md, 4, "mean") for md in MARKDOWNS},
+    **{f"{md}_count13": ("rolling", md, 13, "count") for md in MARKDOWNS},
+    "days_since_holiday": ("holiday_distance", "since"),
+    "days_until_holiday": ("holiday_distance", "until"),
+    "holiday_window": ("holiday_window", 1, 1),
+}
+
+
+def derive_all(fs, features=None, block_rows=1 << 20):
+    """Write every DERIVED feature (or the ones named) to <store>/derived/."""
+    for name in features or DERIVED:
+        method, *args = DERIVED[name]
+        getattr(fs, method)(*args, out=fs.derived(name), block_rows=block_rows)
+    return fs
+
+
+def _check(fs):
+    # The blockwise features against pandas groupby on the whole frame
+    df = fs.frame(columns=COLUMNS + list(DERIVED))
+    g = df.groupby("Store")
+    ref = {
+        "Temperature_ma4": g["Temperature"].transform(lambda s: s.rolling(4, min_periods=1).mean()),
+        "Temperature_std13": g["Temperature"].transform(lambda s: s.rolling(13, min_periods=2).std()),
+        "Fuel_Price_lag1": g["Fuel_Price"].shift(1),
+        "Unemployment_lag13": g["Unemployment"].shift(13),
+        "MarkDown1_ma4": g["MarkDown1"].transform(lambda s: s.rolling(4, min_periods=1).mean()),
+        "MarkDown2_count13": g["MarkDown2"].transform(lambda s: s.rolling(13, min_periods=0).count()),
+    }
+    for name, expected in ref.items():
+        # windows are differences of running sums: exact to float rounding of the block's cumulative sum
+        np.testing.assert_allclose(df[name], expected, rtol=1e-7, atol=1e-6, err_msg=name)
+
+    # Point-in-time lookups against merge_asof
+    rng = np.random.default_rng(0)
+    q = pd.DataFrame({"Store": rng.choice(fs.stores, 2000),
+                      "Date": df["Date"].min() + pd.to_timedelta(rng.integers(-10, 1300, 2000), "D")})
+    got = fs.lookup_many(q["Store"], q["Date"], columns=["CPI"])
+    exp = pd.merge_asof(q.reset_index().sort_values("Date"), df[["Store", "Date", "CPI"]].sort_values("Date"),
+                        on="Date", by="Store").set_index("index").sort_index()
+    np.testing.assert_allclose(got["CPI"], exp["CPI"], err_msg="lookup_many")
+    row = q.iloc[0]
+    try:
+        assert fs.lookup(row["Store"], row["Date"])["CPI"] == got["CPI"].iloc[0] or np.isnan(got["CPI"].iloc[0])
+    except KeyError:
+        assert pd.isna(got["matched_date"].iloc[0])
+
+
+def _bench(scale=100):
+    sys.path.insert(0, os.path.join(HERE, ".."))
+    from bench.generators import write_dataset
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        csv_path = write_dataset("walmart", scale, root=tmp)["features"]
+        print(f"Wrote {scale}x features.csv ({os.path.getsize(csv_path) / 1e6:.0f} MB) "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+        t0 = time.perf_counter()
+        fs = FeatureStore.build(csv_path, os.path.join(tmp, "store"))
+        print(f"Cold build: {time.perf_counter() - t0:.1f}s  ({fs.meta['rows']:,} rows, {len(fs.stores):,} stores)")
+        t0 = time.perf_counter()
+        fs = FeatureStore.build(csv_path, os.path.join(tmp, "store"))
+        print(f"Reopen (CSV unchanged): {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+        t0 = time.perf_counter()
+        pd.read_csv(csv_path, parse_dates=["Date"]).groupby("Store")["Temperature"].transform(
+            lambda s: s.rolling(4, min_periods=1).mean())
+        print(f"pandas read_csv + one grouped rolling mean: {time.perf_counter() - t0:.1f}s")
+        t0 = time.perf_counter()
+        derive_all(fs, block_rows=1 << 16)
+        print(f"{len(DERIVED)} derived features (blocks of 64k rows): {time.perf_counter() - t0:.1f}s")
+
+        rng = np.random.default_rng(1)
+        stores = rng.choice(fs.stores, 100_000)
+        dates = np.datetime64("2010-01-01") + rng.integers(0, 1400, 100_000).astype("timedelta64[D]")
+        t0 = time.perf_counter()
+        fs.lookup_many(stores, dates, columns=["CPI", "Temperature_ma4"])
+        print(f"lookup_many, 100k (Store, Date) pairs: {(time.perf_counter() - t0) * 1000:.0f} ms")
+        t0 = time.perf_counter()
+        for s, d in zip(stores[:1000], dates[:1000]):
+            try:
+                fs.lookup(s, d, columns=["CPI"])
+            except KeyError:
+                pass
+        print(f"lookup, per call: {(time.perf_counter() - t0) * 1000:.0f} us")   # 1000 calls: ms total = us each
+
+        t0 = time.perf_counter()
+        _check(fs)
+        print(f"Matches pandas groupby / merge_asof ({time.perf_counter() - t0:.1f}s)")
+        del fs
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        _bench(int(sys.argv[2]) if len(sys.argv) > 2 else 100)
+    else:
+        fs = derive_all(FeatureStore.build(sys.argv[1] if len(sys.argv) > 1 else os.path.join(HERE, "features.csv"),
+                                           DEFAULT_DIR))
+        print(json.dumps({k: fs.meta[k] for k in ["rows", "dates", "nulls"]}, indent=2))
+        print(fs.frame(int(fs.stores[0]), ["Temperature", "Temperature_ma4", "MarkDown1", "MarkDown1_ma4",
+                                           "IsHoliday", "days_until_holiday", "holiday_window"]).tail(8).to_string())
+        print(fs.lookup(int(fs.stores[0]), "2012-03-01", ["CPI", "Fuel_Price", "Fuel_Price_lag1"]))
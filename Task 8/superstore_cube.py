@@ -0,0 +1,320 @@
+# superstore_cube.py
+#
+# Pre-aggregated OLAP cube over Superstore.csv (the data behind Superstore.pbix).
+# Order dates are parsed once into a Month level. The dimensions are
+# dictionary-encoded to integer codes (labels in meta.json, codes stable
+# across appends). Measures are summed into a few cuboids (group-bys over
+# common dimension combinations) plus the base cuboid over every dimension.
+# A query is answered from the smallest cuboid that holds its dimensions by
+# summing cells. Rolling up (Region, Year) or drilling down (State, Month)
+# only changes which cells get summed; rows are never rescanned.
+# refresh() reads only the bytes appended to the CSV since the last build
+# and merges them into every cuboid.
+#
+#   cube = SuperstoreCube.open()                     # builds / refreshes as needed
+#   cube.query(["Year", "Region"], where={"Category": "Technology"})
+#   cube.drill_down(["Year", "Region"], "Region")     # -> Year x State
+#
+# python superstore_cube.py            -> build/refresh and print a few pivots
+# python superstore_cube.py bench 100  -> cube vs row scans on a generated 100x Superstore.csv
+
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIR = os.path.join(HERE, "..", ".cache", "superstore_cube")
+
+CUBE_VERSION = 1
+DIMENSIONS = ["Month", "Segment", "Region", "State", "Category", "Sub-Category"]
+MEASURES = ["Sales", "Quantity", "Discount", "Profit"]   # Discount is stored summed, reported as a mean
+USECOLS = ["Order Date", "Segment", "Region", "State", "Category", "Sub-Category"] + MEASURES
+
+# Common pivots; the base cuboid (every dimension) answers anything else
+CUBOIDS = [
+    ("Month", "Region", "Category"),
+    ("Month", "Segment", "Category"),
+    ("Region", "State", "Category", "Sub-Category"),
+    tuple(DIMENSIONS),
+]
+
+# Derived time levels, computed from the Month label ("2016-11")
+TIME_LEVELS = {
+    "Year": lambda m: m[:4],
+    "Quarter": lambda m: f"{m[:4]}-Q{(int(m[5:7]) - 1) // 3 + 1}",
+}
+
+# level -> next finer level
+DRILL = {"Year": "Quarter", "Quarter": "Month", "Region": "State", "Category": "Sub-Category"}
+ROLL = {child: parent for parent, child in DRILL.items()}
+
+
+def read_rows(source, names=None):
+    """Superstore rows (path or buffer) reduced to the cube's columns, dates parsed to months."""
+    df = pd.read_csv(source, usecols=USECOLS, names=names, header=0 if names is None else None,
+                     encoding="latin-1", dtype={c: "float64" for c in MEASURES})
+    # a few thousand distinct dates however many rows: parse each one once
+    codes, dates = pd.factorize(df.pop("Order Date"))
+    df["Month"] = pd.to_datetime(dates, format="%m/%d/%Y").strftime("%Y-%m").to_numpy(object)[codes]
+    return df
+
+
+def _tail_sha1(path, offset, n=4096):
+    with open(path, "rb") as f:
+        f.seek(max(offset - n, 0))
+        return hashlib.sha1(f.read(min(n, offset))).hexdigest()
+
+
+class SuperstoreCube:
+    def __init__(self, path=DEFAULT_DIR):
+        self.path = path
+        self.labels = {d: [] for d in DIMENSIONS}
+        self.cuboids = {dims: None for dims in CUBOIDS}
+        self.source = None
+
+    # -----------------------------
+    # Build / incremental append
+    # -----------------------------
+    @classmethod
+    def open(cls, csv_path=os.path.join(HERE, "Superstore.csv"), path=DEFAULT_DIR):
+        """Load the saved cube and bring it up to date with csv_path."""
+        cube = cls(path)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["version"] == CUBE_VERSION and [tuple(c) for c in meta["cuboids"]] == CUBOIDS:
+                cube.labels, cube.source = meta["labels"], meta["source"]
+                with np.load(os.path.join(path, "cube.npz"), allow_pickle=False) as z:
+                    for i, dims in enumerate(CUBOIDS):
+                        cube.cuboids[dims] = pd.DataFrame({c: z[f"c{i}__{c}"] for c in dims + ("Rows", *MEASURES)})
+        cube.refresh(csv_path)
+        return cube
+
+    def refresh(self, csv_path):
+        """Merge rows appended to csv_path since the last build (full rebuild if it was rewritten).
+        Returns the number of rows added."""
+        size = os.path.getsize(csv_path)
+        src = self.source
+        if src and os.path.abspath(csv_path) == src["path"] and src["offset"] <= size \
+                and _tail_sha1(csv_path, src["offset"]) == src["tail_sha1"]:
+            if size == src["offset"]:
+                return 0
+            with open(csv_path, "rb") as f:
+                f.seek(src["offset"])
+                data = f.read()
+            data = data[:data.rfind(b"\n") + 1]   # a row still being written waits for the next refresh
+            if not data.strip():
+                return 0
+            new = read_rows(io.BytesIO(data), names=src["header"])
+            offset = src["offset"] + len(data)
+        else:
+            self.labels = {d: [] for d in DIMENSIONS}
+            self.cuboids = {dims: None for dims in CUBOIDS}
+            new = read_rows(csv_path)
+            offset = size
+        self.append(new)
+        header = list(pd.read_csv(csv_path, nrows=0, encoding="latin-1").columns)
+        self.source = {"path": os.path.abspath(csv_path), "offset": offset,
+                       "tail_sha1": _tail_sha1(csv_path, offset), "header": header}
+        self.save()
+        return len(new)
+
+    def encode(self, df):
+        """Dimension codes for df's rows; unseen labels are appended to the dictionaries."""
+        codes = {}
+        for d in DIMENSIONS:
+            values = df[d].astype(str)
+            index = pd.Index(self.labels[d])
+            new = pd.Index(values.unique()).difference(index)
+            if len(new):
+                self.labels[d] += sorted(new)
+                index = pd.Index(self.labels[d])
+            codes[d] = index.get_indexer(values).astype("int32")
+        return codes
+
+    def append(self, df):
+        """Aggregate new rows into every cuboid (df: read_rows() output)."""
+        base = pd.DataFrame(self.encode(df))
+        base["Rows"] = np.int64(1)
+        for m in MEASURES:
+            base[m] = df[m].to_numpy()
+        base = base.groupby(DIMENSIONS, sort=False, as_index=False).sum()
+        for dims in CUBOIDS:
+            cells = base.groupby(list(dims), sort=False, as_index=False)[["Rows", *MEASURES]].sum()
+            if self.cuboids[dims] is not None:
+                cells = pd.concat([self.cuboids[dims], cells], ignore_index=True) \
+                    .groupby(list(dims), sort=False, as_index=False).sum()
+            self.cuboids[dims] = cells
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        arrays = {f"c{i}__{c}": self.cuboids[dims][c].to_numpy()
+                  for i, dims in enumerate(CUBOIDS) for c in dims + ("Rows", *MEASURES)}
+        tmp = os.path.join(self.path, f"cube.tmp{os.getpid()}.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, os.path.join(self.path, "cube.npz"))
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": CUBE_VERSION, "cuboids": CUBOIDS, "labels": self.labels,
+                       "source": self.source}, f)
+
+    # -----------------------------
+    # Queries (answered from cuboid cells)
+    # -----------------------------
+    def _level_codes(self, cells, level):
+        # (codes per cell, labels) for a stored dimension or a time level derived from Month
+        if level in TIME_LEVELS:
+            derived = [TIME_LEVELS[level](m) for m in self.labels["Month"]]
+            labels = sorted(set(derived))
+            lookup = pd.Index(labels).get_indexer(derived)
+            return lookup[cells["Month"].to_numpy()], labels
+        if level not in self.labels:
+            raise KeyError(f"unknown level {level!r}; levels: {DIMENSIONS + list(TIME_LEVELS)}")
+        return cells[level].to_numpy(), self.labels[level]
+
+    def cuboid_for(self, levels):
+        """The smallest precomputed cuboid holding every level."""
+        need = {"Month" if lv in TIME_LEVELS else lv for lv in levels}
+        return min((dims for dims in CUBOIDS if need <= set(dims)), key=lambda dims: len(self.cuboids[dims]))
+
+    def query(self, by, where=None, measures=None):
+        """Measures summed by the `by` levels. where: {level: value | [values] | (first, last)}.
+        Discount comes back as the mean discount per order line."""
+        by = [by] if isinstance(by, str) else list(by)
+        where = where or {}
+        measures = measures or MEASURES
+        cells = self.cuboids[self.cuboid_for(by + list(where))]
+
+        keep = np.ones(len(cells), dtype=bool)
+        for level, cond in where.items():
+            codes, labels = self._level_codes(cells, level)
+            labels = pd.Index(labels)
+            if isinstance(cond, tuple):
+                first, last = cond
+                wanted = np.flatnonzero((labels >= str(first)) & (labels <= str(last)))
+            else:
+                wanted = labels.get_indexer([str(c) for c in (cond if isinstance(cond, list) else [cond])])
+            keep &= np.isin(codes, wanted[wanted >= 0])
+
+        sums = cells.loc[keep, ["Rows", *MEASURES]]
+        if not by:
+            out = sums.sum().to_frame().T
+        else:
+            keys = {}
+            for level in by:
+                codes, labels = self._level_codes(cells, level)
+                keys[level] = pd.Categorical.from_codes(codes[keep], categories=labels)
+            out = sums.groupby([keys[lv] for lv in by], observed=True).sum()
+            out.index.names = by
+            out = out.sort_index()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["Discount"] = out["Discount"] / out["Rows"]
+        return out[measures + ["Rows"]]
+
+    def drill_down(self, by, level, **kw):
+        """query() with `level` replaced by its next finer level (Region -> State, Year -> Quarter ...)."""
+        by = list(by)
+        by[by.index(level)] = DRILL[level]
+        return self.query(by, **kw)
+
+    def roll_up(self, by, level, **kw):
+        """query() with `level` replaced by its parent, or dropped at the top of its hierarchy."""
+        by = [ROLL.get(lv, lv) if lv == level else lv for lv in by if lv != level or lv in ROLL]
+        return self.query(by, **kw)
+
+
+def scan_query(rows, by, where=None, measures=None):
+    """The same answer as SuperstoreCube.query by scanning rows (read_rows output); for checks."""
+    by = [by] if isinstance(by, str) else list(by)
+    df = rows.copy()
+    for level, fn in TIME_LEVELS.items():
+        if level in by or level in (where or {}):
+            df[level] = df["Month"].map(fn)
+    for level, cond in (where or {}).items():
+        if isinstance(cond, tuple):
+            df = df[(df[level] >= str(cond[0])) & (df[level] <= str(cond[1]))]
+        else:
+            df = df[df[level].isin([str(c) for c in (cond if isinstance(cond, list) else [cond])])]
+    df = df.assign(Rows=1)
+    agg = {**{m: "sum" for m in MEASURES}, "Discount": "mean", "Rows": "sum"}
+    out = df.groupby(by).agg(agg).sort_index() if by else df.agg(agg).to_frame().T
+    return out[(measures or MEASURES) + ["Rows"]]
+
+
+QUERIES = [
+    (["Year", "Region"], {}),
+    (["Month", "Category"], {"Region": "West"}),
+    (["Quarter", "Segment"], {"Category": ["Technology", "Furniture"]}),
+    (["State", "Sub-Category"], {}),
+    (["Region", "State"], {"Year": ("2015", "2016")}),
+    (["Segment"], {"Month": ("2016-01", "2016-06"), "State": "California"}),
+    ([], {"Year": "2017"}),
+]
+
+
+def _check(cube, rows):
+    for by, where in QUERIES:
+        got = cube.query(by, where)
+        exp = scan_query(rows, by, where)
+        pd.testing.assert_frame_equal(got.reset_index(drop=not by), exp.reset_index(drop=not by),
+                                      check_dtype=False, check_index_type=False, check_categorical=False,
+                                      rtol=1e-9, obj=f"{by} {where}")
+
+
+def _bench(scale=100):
+    sys.path.insert(0, os.path.join(HERE, ".."))
+    from bench.generators import write_dataset
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        csv_path = write_dataset("superstore", scale, root=tmp)["superstore"]
+        print(f"Wrote {scale}x Superstore.csv ({os.path.getsize(csv_path) / 1e6:.0f} MB) "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+        # Build on the first 90% of the file, then append the rest
+        with open(csv_path, "rb") as f:
+            data = f.read()
+        cut = data.rfind(b"\n", 0, len(data) * 9 // 10) + 1
+        part = os.path.join(tmp, "part.csv")
+        with open(part, "wb") as f:
+            f.write(data[:cut])
+        t0 = time.perf_counter()
+        cube = SuperstoreCube.open(part, os.path.join(tmp, "cube"))
+        print(f"Cold build (90% of rows): {time.perf_counter() - t0:.1f}s  "
+              f"cells: {', '.join(f'{len(c):,}' for c in cube.cuboids.values())}")
+        with open(part, "ab") as f:
+            f.write(data[cut:])
+        t0 = time.perf_counter()
+        cube = SuperstoreCube.open(part, os.path.join(tmp, "cube"))
+        print(f"Reopen + append last 10%: {time.perf_counter() - t0:.2f}s")
+
+        t0 = time.perf_counter()
+        rows = read_rows(csv_path)
+        print(f"Row scan load (read_csv + date parse): {time.perf_counter() - t0:.1f}s  ({len(rows):,} rows)")
+        for by, where in QUERIES:
+            t0 = time.perf_counter()
+            cube.query(by, where)
+            t_cube = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            scan_query(rows, by, where)
+            t_scan = time.perf_counter() - t0
+            print(f"  {' x '.join(by) or '(total)':22s} {str(where)[:40]:40s} cube {t_cube * 1000:7.1f} ms   "
+                  f"scan {t_scan * 1000:8.1f} ms")
+        _check(cube, rows)
+        print("Appended cube matches row scans")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        _bench(int(sys.argv[2]) if len(sys.argv) > 2 else 100)
+    else:
+        cube = SuperstoreCube.open()
+        pd.set_option("display.width", 120)
+        print(cube.query(["Year", "Region"])[["Sales", "Profit"]].unstack("Region").round(0))
+        print(cube.drill_down(["Region"], "Region", where={"Region": "West"}).round(2))
+        print(cube.query(["Category", "Segment"], measures=["Profit", "Discount"]).round(3))
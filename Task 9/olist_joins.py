@@ -0,0 +1,82 @@
+# olist_joins.py
+#
+# Join planner for the Olist star schema.
+# order_items is the fact table (one row per order item). Payments and
+# reviews are many-per-order, so joining them raw multiplies item rows and
+# inflates every revenue sum; they are pre-aggregated to order grain first.
+# Each join only brings the columns the downstream metrics ask for, every
+# join is checked as many-to-one, and the row count is reported per stage.
+
+
+def payments_by_order(payments):
+    p = payments.sort_values(["order_id", "payment_sequential"])
+    return p.groupby("order_id", sort=False, observed=True).agg(
+        payment_value=("payment_value", "sum"),
+        payment_installments=("payment_installments", "max"),
+        payment_type=("payment_type", "first"),      # type of the first payment
+        payment_count=("payment_sequential", "count"),
+    ).reset_index()
+
+
+def reviews_by_order(reviews):
+    return reviews.groupby("order_id", sort=False, observed=True).agg(
+        review_score=("review_score", "mean"),
+    ).reset_index()
+
+
+# (table, join key, columns it can provide, pre-aggregation to one row per key)
+JOINS = [
+    ("products", "product_id", ["product_category_name", "product_weight_g"], None),
+    ("orders", "order_id", ["customer_id", "order_status", "order_purchase_timestamp",
+                            "order_approved_at", "order_delivered_customer_date",
+                            "order_estimated_delivery_date"], None),
+    ("customers", "customer_id", ["customer_unique_id", "customer_city", "customer_state"], None),
+    ("payments", "order_id", ["payment_value", "payment_installments", "payment_type",
+                              "payment_count"], payments_by_order),
+    ("reviews", "order_id", ["review_score"], reviews_by_order),
+]
+
+ITEM_COLUMNS = ["order_id", "order_item_id", "product_id", "seller_id", "price", "freight_value"]
+
+# Columns each metric in task9_olist_analysis.py reads
+METRIC_COLUMNS = {
+    "monthly_sales": ["order_purchase_timestamp", "order_id", "price", "freight_value"],
+    "cat_sales": ["product_category_name", "price", "freight_value"],
+    "state_sales": ["customer_state", "price", "freight_value"],
+}
+
+
+def plan_joins(needed):
+    """Pick the joins (and their columns) that provide `needed`, including bridge keys."""
+    needed = set(needed)
+    plan = []
+    for table, key, provides, agg in reversed(JOINS):
+        cols = [c for c in provides if c in needed]
+        if cols:
+            plan.append((table, key, cols, agg))
+            if key not in ITEM_COLUMNS:
+                needed.add(key)      # e.g. customers needs customer_id from orders
+    plan.reverse()
+    item_cols = [c for c in ITEM_COLUMNS if c in needed or c in {k for _, k, _, _ in plan}]
+    return item_cols, plan
+
+
+def build_order_items(data, metrics=None, needed=None, verbose=True):
+    """Item-grain frame with just the columns the given metrics need."""
+    if needed is None:
+        metrics = metrics or list(METRIC_COLUMNS)
+        needed = {c for m in metrics for c in METRIC_COLUMNS[m]}
+    item_cols, plan = plan_joins(needed)
+
+    df = data["items"][item_cols]
+    if verbose:
+        print(f"  items: {len(df):,} rows")
+    for table, key, cols, agg in plan:
+        right = data[table]
+        if agg is not None:
+            right = agg(right)
+        right = right[[key] + cols]
+        df = df.merge(right, on=key, how="left", validate="m:1")
+        if verbose:
+            print(f"  + {table} [{', '.join(cols)}]: {len(df):,} rows")
+    return df
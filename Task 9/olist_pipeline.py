@@ -0,0 +1,144 @@
+import os
+import pandas as pd
+from common.charts import line_chart, bar_chart, pie_chart
+from common.pipeline import Pipeline
+from olist_joins import build_order_items
+from olist_loader import load_olist
+
+# -----------------------------
+# Olist analysis as pipeline stages (run it with task9_olist_analysis.py)
+# order_items (clean) and the metric tables (aggregate) are kept in the stage
+# cache, so a chart-only change reruns just render.
+# -----------------------------
+FILES = {
+    "orders": "olist_orders_dataset.csv",
+    "items": "olist_order_items_dataset.csv",
+    "products": "olist_products_dataset.csv",
+    "customers": "olist_customers_dataset.csv",
+    "payments": "olist_order_payments_dataset.csv",
+    "reviews": "olist_order_reviews_dataset.csv"
+}
+
+CHARTS = ["monthly_revenue.png", "top_categories.png", "payment_types.png", "review_scores.png",
+          "revenue_by_state.png"]
+
+
+# -----------------------------
+# Step 1: Load datasets
+# -----------------------------
+def load(_, ctx):
+    # Loaded in parallel with typed schemas (ids/low-cardinality text as category,
+    # timestamps parsed while reading) - see olist_loader.py
+    return load_olist({name: os.path.join(ctx.data_dir, f) for name, f in FILES.items()})
+
+
+# -----------------------------
+# Step 2: Data cleaning
+# -----------------------------
+def clean(data, ctx):
+    # (date columns are already parsed by the loader)
+    # Merge datasets (item grain; payments/reviews are pre-aggregated per order so
+    # they can't multiply item rows, and only the columns the metrics use are joined)
+    print("\nJoin plan:")
+    order_items = build_order_items(data, ["monthly_sales", "cat_sales", "state_sales"])
+
+    # Add revenue column
+    order_items["revenue"] = order_items["price"] + order_items["freight_value"]
+
+    # Pass on only what the later stages read (keeps the cached output small)
+    return {
+        "order_items": order_items,
+        "orders": data["orders"][["order_id", "order_purchase_timestamp", "order_delivered_customer_date"]],
+        "customers": data["customers"][["customer_id"]],
+        "payments": data["payments"][["payment_type"]],
+        "reviews": data["reviews"][["review_score"]],
+    }
+
+
+# -----------------------------
+# Step 3: Exploratory analysis
+# -----------------------------
+def aggregate(data, ctx):
+    order_items, orders = data["order_items"], data["orders"]
+
+    # Revenue trend over time
+    monthly_sales = order_items.groupby(order_items["order_purchase_timestamp"].dt.to_period("M")).agg(
+        revenue=("revenue", "sum"),
+        orders=("order_id", "nunique")
+    ).reset_index()
+    monthly_sales["order_purchase_timestamp"] = monthly_sales["order_purchase_timestamp"].astype(str)
+
+    # Top product categories
+    cat_sales = order_items.groupby("product_category_name", observed=True)["revenue"].sum().sort_values(ascending=False).head(10)
+    cat_sales.index = cat_sales.index.astype(str)
+
+    # Payment types
+    pay_type = data["payments"]["payment_type"].value_counts()
+
+    # Revenue by customer state
+    state_sales = order_items.groupby("customer_state", observed=True)["revenue"].sum().sort_values(ascending=False).head(10)
+    state_sales.index = state_sales.index.astype(str)
+
+    # Key figures for the insights printout
+    summary = pd.Series({
+        "total_revenue": order_items["revenue"].sum(),
+        "total_orders": orders["order_id"].nunique(),
+        "total_customers": data["customers"]["customer_id"].nunique(),
+        "avg_delivery": (orders["order_delivered_customer_date"] - orders["order_purchase_timestamp"]).dt.days.mean(),
+        "avg_review": data["reviews"]["review_score"].mean(),
+    })
+
+    # Review scores (the chart only needs the counts)
+    review_counts = data["reviews"]["review_score"].value_counts().sort_index()
+
+    return {"monthly_sales": monthly_sales, "cat_sales": cat_sales, "pay_type": pay_type,
+            "state_sales": state_sales, "review_counts": review_counts, "summary": summary}
+
+
+# -----------------------------
+# Charts + Step 4: Print key insights
+# -----------------------------
+def render(agg, ctx):
+    monthly_sales, cat_sales, state_sales = agg["monthly_sales"], agg["cat_sales"], agg["state_sales"]
+
+    ctx.charts.submit(line_chart(monthly_sales["order_purchase_timestamp"], monthly_sales["revenue"],
+                                 "monthly_revenue.png", marker="o", figsize=(10, 5), rotation=45,
+                                 title="Monthly Revenue Trend", xlabel="order_purchase_timestamp",
+                                 ylabel="revenue"))
+    ctx.charts.submit(bar_chart(cat_sales, "top_categories.png", horizontal=True, figsize=(10, 5),
+                                title="Top 10 Product Categories by Revenue", xlabel="Revenue"))
+    ctx.charts.submit(pie_chart(agg["pay_type"], "payment_types.png", autopct="%1.1f%%", figsize=(6, 6),
+                                title="Payment Type Distribution"))
+    # Review score distribution
+    ctx.charts.submit(bar_chart(agg["review_counts"], "review_scores.png", palette="viridis", figsize=(6, 4),
+                                title="Customer Review Score Distribution", xlabel="review_score",
+                                ylabel="count"))
+    ctx.charts.submit(bar_chart(state_sales, "revenue_by_state.png", figsize=(10, 5),
+                                title="Top 10 States by Revenue", xlabel="State", ylabel="Revenue"))
+
+    summary = agg["summary"]
+    print("\n📊 Business Insights:")
+    print(f"- Total Revenue: R$ {summary['total_revenue']:,.2f}")
+    print(f"- Total Orders: {int(summary['total_orders'])}")
+    print(f"- Total Customers: {int(summary['total_customers'])}")
+
+    print("\nTop 5 Categories by Revenue:")
+    print(cat_sales.head())
+
+    print("\nTop 5 States by Revenue:")
+    print(state_sales.head())
+
+    print(f"\n- Average Delivery Time: {summary['avg_delivery']:.1f} days")
+    print(f"- Average Review Score: {summary['avg_review']:.2f}/5")
+
+    print(f"\n✅ Charts saved: {', '.join(CHARTS)}")
+    return agg
+
+
+PIPELINE = Pipeline(
+    "task9-olist",
+    [("load", load), ("clean", clean), ("aggregate", aggregate), ("render", render)],
+    args=[(("--data-dir",), {"default": ".", "help": "folder with the Olist CSVs (default: current)"})],
+    cached=["clean", "aggregate"],
+    inputs=lambda ctx: [os.path.join(ctx.data_dir, f) for f in FILES.values()],
+)
@@ -0,0 +1,2 @@
+# Benchmark suite: synthetic scale-up data (generators.py) and a headless
+# harness that times every analysis script's core computation (suite.py).
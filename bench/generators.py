@@ -0,0 +1,368 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+# =========================
+# Synthetic scale-up datasets
+# One generator per input schema the scripts read. scale=1 is about the size
+# of the real file, and row counts grow linearly with scale (1x .. 1000x).
+# Output is deterministic for (scale, seed). Chunks are generated in a process
+# pool and appended in order, so big files never have to fit in memory.
+#
+#   paths = write_dataset("olist", scale=10)   # {"orders": ".../olist_orders_dataset.csv", ...}
+# =========================
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = os.path.normpath(os.path.join(HERE, "..", ".cache", "bench"))
+CHUNK_UNITS = 500_000
+
+
+def hex_ids(salt, idx):
+    # 32-char hex ids like Olist's; the salt keeps the id spaces of different tables apart
+    return pd.Series(np.asarray(idx)).map(f"{salt:08x}{{:024x}}".format).to_numpy()
+
+
+def ts_text(values):
+    # "YYYY-mm-dd HH:MM:SS" (NaT -> ""); much faster than letting to_csv format datetimes
+    values = np.asarray(values, dtype="datetime64[s]")
+    out = np.datetime_as_string(values, unit="s")
+    out.view("U1").reshape(len(out), -1)[:, 10] = " "
+    return np.where(np.isnat(values), "", out).astype(object)
+
+
+def us_date(values):
+    # m/d/Y without zero padding, as Superstore writes it
+    d = pd.DatetimeIndex(values)
+    return (d.month.astype(str) + "/" + d.day.astype(str) + "/" + d.year.astype(str)).to_numpy()
+
+
+def dup_rows(df, rng, rate):
+    # Repeat the previous row now and then so drop_duplicates has real work
+    idx = np.arange(len(df))
+    dup = (rng.random(len(df)) < rate) & (idx > 0)
+    idx[dup] -= 1
+    return df.iloc[idx].reset_index(drop=True)
+
+
+# -----------------------------
+# Titanic train.csv (units: passengers)
+# -----------------------------
+def titanic_chunk(start, n, total, rng):
+    pclass = rng.choice([1, 2, 3], n, p=[0.24, 0.21, 0.55])
+    female = rng.random(n) < 0.35
+    p_survive = np.where(female, 0.74, 0.19) * np.choose(pclass - 1, [1.3, 1.1, 0.8])
+    fare = rng.lognormal(np.choose(pclass - 1, [4.2, 3.0, 2.3]), 0.6).round(4)
+    age = rng.normal(29.7, 14.5, n).clip(0.42, 80).round(0)
+    cabin = np.array([f"{d}{k}" for d, k in zip(rng.choice(list("ABCDEF"), n), rng.integers(1, 130, n))],
+                     dtype=object)
+    return {"train": pd.DataFrame({
+        "PassengerId": np.arange(start + 1, start + n + 1),
+        "Survived": (rng.random(n) < np.minimum(p_survive, 0.97)).astype(int),
+        "Pclass": pclass,
+        "Name": [f"Passenger {i}, Mr. Synthetic" for i in range(start + 1, start + n + 1)],
+        "Sex": np.where(female, "female", "male"),
+        "Age": np.where(rng.random(n) < 0.2, np.nan, age),
+        "SibSp": rng.choice([0, 1, 2, 3, 4], n, p=[0.68, 0.23, 0.04, 0.03, 0.02]),
+        "Parch": rng.choice([0, 1, 2, 3], n, p=[0.76, 0.13, 0.09, 0.02]),
+        "Ticket": rng.integers(100000, 400000, n).astype(str),
+        "Fare": fare,
+        "Cabin": np.where((rng.random(n) < 0.77) & (pclass > 1), None, cabin),
+        "Embarked": np.where(rng.random(n) < 0.002, None, rng.choice(["S", "C", "Q"], n, p=[0.72, 0.19, 0.09])),
+    })}
+
+
+# -----------------------------
+# Online Retail (units: invoice lines, ~21 per invoice, in date order)
+# -----------------------------
+COUNTRIES = ["United Kingdom"] * 9 + ["Germany", "France", "EIRE", "Spain", "Netherlands"]
+
+
+def online_retail_chunk(start, n, total, rng):
+    rows = np.arange(start, start + n)
+    invoice = rows // 21
+    n_invoices = max(total // 21, 1)
+    minutes = (invoice * (373 * 24 * 60) // n_invoices).astype("timedelta64[m]")
+    cancelled = rng.random(n) < 0.02
+    n_customers = max(total // 124, 1)
+    customer = (12346 + (invoice * 7919) % n_customers).astype("float64")
+    customer[rng.random(n) < 0.25] = np.nan
+    qty = rng.geometric(0.12, n)
+    df = pd.DataFrame({
+        "InvoiceNo": np.where(cancelled, "C", "") + (536365 + invoice).astype(str),
+        "StockCode": (84000 + rng.zipf(1.6, n) % 4000).astype(str),
+        "Description": "SYNTHETIC ITEM",
+        "Quantity": np.where(cancelled, -qty, qty),
+        "InvoiceDate": ts_text(np.datetime64("2010-12-01T08:26") + minutes),
+        "UnitPrice": rng.gamma(1.5, 2.2, n).round(2),
+        "CustomerID": customer,
+        "Country": np.asarray(COUNTRIES)[(invoice * 31) % len(COUNTRIES)],
+    })
+    return {"retail": dup_rows(df, rng, 0.01)}
+
+
+# -----------------------------
+# Kaggle DS survey 2017-2021 (units: respondents)
+# -----------------------------
+SURVEY_CHOICES = {
+    "Q1": (["Male", "Female", "Prefer not to say", "Nonbinary", ""], [0.78, 0.18, 0.02, 0.01, 0.01]),
+    "Q2": (["18-21", "22-24", "25-29", "30-34", "35-39", "40-44", "45-49", "50+"],
+           [0.17, 0.19, 0.2, 0.15, 0.11, 0.08, 0.05, 0.05]),
+    "Q3": (["India", "United States of America", "Other", "Brazil", "Japan", "China", "Nigeria", ""],
+           [0.28, 0.16, 0.2, 0.06, 0.06, 0.05, 0.04, 0.15]),
+    "Q4": (["Master’s degree", "Bachelor’s degree", "Doctoral degree", "Professional degree",
+            "Some college/university study without earning a bachelor’s degree", "I prefer not to answer", ""],
+           [0.38, 0.33, 0.12, 0.05, 0.05, 0.02, 0.05]),
+    "Q5": (["Student", "Data Scientist", "Software Engineer", "Data Analyst", "Research Scientist",
+            "Machine Learning Engineer", "Other", ""], [0.26, 0.14, 0.11, 0.1, 0.06, 0.05, 0.08, 0.2]),
+    "Q24": (["$0-999", "1,000-1,999", "10,000-14,999", "50,000-59,999", "100,000-124,999",
+             "> $500,000", "300,000-500,000", ""], [0.12, 0.05, 0.08, 0.07, 0.06, 0.01, 0.01, 0.6]),
+}
+SURVEY_TOOLS = ["Python", "R", "SQL", "C++", "Java", "Julia"]
+
+
+def survey_chunk(start, n, total, rng):
+    df = pd.DataFrame({"Year": rng.choice([2017, 2018, 2019, 2020, 2021], n)})
+    for col, (values, p) in SURVEY_CHOICES.items():
+        df[col] = rng.choice(values, n, p=p)
+    for i, tool in enumerate(SURVEY_TOOLS, 1):
+        df[f"Q7_Part_{i}"] = np.where(rng.random(n) < 0.5 / i, tool, "")
+    return {"survey": dup_rows(df, rng, 0.01)}
+
+
+# -----------------------------
+# Olist (units: orders; ~1.13 items, ~1.04 payments, ~1 review per order)
+# -----------------------------
+OLIST_FILES = {
+    "orders": "olist_orders_dataset.csv", "items": "olist_order_items_dataset.csv",
+    "products": "olist_products_dataset.csv", "customers": "olist_customers_dataset.csv",
+    "payments": "olist_order_payments_dataset.csv", "reviews": "olist_order_reviews_dataset.csv",
+}
+STATES = ["SP", "RJ", "MG", "RS", "PR", "SC", "BA", "DF", "GO", "ES", "PE", "CE"]
+CATEGORIES = ["cama_mesa_banho", "beleza_saude", "esporte_lazer", "moveis_decoracao",
+              "informatica_acessorios", "utilidades_domesticas", "relogios_presentes",
+              "telefonia", "ferramentas_jardim", "automotivo", "brinquedos", "perfumaria"]
+
+
+def olist_chunk(start, n, total, rng):
+    orders = np.arange(start, start + n)
+    order_ids = hex_ids(1, orders)
+    customer_ids = hex_ids(2, orders)          # Olist: one customer_id per order
+    purchase = np.datetime64("2016-09-04") + (orders * (730 * 86400) // max(total, 1)).astype("timedelta64[s]")
+    day = np.timedelta64(1, "D")
+    delivered = purchase + rng.integers(2, 30, n) * day
+    status = rng.choice(["delivered", "shipped", "canceled", "invoiced"], n, p=[0.97, 0.015, 0.01, 0.005])
+    out = {"orders": pd.DataFrame({
+        "order_id": order_ids, "customer_id": customer_ids, "order_status": status,
+        "order_purchase_timestamp": ts_text(purchase),
+        "order_approved_at": ts_text(purchase + np.timedelta64(1, "h")),
+        "order_delivered_carrier_date": ts_text(purchase + 2 * day),
+        "order_delivered_customer_date": ts_text(np.where(status == "delivered", delivered, np.datetime64("NaT"))),
+        "order_estimated_delivery_date": ts_text(purchase + 24 * day),
+    })}
+
+    n_unique = max(total * 96 // 99, 1)
+    out["customers"] = pd.DataFrame({
+        "customer_id": customer_ids,
+        "customer_unique_id": hex_ids(3, rng.integers(0, n_unique, n)),
+        "customer_zip_code_prefix": rng.integers(1000, 99999, n),
+        "customer_city": "cidade",
+        "customer_state": rng.choice(STATES, n),
+    })
+
+    n_products = max(total // 3, 1)
+    per_order = 1 + rng.geometric(0.88, n) - 1
+    item_order = np.repeat(orders, per_order)
+    m = len(item_order)
+    out["items"] = pd.DataFrame({
+        "order_id": hex_ids(1, item_order),
+        "order_item_id": np.concatenate([np.arange(1, k + 1) for k in per_order]),
+        "product_id": hex_ids(4, rng.zipf(1.3, m) % n_products),
+        "seller_id": hex_ids(5, rng.integers(0, max(total // 32, 1), m)),
+        "shipping_limit_date": ts_text(np.repeat(purchase + 6 * day, per_order)),
+        "price": rng.lognormal(4.3, 0.9, m).round(2),
+        "freight_value": rng.gamma(2.5, 8.0, m).round(2),
+    })
+
+    # this chunk's slice of the product catalogue
+    p0, p1 = start * n_products // max(total, 1), (start + n) * n_products // max(total, 1)
+    k = p1 - p0
+    out["products"] = pd.DataFrame({
+        "product_id": hex_ids(4, np.arange(p0, p1)),
+        "product_category_name": np.where(rng.random(k) < 0.02, None, rng.choice(CATEGORIES, k)),
+        "product_name_lenght": rng.integers(10, 70, k), "product_description_lenght": rng.integers(50, 3000, k),
+        "product_photos_qty": rng.integers(1, 8, k), "product_weight_g": rng.integers(50, 30000, k),
+        "product_length_cm": rng.integers(10, 100, k), "product_height_cm": rng.integers(2, 100, k),
+        "product_width_cm": rng.integers(8, 100, k),
+    })
+
+    n_pay = 1 + (rng.random(n) < 0.04)
+    pay_order = np.repeat(orders, n_pay)
+    out["payments"] = pd.DataFrame({
+        "order_id": hex_ids(1, pay_order),
+        "payment_sequential": np.concatenate([np.arange(1, k + 1) for k in n_pay]),
+        "payment_type": rng.choice(["credit_card", "boleto", "voucher", "debit_card"], len(pay_order),
+                                   p=[0.74, 0.19, 0.05, 0.02]),
+        "payment_installments": rng.integers(1, 11, len(pay_order)),
+        "payment_value": rng.lognormal(4.6, 0.9, len(pay_order)).round(2),
+    })
+
+    reviewed = orders[rng.random(n) < 0.99]
+    out["reviews"] = pd.DataFrame({
+        "review_id": hex_ids(6, reviewed),
+        "order_id": hex_ids(1, reviewed),
+        "review_score": rng.choice([1, 2, 3, 4, 5], len(reviewed), p=[0.11, 0.03, 0.08, 0.19, 0.59]),
+        "review_creation_date": ts_text(purchase[reviewed - start] + 10 * day),
+        "review_answer_timestamp": ts_text(purchase[reviewed - start] + 12 * day),
+    })
+    return out
+
+
+# -----------------------------
+# Superstore (units: order lines, ~2 per order)
+# -----------------------------
+SUPERSTORE_PRODUCTS = {
+    "Furniture": ["Bookcases", "Chairs", "Furnishings", "Tables"],
+    "Office Supplies": ["Appliances", "Art", "Binders", "Envelopes", "Fasteners", "Labels", "Paper",
+                        "Storage", "Supplies"],
+    "Technology": ["Accessories", "Copiers", "Machines", "Phones"],
+}
+SUPERSTORE_STATES = {"California": "West", "Washington": "West", "New York": "East", "Pennsylvania": "East",
+                     "Texas": "Central", "Illinois": "Central", "Florida": "South", "Kentucky": "South"}
+
+
+def superstore_chunk(start, n, total, rng):
+    rows = np.arange(start, start + n)
+    order = rows // 2
+    dates = np.datetime64("2014-01-03") + (order * 1457 // max(total // 2, 1)).astype("timedelta64[D]")
+    ship = dates + rng.integers(0, 7, n).astype("timedelta64[D]")
+    pairs = [(c, s) for c, subs in SUPERSTORE_PRODUCTS.items() for s in subs]
+    pick = rng.integers(0, len(pairs), n)
+    state = rng.choice(list(SUPERSTORE_STATES), n)
+    sales = rng.lognormal(4.0, 1.3, n).round(4)
+    discount = rng.choice([0, 0.1, 0.2, 0.3, 0.5, 0.8], n, p=[0.48, 0.05, 0.37, 0.03, 0.03, 0.04])
+    years = (dates.astype("datetime64[Y]").astype(int) + 1970).astype(str)
+    return {"superstore": pd.DataFrame({
+        "Row ID": rows + 1,
+        "Order ID": np.char.add(np.char.add("CA-", years), np.char.add("-", (100000 + order % 900000).astype(str))).astype(object),
+        "Order Date": us_date(dates),
+        "Ship Date": us_date(ship),
+        "Ship Mode": rng.choice(["Standard Class", "Second Class", "First Class", "Same Day"], n,
+                                p=[0.6, 0.19, 0.16, 0.05]),
+        "Customer ID": np.char.add("CG-", (10000 + order * 13 % 793).astype(str)).astype(object),
+        "Customer Name": "Synthetic Customer",
+        "Segment": rng.choice(["Consumer", "Corporate", "Home Office"], n, p=[0.52, 0.3, 0.18]),
+        "Country": "United States",
+        "City": "City",
+        "State": state,
+        "Postal Code": rng.integers(10000, 99999, n),
+        "Region": pd.Series(state).map(SUPERSTORE_STATES).to_numpy(),
+        "Product ID": np.char.add("OFF-", (10000000 + pick * 1000 + rng.integers(0, 100, n)).astype(str)).astype(object),
+        "Category": [pairs[i][0] for i in pick],
+        "Sub-Category": [pairs[i][1] for i in pick],
+        "Product Name": "Synthetic Product",
+        "Sales": sales,
+        "Quantity": rng.integers(1, 14, n),
+        "Discount": discount,
+        "Profit": (sales * (0.25 - discount) * rng.uniform(0.5, 1.5, n)).round(4),
+    })}
+
+
+# -----------------------------
+# Walmart features.csv (units: stores, 182 weeks each)
+# -----------------------------
+WALMART_WEEKS = 182
+HOLIDAY_WEEKS = {"2010-02-12", "2010-09-10", "2010-11-26", "2010-12-31", "2011-02-11", "2011-09-09",
+                 "2011-11-25", "2011-12-30", "2012-02-10", "2012-09-07", "2012-11-23", "2012-12-28",
+                 "2013-02-08"}
+
+
+def walmart_chunk(start, n, total, rng):
+    weeks = np.datetime64("2010-02-05") + np.arange(WALMART_WEEKS) * np.timedelta64(7, "D")
+    m = n * WALMART_WEEKS
+    store = np.repeat(np.arange(start + 1, start + n + 1), WALMART_WEEKS)
+    date = np.tile(weeks, n)
+    t = np.tile(np.arange(WALMART_WEEKS), n)
+    df = pd.DataFrame({
+        "Store": store,
+        "Date": np.datetime_as_string(date, unit="D"),
+        "Temperature": (60 + 25 * np.sin(2 * np.pi * (t - 10) / 52) + rng.normal(0, 5, m)).round(2),
+        "Fuel_Price": (2.6 + t * 0.008 + rng.normal(0, 0.05, m)).round(3),
+    })
+    # MarkDowns only exist from Nov 2011 on, and even then are sparse
+    has_md = date >= np.datetime64("2011-11-11")
+    for i in range(1, 6):
+        md = rng.lognormal(8, 1.2, m).round(2)
+        df[f"MarkDown{i}"] = np.where(has_md & (rng.random(m) < 0.8), md, np.nan)
+    df["CPI"] = (np.repeat(rng.uniform(126, 215, n), WALMART_WEEKS) * (1 + t * 0.0004)).round(7)
+    df["Unemployment"] = np.repeat(rng.uniform(4, 14, n), WALMART_WEEKS).round(3)
+    df.loc[t > 169, ["CPI", "Unemployment"]] = np.nan
+    df["IsHoliday"] = np.where(df["Date"].isin(HOLIDAY_WEEKS), "TRUE", "FALSE")
+    return {"features": df}
+
+
+# name -> (units at scale=1, {key: file name}, chunk generator, units per chunk)
+DATASETS = {
+    "titanic": (891, {"train": "train.csv"}, titanic_chunk, CHUNK_UNITS),
+    "online_retail": (541_909, {"retail": "Online Retail.csv"}, online_retail_chunk, CHUNK_UNITS),
+    "survey": (105_000, {"survey": "kaggle_survey_2017_2021.csv"}, survey_chunk, CHUNK_UNITS),
+    "olist": (99_441, OLIST_FILES, olist_chunk, CHUNK_UNITS // 2),
+    "superstore": (9_994, {"superstore": "Superstore.csv"}, superstore_chunk, CHUNK_UNITS),
+    "walmart": (45, {"features": "features.csv"}, walmart_chunk, 2_000),
+}
+
+
+def dataset_dir(name, scale, root=None, seed=0):
+    return os.path.join(root or DEFAULT_ROOT, f"{name}-x{scale:g}-s{seed}")
+
+
+def _write_chunk(name, i, start, n, total, seed, part_dir):
+    _, files, chunk_fn, _ = DATASETS[name]
+    parts = chunk_fn(start, n, total, np.random.default_rng([seed, i]))
+    out = {}
+    for key, df in parts.items():
+        out[key] = os.path.join(part_dir, f"{key}-{i:06d}.csv")
+        df.to_csv(out[key], header=i == 0, index=False, na_rep="NA" if name == "walmart" else "")
+    return out
+
+
+def write_dataset(name, scale=1, root=None, seed=0, force=False, max_workers=None):
+    """Generate `name` at `scale` (once; reused while complete). Returns {key: csv path}."""
+    from concurrent.futures import ProcessPoolExecutor
+    base, files, _, step = DATASETS[name]
+    out_dir = dataset_dir(name, scale, root, seed)
+    paths = {key: os.path.join(out_dir, fname) for key, fname in files.items()}
+    done = os.path.join(out_dir, ".complete")
+    if os.path.exists(done) and not force:
+        return paths
+
+    part_dir = os.path.join(out_dir, ".parts")
+    os.makedirs(part_dir, exist_ok=True)
+    total = max(int(round(base * scale)), 1)
+    starts = list(range(0, total, step))
+    args = [(name, i, s, min(step, total - s), total, seed, part_dir) for i, s in enumerate(starts)]
+    outs = {key: open(path, "wb") for key, path in paths.items()}
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as ex:
+            # map() yields in submission order, so parts are appended in order
+            for part in ex.map(_write_chunk, *zip(*args)):
+                for key, part_path in part.items():
+                    with open(part_path, "rb") as f:
+                        shutil.copyfileobj(f, outs[key], 1 << 20)
+                    os.remove(part_path)
+    finally:
+        for f in outs.values():
+            f.close()
+    os.rmdir(part_dir)
+    with open(done, "w") as f:
+        f.write(f"{name} scale={scale} seed={seed} units={total}\n")
+    return paths
+
+
+if __name__ == "__main__":
+    # python -m bench.generators <dataset|all> [scale]
+    import sys
+    names = list(DATASETS) if len(sys.argv) < 2 or sys.argv[1] == "all" else [sys.argv[1]]
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1
+    for n in names:
+        for key, p in write_dataset(n, scale).items():
+            print(f"{n}/{key}: {p} ({os.path.getsize(p) / 1e6:.1f} MB)")
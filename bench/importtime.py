@@ -0,0 +1,142 @@
+import os
+import re
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, ROOT)
+from bench.generators import write_dataset
+from bench.suite import CASES, RESULTS_DIR, load_case
+
+# =========================
+# Cold-start import benchmark for the entry points
+# Each entry point runs as `python -X importtime <script> --help` in a fresh
+# interpreter. argparse exits right after the module imports, before any data
+# is read. The per-module self times are summed (the best of --repeat runs).
+# The check fails when:
+#   - matplotlib or seaborn is imported at startup, or during a --no-charts
+#     run of the pipeline on a small generated dataset (data-only mode), or
+#   - an entry point's startup regressed by more than --threshold against
+#     the baseline saved on this machine (bench/results/importtime.json;
+#     --update writes it).
+#
+#   python -m bench.importtime             # check
+#   python -m bench.importtime --update    # record the current times as the baseline
+# =========================
+BASELINE = os.path.join(RESULTS_DIR, "importtime.json")
+PLOTTING = ("matplotlib", "seaborn")
+
+# name -> (script, bench.suite case for the data-only run, or None)
+ENTRY_POINTS = {
+    "titanic": ("Task 2/Titanic.py", "titanic"),
+    "task-3": ("Task 3/task-3.py", "task-3"),
+    "task-3.1": ("Task 3/task-3.1.py", "task-3.1"),
+    "task-3.2": ("Task 3/task-3.2.py", "task-3.2"),
+    "survey": ("Task 4/task4_survey_cleaning.py", "survey"),
+    "survey-stream": ("Task 4/task4_survey_cleaning.py", "survey-stream"),
+    "olist": ("Task 9/task9_olist_analysis.py", "olist"),
+    "indeed": ("Task 6/indeed_extract.py", None),
+}
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+def importtime(argv, cwd=ROOT):
+    """Run `python -X importtime argv`; returns (total self ms, {module: cumulative ms})."""
+    env = dict(os.environ, MPLBACKEND="Agg", PYTHONDONTWRITEBYTECODE="1")
+    out = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=cwd, env=env,
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited {out.returncode}:\n{out.stderr[-2000:]}")
+    total, modules = 0, {}
+    for line in out.stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if m:
+            total += int(m.group(1))
+            modules[m.group(4)] = int(m.group(2)) / 1e3
+    return total / 1e3, modules
+
+
+def plotting_modules(modules):
+    return sorted(m for m in modules if m.split(".")[0] in PLOTTING and "." not in m)
+
+
+def startup(repeat=3):
+    """{entry: (best total import ms, plotting modules imported)} for `<script> --help`."""
+    out = {}
+    for name, (script, _) in ENTRY_POINTS.items():
+        runs = [importtime([os.path.join(ROOT, script), "--help"]) for _ in range(repeat)]
+        ms, modules = min(runs, key=lambda r: r[0])
+        out[name] = (ms, plotting_modules(modules))
+    return out
+
+
+def data_only(scale=0.01, data_root=None):
+    """{entry: plotting modules imported} for a full --no-charts run on generated data."""
+    out = {}
+    for name, (script, case) in ENTRY_POINTS.items():
+        if case is None:
+            continue
+        paths = write_dataset(CASES[case][3], scale, data_root)
+        with tempfile.TemporaryDirectory() as out_dir:
+            argv = [os.path.join(ROOT, script), *CASES[case][4](paths), "--out-dir", out_dir,
+                    "--no-charts"]
+            if load_case(case).cached:
+                argv.append("--no-cache")
+            _, modules = importtime(argv)
+        out[name] = plotting_modules(modules)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.importtime")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per entry point (the fastest counts)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown vs the baseline")
+    parser.add_argument("--update", action="store_true", help="save the current times as the baseline")
+    parser.add_argument("--skip-data", action="store_true", help="only time startup (no data-only runs)")
+    parser.add_argument("--data-root", default=None, help="where generated data is kept (default .cache/bench)")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    failures = []
+    times = startup(args.repeat)
+    for name, (ms, plotting) in times.items():
+        base = baseline.get(name)
+        cells = [f"{name:<14} {ms:7.0f} ms"]
+        if base:
+            ratio = ms / base
+            cells.append(f"(baseline {base:.0f} ms, {ratio:.2f}x)")
+            if ratio > 1 + args.threshold and ms - base > 20:   # ignore noise on fast entry points
+                failures.append(f"{name}: startup {ms:.0f} ms vs baseline {base:.0f} ms")
+        if plotting:
+            cells.append(f"imports {', '.join(plotting)}!")
+            failures.append(f"{name}: imports {', '.join(plotting)} at startup")
+        print("  ".join(cells))
+
+    if not args.skip_data:
+        for name, plotting in data_only(data_root=args.data_root).items():
+            print(f"{name:<14} --no-charts run: " + (f"imports {', '.join(plotting)}!" if plotting else "no plotting"))
+            if plotting:
+                failures.append(f"{name}: a --no-charts run imports {', '.join(plotting)}")
+
+    if args.update:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump({name: round(ms, 1) for name, (ms, _) in times.items()}, f, indent=2)
+        print(f"Baseline: {BASELINE}")
+    elif not baseline:
+        print(f"No baseline at {BASELINE} (record one with --update)")
+
+    for msg in failures:
+        print("FAIL", msg)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
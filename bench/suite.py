@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import importlib
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, ROOT)
+from bench.generators import write_dataset
+from common.pipeline import Pipeline, run
+
+# =========================
+# Headless benchmark harness
+# Each case runs one script's pipeline (common/pipeline.py stages, as its CLI
+# would) on generated data, with charts rendered on Agg into a temp folder.
+# Every (case, scale) runs in a fresh spawned
+# process, so peak RSS belongs to that case alone. Results go to a JSON file;
+# `compare` diffs two of them.
+#
+#   python -m bench.suite run --scales 1 10 --cases olist task-3.1
+#   python -m bench.suite compare bench/results/old.json bench/results/new.json
+# =========================
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+
+# -----------------------------
+# Cases: each runs a script's pipeline exactly as its CLI would, on generated data
+# name -> (task folder, module, pipeline attribute, dataset, argv from the generated paths)
+# -----------------------------
+CASES = {
+    "titanic": ("Task 2", "titanic_pipeline", "PIPELINE", "titanic", lambda p: [p["train"]]),
+    "task-3": ("Task 3", "rfm_pipeline", "QUARTILES", "online_retail", lambda p: [p["retail"]]),
+    "task-3.1": ("Task 3", "rfm_pipeline", "SCORES", "online_retail", lambda p: [p["retail"]]),
+    "task-3.2": ("Task 3", "rfm_pipeline", "COHORTS", "online_retail", lambda p: [p["retail"]]),
+    "survey": ("Task 4", "survey_pipeline", "PIPELINE", "survey", lambda p: [p["survey"]]),
+    "survey-stream": ("Task 4", "survey_pipeline", "STREAM", "survey",
+                      lambda p: [p["survey"], "--chunksize", "200000"]),
+    "olist": ("Task 9", "olist_pipeline", "PIPELINE", "olist",
+              lambda p: ["--data-dir", os.path.dirname(p["orders"])]),
+    # Superstore and the Walmart features have no analysis script yet: parse only
+    "superstore-load": (None, "bench.suite", "SUPERSTORE_LOAD", "superstore", lambda p: [p["superstore"]]),
+    "walmart-load": (None, "bench.suite", "WALMART_LOAD", "walmart", lambda p: [p["features"]]),
+    "walmart-features": ("Task 7", "bench.suite", "WALMART_FEATURES", "walmart", lambda p: [p["features"]]),
+}
+
+
+def _read_superstore(_, ctx):
+    import pandas as pd
+    return pd.read_csv(ctx.input, parse_dates=["Order Date", "Ship Date"], date_format="%m/%d/%Y")
+
+
+def _read_features(_, ctx):
+    import pandas as pd
+    return pd.read_csv(ctx.input, parse_dates=["Date"])
+
+
+SUPERSTORE_LOAD = Pipeline("superstore-load", [("load", _read_superstore)], args=[(("input",), {})])
+WALMART_LOAD = Pipeline("walmart-load", [("load", _read_features)], args=[(("input",), {})])
+
+
+def _build_feature_store(_, ctx):
+    from feature_store import FeatureStore
+    return FeatureStore.build(ctx.input, os.path.join(ctx.out_dir, "feature_store"))
+
+
+def _derive_features(fs, ctx):
+    from feature_store import derive_all
+    return derive_all(fs)
+
+
+WALMART_FEATURES = Pipeline("walmart-features", [("load", _build_feature_store), ("features", _derive_features)],
+                            args=[(("input",), {})])
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:   # Windows
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 1e6
+        except (ImportError, AttributeError):
+            return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1e3   # bytes on macOS, KiB on Linux
+
+
+def load_case(name):
+    folder, module, attr, _, _ = CASES[name]
+    if folder:
+        path = os.path.join(ROOT, folder)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    return getattr(importlib.import_module(module), attr)
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+def run_case(name, paths, quiet=True):
+    """Run one case in this process (Agg backend, temp output dir); returns its record."""
+    os.environ["MPLBACKEND"] = "Agg"   # for the render workers; matplotlib loads only if a chart is drawn
+    rec = {"case": name, "status": "ok", "import_rss_mb": peak_rss_mb()}
+    stats = []
+    t0, c0 = time.perf_counter(), time.process_time()
+    try:
+        pipeline = load_case(name)
+        with tempfile.TemporaryDirectory() as out_dir:
+            argv = CASES[name][4](paths) + ["--out-dir", out_dir]
+            if pipeline.cached:
+                argv.append("--no-cache")   # time the computation, not the stage cache
+            args = pipeline.parse_args(argv)
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+                _, stats = run(pipeline, args)   # no tracemalloc: tracing would skew the timings
+    except Exception as e:   # record the failure, keep benchmarking the rest
+        rec.update(status="error", error=f"{type(e).__name__}: {e}")
+    rec.update(wall_s=time.perf_counter() - t0, cpu_s=time.process_time() - c0,
+               peak_rss_mb=peak_rss_mb(), rows=stats[0]["rows_out"] if stats else None,
+               stages={r["stage"]: r["wall_s"] for r in stats}, stage_stats=stats)
+    return rec
+
+
+def _isolated(name, paths):
+    with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as ex:
+        return ex.submit(run_case, name, paths).result()
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    import numpy as np
+    import pandas as pd
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": _git_commit(),
+            "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def run_suite(cases=None, scales=(1,), data_root=None, seed=0, isolate=True):
+    results = []
+    for scale in scales:
+        for name in cases or CASES:
+            dataset = CASES[name][3]
+            t0 = time.perf_counter()
+            paths = write_dataset(dataset, scale, data_root, seed)
+            gen_s = time.perf_counter() - t0
+            rec = _isolated(name, paths) if isolate else run_case(name, paths)
+            rec.update(scale=scale, dataset=dataset, seed=seed)
+            results.append(rec)
+            stages = "  ".join(f"{k}={v:.2f}s" for k, v in rec["stages"].items())
+            rss = f"{rec['peak_rss_mb']:.0f} MB" if rec["peak_rss_mb"] else "n/a"
+            print(f"{name:<16} x{scale:<5g} {rec['status']:<5} wall={rec['wall_s']:.2f}s  "
+                  f"rss={rss}  {stages}" + (f"  (data {gen_s:.1f}s)" if gen_s > 1 else ""))
+            if rec["status"] != "ok":
+                print("   ", rec["error"])
+    return results
+
+
+def compare(old_path, new_path, threshold=0.10):
+    """Print wall/stage time ratios new/old per (case, scale); returns the regressions."""
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["case"], r["scale"]): r for r in json.load(f)["results"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    regressions = []
+    for r in new:
+        o = old.get((r["case"], r["scale"]))
+        if o is None or r["status"] != "ok" or o["status"] != "ok":
+            continue
+        parts = [("wall", o["wall_s"], r["wall_s"])]
+        parts += [(k, o["stages"][k], v) for k, v in r["stages"].items() if k in o["stages"]]
+        cells = []
+        for label, a, b in parts:
+            ratio = b / a if a > 0 else float("inf")
+            flag = ""
+            if ratio > 1 + threshold and b - a > 0.05:   # ignore noise on tiny stages
+                flag = "!"
+                regressions.append((r["case"], r["scale"], label, ratio))
+            cells.append(f"{label}={b:.2f}s ({ratio:.2f}x){flag}")
+        print(f"{r['case']:<16} x{r['scale']:<5g} " + "  ".join(cells))
+    print(f"{len(regressions)} regression(s) over {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.suite")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="run cases and write a JSON results file")
+    run.add_argument("--cases", nargs="+", choices=list(CASES), default=None)
+    run.add_argument("--scales", nargs="+", type=float, default=[1])
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--data-root", default=None, help="where generated data is kept (default .cache/bench)")
+    run.add_argument("--out", default=None, help="results file (default bench/results/<time>-<commit>.json)")
+    run.add_argument("--inline", action="store_true", help="run in this process (no per-case RSS)")
+    cmp_ = sub.add_parser("compare", help="compare two results files")
+    cmp_.add_argument("old")
+    cmp_.add_argument("new")
+    cmp_.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "compare":
+        return 1 if compare(args.old, args.new, args.threshold) else 0
+
+    env = environment()
+    results = run_suite(args.cases, args.scales, args.data_root, args.seed, isolate=not args.inline)
+    out = args.out or os.path.join(
+        RESULTS_DIR, f"{env['timestamp'].replace(':', '')}-{env['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"environment": env, "results": results}, f, indent=2)
+    print(f"Results: {out}")
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
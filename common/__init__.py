@@ -0,0 +1 @@
+# Helpers shared by the task scripts (import with the repo root on sys.path).
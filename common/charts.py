@@ -0,0 +1,252 @@
+import os
+import io
+import struct
+import pickle
+import hashlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# =========================
+# Chart specs + a parallel Agg renderer
+# Stages describe a chart as a spec: kind, output path, options, and only
+# the aggregated numbers it draws (bar heights, histogram counts, a KDE
+# curve, a correlation matrix). Raw rows never get pickled to the workers.
+# ChartRenderer draws specs on the Agg backend in a process pool while the
+# pipeline carries on. A spec's digest is stored in its PNG, and rendering is
+# skipped when the existing file already has the same digest. matplotlib and
+# seaborn are imported only inside render_spec, so a run that renders nothing
+# (--no-charts, or every chart unchanged) never loads them.
+#
+#   ctx.charts.submit(bar_chart(cat_sales, "top_categories.png", title="Top 10"))
+#   ctx.charts.wait()   # (the pipeline runner does this at the end)
+# =========================
+RENDER_VERSION = 1
+DIGEST_KEY = "Chart-Digest"
+
+
+# -----------------------------
+# Spec builders (run in the pipeline process; each reduces its input)
+# -----------------------------
+def _spec(kind, path, data, **opts):
+    return {"kind": kind, "path": path, "data": data, "opts": opts}
+
+
+def bar_chart(series, path, horizontal=False, **opts):
+    """Bars from an already aggregated series (index = labels)."""
+    return _spec("bar", path, {"labels": [str(i) for i in series.index], "values": np.asarray(series, float)},
+                 horizontal=horizontal, **opts)
+
+
+def count_chart(values, path, **opts):
+    """countplot: one bar per distinct value, in sorted order."""
+    counts = values.value_counts().sort_index()
+    return bar_chart(counts, path, **opts)
+
+
+def mean_bar_chart(df, x, y, path, **opts):
+    """barplot of the mean of y per x with a 95% confidence interval (normal approximation)."""
+    g = df.groupby(x, observed=True)[y].agg(["mean", "std", "count"]).sort_index()
+    err = 1.96 * g["std"].fillna(0).to_numpy() / np.sqrt(g["count"].to_numpy())
+    spec = bar_chart(g["mean"], path, **opts)
+    spec["data"]["errors"] = err
+    return spec
+
+
+def interval_bar_chart(series, lower, upper, path, **opts):
+    """barplot of already aggregated values with an interval per bar (may be asymmetric, e.g. Wilson)."""
+    spec = bar_chart(series, path, **opts)
+    values = spec["data"]["values"]
+    spec["data"]["errors"] = np.vstack([values - np.asarray(lower, float), np.asarray(upper, float) - values])
+    return spec
+
+
+def line_chart(x, y, path, **opts):
+    return _spec("line", path, {"x": [str(v) for v in x], "y": np.asarray(y, float)}, **opts)
+
+
+def pie_chart(series, path, **opts):
+    return _spec("pie", path, {"labels": [str(i) for i in series.index], "values": np.asarray(series, float)},
+                 **opts)
+
+
+def kde_curve(values, n_grid=512):
+    """Gaussian KDE with Scott's bandwidth, binned onto a grid (cost grows with the grid, not the data)."""
+    v = np.asarray(values, float)
+    v = v[np.isfinite(v)]
+    if len(v) < 2 or v.std() == 0:
+        return None
+    bw = v.std(ddof=1) * len(v) ** (-1 / 5)
+    lo, hi = v.min(), v.max()
+    counts, edges = np.histogram(v, bins=n_grid, range=(lo, hi))
+    step = edges[1] - edges[0]
+    h = min(int(np.ceil(4 * bw / step)), 4 * n_grid)
+    kernel = np.exp(-0.5 * (np.arange(-h, h + 1) * step / bw) ** 2)
+    density = np.convolve(counts, kernel)[h:h + n_grid] / (len(v) * bw * np.sqrt(2 * np.pi))
+    return (edges[:-1] + edges[1:]) / 2, density
+
+
+def hist_chart(layers, path, bins=30, kde=False, weights=None, **opts):
+    """Histogram(s): layers = values or [(values, {"color": .., "label": ..}), ...].
+    weights (one layer only) counts each value that many times, e.g. for value_counts() input."""
+    if not isinstance(layers, list):
+        layers = [(layers, {})]
+    out = []
+    for values, style in layers:
+        v = np.asarray(values, float)
+        finite = np.isfinite(v)
+        w = None if weights is None else np.asarray(weights, float)[finite]
+        v = v[finite]
+        counts, edges = np.histogram(v, bins=bins, weights=w)
+        layer = {"counts": counts, "edges": edges, "style": dict(style)}
+        curve = kde_curve(v) if kde else None
+        if curve is not None:
+            # scaled to counts, as seaborn's histplot(kde=True) draws it
+            layer["kde"] = (curve[0], curve[1] * len(v) * (edges[1] - edges[0]))
+        out.append(layer)
+    return _spec("hist", path, {"layers": out}, **opts)
+
+
+def heatmap_chart(frame, path, **opts):
+    return _spec("heatmap", path, {"values": frame.to_numpy(float), "rows": [str(i) for i in frame.index],
+                                   "cols": [str(c) for c in frame.columns]}, **opts)
+
+
+def spec_digest(spec):
+    return hashlib.sha1(pickle.dumps((RENDER_VERSION, spec["kind"], spec["data"], sorted(spec["opts"].items())),
+                                     protocol=4)).hexdigest()
+
+
+# -----------------------------
+# Drawing (runs in the worker processes)
+# -----------------------------
+def _draw(spec, ax, plt, sns):
+    kind, d, o = spec["kind"], spec["data"], spec["opts"]
+    if kind == "bar":
+        # one colour unless a palette is given (seaborn's own default)
+        colors = {"hue": d["labels"], "palette": o["palette"], "legend": False} if o.get("palette") else {}
+        if o.get("horizontal"):
+            sns.barplot(x=d["values"], y=d["labels"], ax=ax, **colors)
+        else:
+            sns.barplot(x=d["labels"], y=d["values"], ax=ax, **colors)
+            if "errors" in d:
+                ax.errorbar(range(len(d["values"])), d["values"], yerr=d["errors"], fmt="none",
+                            ecolor="0.26", elinewidth=2.5)
+    elif kind == "line":
+        ax.plot(d["x"], d["y"], marker=o.get("marker"))
+    elif kind == "pie":
+        ax.pie(d["values"], labels=d["labels"], autopct=o.get("autopct"))
+        ax.set_aspect("equal")
+    elif kind == "hist":
+        for layer in d["layers"]:
+            style = layer["style"]
+            edges = layer["edges"]
+            ax.bar(edges[:-1], layer["counts"], width=np.diff(edges), align="edge", alpha=0.6 if len(
+                d["layers"]) > 1 else 0.9, color=style.get("color"), label=style.get("label"), edgecolor="white")
+            if "kde" in layer:
+                ax.plot(*layer["kde"], color=style.get("color") or "C0")
+        if any(layer["style"].get("label") for layer in d["layers"]):
+            ax.legend()
+    elif kind == "heatmap":
+        sns.heatmap(d["values"], annot=o.get("annot", True), cmap=o.get("cmap", "coolwarm"),
+                    fmt=o.get("fmt", ".2f"), xticklabels=d["cols"], yticklabels=d["rows"], ax=ax)
+    else:
+        raise ValueError(f"unknown chart kind {kind!r}")
+
+    if o.get("rotation") is not None:
+        ax.tick_params(axis="x", labelrotation=o["rotation"])
+    ax.set_title(o.get("title", ""))
+    if "xlabel" in o:
+        ax.set_xlabel(o["xlabel"])
+    if "ylabel" in o:
+        ax.set_ylabel(o["ylabel"])
+
+
+def render_spec(spec, digest=None, show=False):
+    """Draw one spec to its PNG (Agg unless show); returns the path."""
+    import matplotlib
+    if not show:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=spec["opts"].get("figsize"))
+    try:
+        _draw(spec, ax, plt, sns)
+        fig.tight_layout()
+        path = spec["path"]
+        tmp = f"{path}.tmp{os.getpid()}.png"
+        fig.savefig(tmp, dpi=spec["opts"].get("dpi"), metadata={DIGEST_KEY: digest or spec_digest(spec)})
+        os.replace(tmp, path)
+        if show:
+            plt.show()
+    finally:
+        plt.close(fig)
+    return spec["path"]
+
+
+def png_digest(path):
+    """The Chart-Digest text chunk of a PNG written by render_spec, or None."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(8) != b"\x89PNG\r\n\x1a\n":
+                return None
+            while True:
+                head = f.read(8)
+                if len(head) < 8:
+                    return None
+                length, ctype = struct.unpack(">I4s", head)
+                if ctype == b"tEXt":
+                    key, _, value = f.read(length).partition(b"\x00")
+                    if key.decode("latin-1") == DIGEST_KEY:
+                        return value.decode("latin-1")
+                    f.seek(4, io.SEEK_CUR)
+                elif ctype == b"IEND":
+                    return None
+                else:
+                    f.seek(length + 4, io.SEEK_CUR)
+    except OSError:
+        return None
+
+
+class ChartRenderer:
+    """Renders submitted specs in a process pool (or inline with show=True); enabled=False drops them."""
+
+    def __init__(self, out_dir=".", max_workers=None, show=False, enabled=True):
+        self.out_dir = out_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.show = show
+        self.enabled = enabled
+        self._pool = None
+        self.pending = []
+        self.rendered = []
+        self.unchanged = []
+        self.skipped = []
+
+    def submit(self, spec):
+        spec["path"] = os.path.join(self.out_dir, spec["path"])
+        if not self.enabled:
+            self.skipped.append(spec["path"])
+            return None
+        os.makedirs(os.path.dirname(spec["path"]) or ".", exist_ok=True)
+        digest = spec_digest(spec)
+        if not self.show and png_digest(spec["path"]) == digest:
+            self.unchanged.append(spec["path"])
+            return None
+        if self.show or self.max_workers <= 1:
+            self.rendered.append(render_spec(spec, digest, self.show))
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        fut = self._pool.submit(render_spec, spec, digest)
+        self.pending.append(fut)
+        return fut
+
+    def wait(self):
+        """Block until every submitted chart is written; returns (rendered, unchanged) path lists."""
+        for fut in self.pending:
+            self.rendered.append(fut.result())
+        self.pending = []
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        return self.rendered, self.unchanged
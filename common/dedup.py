@@ -0,0 +1,276 @@
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+
+# =========================
+# Row-fingerprint deduplication for the ingest paths
+# A row's fingerprint is a 64-bit hash of its values over a key subset, or over
+# every column (pd.util.hash_pandas_object: one vectorized pass per column).
+# The values are hashed as normalized text (value_text), so the fingerprint
+# doesn't depend on how the frame was typed: 5, 5.0 and "5" match, and a
+# categorical, plan-typed or dtype=str read of the same file fingerprints alike
+# (a whole-row fingerprint takes the columns in name order, not the reader's).
+# Deduplicator keeps the fingerprints seen so far as a sorted uint64 array and
+# drops every row whose fingerprint is already in it:
+#   - one frame:          the first occurrence of each row is kept, as drop_duplicates(subset=key)
+#   - streaming chunks:   rows already seen in an earlier chunk are dropped too
+#   - across runs:        with a store path the fingerprints are saved (.npz), so
+#                         rows an earlier run ingested are dropped as well
+# Rows and duplicates are counted per source file (report()).
+# csv_keep_mask streams a CSV without materializing the columns it doesn't need:
+# a keyed dedup parses only the key columns, a whole-row dedup parses nothing
+# and hashes each record's raw text (csv_records), so two rows only match
+# when they were written identically.
+# Two different rows collide with probability ~n^2 / 2^65 (about 1e-8 for a
+# million rows); the later one would then be dropped.
+#
+#   python common/dedup.py [rows] [columns]   # benchmark vs drop_duplicates on a wide survey-like CSV
+# =========================
+DEDUP_ARGS = [
+    (("--dedup-key",), {"nargs": "+", "metavar": "COL", "default": None,
+                        "help": "columns that identify a row for deduplication (default: every column)"}),
+    (("--dedup-store",), {"metavar": "NPZ", "default": None,
+                          "help": "fingerprint file kept across runs: rows ingested before are dropped too"}),
+]
+
+
+FINGERPRINT_VERSION = 2   # bumped when the hashed form of a row changes; older stores don't match
+_INTEGER = re.compile(r"[+-]?\d+")
+
+
+def _text(v):
+    if v is None or v is pd.NA or v is pd.NaT or (isinstance(v, float) and v != v):
+        return None
+    if isinstance(v, (bool, np.bool_)):
+        return str(bool(v))
+    if isinstance(v, (int, np.integer)):
+        return str(int(v))
+    if isinstance(v, (float, np.floating)):
+        return str(int(v)) if v.is_integer() else repr(float(v))
+    if isinstance(v, str):
+        if _INTEGER.fullmatch(v):
+            return str(int(v))
+        try:
+            f = float(v)
+        except ValueError:
+            return v
+        return _text(f) if "_" not in v and f == f else v
+    return str(v)
+
+
+def value_text(col):
+    """The column's values as text that depends only on the value, not the dtype:
+    numbers in canonical form (5, 5.0 and "5" -> "5"), categoricals through their
+    categories, missing -> None; returned as a Categorical, each distinct value converted once."""
+    codes, uniques = pd.factorize(col)
+    text_codes, texts = pd.factorize(np.array([_text(v) for v in np.asarray(uniques, dtype=object)],
+                                              dtype=object))
+    # a Categorical hashes as its values, without materializing one string per row
+    return pd.Categorical.from_codes(np.append(text_codes, -1)[codes], categories=texts)
+
+
+def fingerprint(df, key=None):
+    """uint64 hash per row over the key columns (all columns if None, in name order);
+    rows with equal values hash equal, whatever their dtypes or column order."""
+    if key:
+        missing = [c for c in key if c not in df.columns]
+        if missing:
+            raise ValueError(f"dedup key columns not in the data: {missing}")
+        df = df[key]
+    else:
+        df = df.iloc[:, np.argsort(df.columns.astype(str), kind="stable")]
+    text = pd.DataFrame({i: value_text(df.iloc[:, i]) for i in range(df.shape[1])})
+    return pd.util.hash_pandas_object(text, index=False).to_numpy()
+
+
+class Deduplicator:
+    def __init__(self, key=None, path=None):
+        self.key = list(key) if key else None
+        self.path = path
+        self.seen = np.zeros(0, dtype="uint64")   # sorted fingerprints
+        self.counts = {}                          # source -> [rows, duplicates] (this run)
+
+    @classmethod
+    def load(cls, path, key=None):
+        """Open the fingerprint store at path (empty if the file doesn't exist yet)."""
+        dedup = cls(key, path)
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as z:
+                version = int(z["version"]) if "version" in z else 1
+                if version != FINGERPRINT_VERSION:
+                    raise ValueError(f"{path} was written by fingerprint version {version}, "
+                                     f"not {FINGERPRINT_VERSION}; delete it to start a new store")
+                saved = z["key"].tolist() or None
+                if saved != dedup.key:
+                    raise ValueError(f"{path} holds fingerprints over {saved or 'whole rows'}, "
+                                     f"not {dedup.key or 'whole rows'}")
+                dedup.seen = z["fingerprints"]
+        return dedup
+
+    def save(self, path=None):
+        path = path or self.path
+        if path:
+            np.savez(path, key=np.array(self.key or [], dtype=str), fingerprints=self.seen,
+                     version=FINGERPRINT_VERSION)
+
+    def keep_mask(self, df, source=None):
+        """Boolean mask of the rows to keep: the first occurrence of each fingerprint not seen before."""
+        return self.keep_fingerprints(fingerprint(df, self.key), source)
+
+    def keep_fingerprints(self, fp, source=None):
+        """keep_mask for rows already fingerprinted (e.g. raw CSV records, record_fingerprints)."""
+        uniq, first = np.unique(fp, return_index=True)
+        pos = np.searchsorted(self.seen, uniq)
+        new = pos == len(self.seen)
+        new[~new] = self.seen[pos[~new]] != uniq[~new]
+        self.seen = np.insert(self.seen, pos[new], uniq[new])
+
+        keep = np.zeros(len(fp), dtype=bool)
+        keep[first[new]] = True
+        counts = self.counts.setdefault(source, [0, 0])
+        counts[0] += len(fp)
+        counts[1] += len(fp) - int(new.sum())
+        return keep
+
+    def drop(self, df, source=None):
+        """df without its duplicate rows (index kept, like drop_duplicates)."""
+        return df.take(np.flatnonzero(self.keep_mask(df, source)))
+
+    def report(self):
+        """rows / duplicates / kept per source, for this run."""
+        report = pd.DataFrame.from_dict(self.counts, orient="index", columns=["rows", "duplicates"])
+        report.index.name = "source"
+        report["kept"] = report["rows"] - report["duplicates"]
+        return report
+
+
+def from_args(ctx):
+    """The Deduplicator for a pipeline run's --dedup-key / --dedup-store."""
+    if ctx.dedup_store:
+        return Deduplicator.load(ctx.dedup_store, ctx.dedup_key)
+    return Deduplicator(ctx.dedup_key)
+
+
+def csv_records(path, chunksize=200_000, block_size=1 << 26):
+    """Raw text (bytes) of each data row of a CSV, in lists of up to chunksize, in step
+    with read_csv(path, chunksize=chunksize): the header and blank lines are skipped, and
+    a quoted field may span lines. Nothing is parsed; a block's record ends are the
+    newlines preceded by an even number of quotes."""
+    tail, header, out = b"", True, []
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            buf = tail + block
+            arr = np.frombuffer(buf, dtype=np.uint8)
+            newlines = np.flatnonzero(arr == ord("\n"))
+            quotes = np.flatnonzero(arr == ord('"'))
+            ends = newlines[np.searchsorted(quotes, newlines) % 2 == 0]
+            if not block and (not len(ends) or ends[-1] < len(buf) - 1):
+                ends = np.append(ends, len(buf))   # last record without a trailing newline
+            start = 0
+            for end in ends.tolist():
+                record = buf[start:end].rstrip(b"\r")
+                start = end + 1
+                if header:
+                    header = False
+                elif record:
+                    out.append(record)
+                    if len(out) == chunksize:
+                        yield out
+                        out = []
+            if not block:
+                break
+            tail = buf[start:]
+    if out:
+        yield out
+
+
+def record_fingerprints(records):
+    """uint64 hash per raw CSV record (csv_records); identical text hashes equal."""
+    return pd.util.hash_array(np.array(records, dtype=object))
+
+
+def csv_keep_mask(path, dedup, chunksize=200_000, rename=None):
+    """Keep mask over every row of a CSV, streamed in chunks.
+    A keyed dedup parses only the key columns, as text; `rename` maps the header to the
+    names the key uses. A whole-row dedup hashes the raw records and parses nothing."""
+    if not dedup.key:
+        masks = [dedup.keep_fingerprints(record_fingerprints(records), source=path)
+                 for records in csv_records(path, chunksize)]
+        return np.concatenate(masks) if masks else np.zeros(0, dtype=bool)
+    header = pd.read_csv(path, nrows=0).columns
+    names = rename(header) if rename else header
+    usecols = [i for i, c in enumerate(names) if c in set(dedup.key)]
+    masks = []
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize, dtype=str):
+        chunk.columns = names[usecols]
+        masks.append(dedup.keep_mask(chunk, source=path))
+    return np.concatenate(masks) if masks else np.zeros(0, dtype=bool)
+
+
+# -----------------------------
+# Benchmark: a wide survey-like CSV (mostly-categorical text answers, ~1% repeated rows)
+# -----------------------------
+def _wide_csv(path, n_rows, n_cols, seed=0):
+    rng = np.random.default_rng(seed)
+    answers = np.array([f"Answer {i}" for i in range(12)] + [None], dtype=object)
+    df = pd.DataFrame({f"Q{j}": answers[rng.integers(0, len(answers), n_rows)] for j in range(n_cols)})
+    df.insert(0, "Respondent", np.arange(n_rows).astype(str))
+    repeat = rng.random(n_rows) < 0.01
+    df.loc[repeat, :] = df.shift(1).loc[repeat, :]
+    df.iloc[1:].to_csv(path, index=False)
+
+
+def _bench(n_rows=100_000, n_cols=250):
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wide_survey.csv")
+        _wide_csv(path, n_rows, n_cols)
+        key = ["Q1", "Q2", "Q3"]
+        print(f"{n_rows:,} rows x {n_cols + 1} text columns ({os.path.getsize(path) / 1e6:.0f} MB)")
+
+        cases = {}
+        t0 = time.perf_counter()
+        df = pd.read_csv(path, dtype=str)
+        t_read = time.perf_counter() - t0
+        for name, subset in [("whole row", None), ("key Q1-Q3", key)]:
+            t0 = time.perf_counter()
+            expected = ~df.duplicated(subset=subset).to_numpy()
+            t_pandas = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            mask = Deduplicator(subset).keep_mask(df)
+            t_fp = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            streamed = csv_keep_mask(path, Deduplicator(subset), chunksize=20_000)
+            t_stream = time.perf_counter() - t0
+            assert (mask == expected).all() and (streamed == expected).all()
+            cases[name] = (t_pandas, t_fp, t_stream, int((~expected).sum()))
+
+        full_mb = df.memory_usage(deep=True).sum() / 1e6
+        print(f"  full read_csv: {t_read:.2f}s, {full_mb:,.0f} MB in memory "
+              f"(a streamed 20,000-row chunk: {full_mb * 20_000 / len(df):,.0f} MB)")
+        print(f"  {'':<10} {'drop_duplicates':>16} {'fingerprint':>12} {'streamed CSV':>13}  duplicates")
+        for name, (t_pandas, t_fp, t_stream, dups) in cases.items():
+            print(f"  {name:<10} {t_read + t_pandas:15.2f}s {t_read + t_fp:11.2f}s {t_stream:12.2f}s  {dups:,}")
+        print("  (the first two include the full read; the streamed column reads the file itself, in chunks)")
+
+        # Across runs: a second file that repeats half of the first one's rows, read with
+        # other dtypes (numeric ids inferred as float, categorical answers)
+        store_path = os.path.join(tmp, "seen.npz")
+        first = Deduplicator.load(store_path)
+        first.keep_mask(df, source="wave 1")
+        first.save()
+        second = Deduplicator.load(store_path)
+        wave2 = pd.concat([df.iloc[: n_rows // 2], df.iloc[:100].assign(Respondent="new")], ignore_index=True)
+        wave2 = wave2.astype({"Q1": "category"}).assign(
+            Respondent=pd.to_numeric(wave2["Respondent"], errors="coerce").astype("float64"))
+        kept = second.keep_mask(wave2, source="wave 2")
+        assert kept.sum() == 100 - wave2.iloc[n_rows // 2:].duplicated().sum()
+        print(pd.concat([first.report(), second.report()]).to_string())
+
+
+if __name__ == "__main__":
+    import sys
+    _bench(*(int(a) for a in sys.argv[1:3]))
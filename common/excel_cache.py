@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import hashlib
+import pandas as pd
+
+# =========================
+# Cached Excel ingest
+# openpyxl parsing is slow, so each (workbook, sheet) is converted once to a
+# columnar file (Feather when pyarrow is installed, pickle otherwise) and
+# later runs load that instead. The cache is keyed on the source's
+# mtime/size and, if those changed, its content hash, so re-saving an
+# unchanged workbook doesn't force a rebuild.
+# A warm load still converts the Feather table to pandas objects (a full copy,
+# strings become Python objects); what it saves is openpyxl's parse, not memory.
+#
+#   df = read_excel_cached("Online Retail.xlsx", parse_dates=["InvoiceDate"],
+#                          dtype={"CustomerID": "Int64"})
+# =========================
+try:
+    import pyarrow  # noqa: F401
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+CACHE_VERSION = 1
+
+
+def file_sha1(path, block=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_paths(path, sheet_name, cache_dir):
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = f"{os.path.splitext(os.path.basename(path))[0]}-{sheet_name}"
+    return os.path.join(cache_dir, stem), os.path.join(cache_dir, stem + ".json")
+
+
+def _write_frame(df, base):
+    if HAS_ARROW:
+        try:
+            df.reset_index(drop=True).to_feather(base + ".feather")
+            return base + ".feather"
+        except Exception:
+            pass  # e.g. mixed-type object columns; fall back to pickle
+    df.to_pickle(base + ".pkl")
+    return base + ".pkl"
+
+
+def _read_frame(data_path):
+    if data_path.endswith(".feather"):
+        from pyarrow import feather
+        # memory_map only avoids buffering the file; to_pandas still copies every column
+        return feather.read_feather(data_path, memory_map=True)
+    return pd.read_pickle(data_path)
+
+
+def read_excel_cached(path, sheet_name=0, parse_dates=None, dtype=None, cache_dir=None, **kwargs):
+    """pd.read_excel with a columnar on-disk cache.
+
+    dtype is applied after parsing (so pandas extension types such as
+    "Int64" or "category" work); other kwargs go to read_excel and are part
+    of the cache key.
+    """
+    base, meta_path = _cache_paths(path, sheet_name, cache_dir)
+    st = os.stat(path)
+    params = json.dumps({"v": CACHE_VERSION, "parse_dates": parse_dates, "dtype": dtype,
+                         "kwargs": kwargs}, sort_keys=True, default=str)
+
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("params") != params or not os.path.exists(meta.get("data", "")):
+            meta = None
+
+    if meta is not None:
+        if (meta["mtime"], meta["size"]) == (st.st_mtime, st.st_size):
+            return _read_frame(meta["data"])
+        sha1 = file_sha1(path)
+        if meta["sha1"] == sha1:
+            # touched but unchanged: refresh the quick key and reuse the data
+            meta.update(mtime=st.st_mtime, size=st.st_size)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            return _read_frame(meta["data"])
+    else:
+        sha1 = file_sha1(path)
+
+    df = pd.read_excel(path, sheet_name=sheet_name, parse_dates=parse_dates or False, **kwargs)
+    for col, dt in (dtype or {}).items():
+        if col in df.columns:
+            df[col] = df[col].astype(dt)
+
+    data_path = _write_frame(df, base)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"source": os.path.abspath(path), "mtime": st.st_mtime, "size": st.st_size,
+                   "sha1": sha1, "params": params, "data": data_path}, f)
+    return _read_frame(data_path)
+
+
+# =========================
+# Cold vs warm benchmark: python -m common.excel_cache [workbook] [sheet]
+# =========================
+def _bench(path, sheet_name=0):
+    import tempfile
+    with tempfile.TemporaryDirectory() as cache_dir:
+        t0 = time.perf_counter()
+        cold = read_excel_cached(path, sheet_name, cache_dir=cache_dir)
+        t_cold = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        warm = read_excel_cached(path, sheet_name, cache_dir=cache_dir)
+        t_warm = time.perf_counter() - t0
+        fmt = next(f for f in os.listdir(cache_dir) if not f.endswith(".json")).rsplit(".", 1)[1]
+
+    pd.testing.assert_frame_equal(cold, warm)
+    print(f"{os.path.basename(path)} [{sheet_name}] {cold.shape}: cold={t_cold:.3f}s  "
+          f"warm={t_warm:.4f}s ({fmt})  speedup={t_cold / t_warm:.0f}x")
+
+
+if __name__ == "__main__":
+    import sys
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    _bench(sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "Task 1", "TASK 1.xlsx"),
+           sys.argv[2] if len(sys.argv) > 2 else 0)
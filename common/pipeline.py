@@ -0,0 +1,217 @@
+import io
+import os
+import json
+import time
+import pstats
+import argparse
+import cProfile
+import tracemalloc
+from common.charts import ChartRenderer
+
+# =========================
+# Stage runner shared by the analysis scripts
+# A pipeline is an ordered list of named stages (load -> clean -> features ->
+# aggregate -> render). A stage is fn(data, ctx) -> data: `data` is what the
+# previous stage returned and `ctx` holds the command-line parameters (paths,
+# options) plus anything a stage hands on to a later one.
+# For every stage the runner records wall and CPU time and rows in/out, then
+# prints a profile report. It can also cProfile any one stage, and with
+# --trace-memory record each stage's tracemalloc peak (off by default: tracing
+# every allocation slows allocation-heavy stages several-fold and skews their
+# wall times).
+# Stages listed in `cached` are memoized in a content-addressed StageCache
+# (common/stage_cache.py). The run resumes after the latest stage whose output
+# is already cached, so a chart-only edit only reruns the stages after it.
+# Whatever a skipped stage put on ctx is restored from the cache entry, but
+# anything it printed or wrote to disk is not.
+# Stages draw charts by submitting specs to ctx.charts (common/charts.py);
+# they render in worker processes while later stages run, and the runner
+# waits for them at the end (the "charts" row of the report). Plotting
+# libraries load only when a chart is actually drawn; --no-charts runs the
+# data stages without them.
+#
+#   python task9_olist_analysis.py --data-dir data/ --out-dir out/ --profile aggregate --report run.json
+# =========================
+
+# Runner options; everything else on ctx is a pipeline parameter and part of the cache key
+RUNNER_ARGS = {"out_dir", "show", "profile", "profile_dir", "report", "tracemalloc",
+               "cache", "cache_dir", "cache_size_mb", "render_workers", "render", "charts"}
+
+
+class Pipeline:
+    def __init__(self, name, stages, args=(), cached=(), inputs=None):
+        self.name = name
+        self.stages = list(stages)   # [(stage name, fn(data, ctx))]
+        self.args = list(args)       # [((flags, ...), argparse kwargs)] specific to this pipeline
+        self.cached = set(cached)    # stages whose output may be served from the stage cache
+        self.inputs = inputs         # fn(ctx) -> input file paths (default: [ctx.input])
+
+    def input_paths(self, ctx):
+        paths = self.inputs(ctx) if self.inputs else [getattr(ctx, "input", None)]
+        return [p for p in paths if p]
+
+    @property
+    def stage_names(self):
+        return [name for name, _ in self.stages]
+
+    def parser(self):
+        p = argparse.ArgumentParser(prog=self.name)
+        for flags, kwargs in self.args:
+            p.add_argument(*flags, **kwargs)
+        p.add_argument("--out-dir", default=".", help="folder for tables and charts (default: current)")
+        p.add_argument("--show", action="store_true", help="also open each chart window (blocks)")
+        p.add_argument("--render-workers", type=int, default=None,
+                       help="chart rendering processes (default: CPU count; 1 renders inline)")
+        p.add_argument("--no-charts", dest="render", action="store_false",
+                       help="data outputs only: skip every chart (matplotlib is never imported)")
+        p.add_argument("--profile", metavar="STAGE", choices=self.stage_names,
+                       help="cProfile one stage; stats go to <profile-dir>/<pipeline>-<stage>.prof")
+        p.add_argument("--profile-dir", default=".")
+        p.add_argument("--report", metavar="FILE", help="also write the stage report as JSON")
+        p.add_argument("--trace-memory", dest="tracemalloc", action="store_true",
+                       help="record each stage's peak Python allocations with tracemalloc "
+                            "(slows allocation-heavy stages)")
+        if self.cached:
+            p.add_argument("--no-cache", dest="cache", action="store_false",
+                           help=f"recompute every stage (cached: {', '.join(sorted(self.cached))})")
+            p.add_argument("--cache-dir", default=None, help="stage cache folder (default: <repo>/.cache/stages)")
+            p.add_argument("--cache-size-mb", type=int, default=2048,
+                           help="evict least recently used entries above this size")
+        return p
+
+    def parse_args(self, argv=None):
+        return self.parser().parse_args(argv)
+
+
+def count_rows(obj):
+    """Rows of a frame/series/array; for a dict or list, rows of its first table."""
+    if hasattr(obj, "shape") and len(getattr(obj, "shape")):
+        return int(obj.shape[0])
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, (list, tuple)):
+        for item in obj:
+            n = count_rows(item)
+            if n is not None:
+                return n
+    return None
+
+
+def _ctx_updates(ctx, initial):
+    return {k: v for k, v in vars(ctx).items() if k not in initial or initial[k] != v}
+
+
+def _resume(pipeline, ctx, cache, keys):
+    # Latest stage with a cached output: restore it (and its ctx) and skip everything before it
+    for i in reversed(range(len(pipeline.stages))):
+        name = pipeline.stages[i][0]
+        if name in pipeline.cached and cache.has(keys[i]):
+            t0, c0 = time.perf_counter(), time.process_time()
+            data, updates = cache.get(keys[i])
+            for k, v in updates.items():
+                setattr(ctx, k, v)
+            stats = [{"stage": n, "wall_s": 0.0, "cpu_s": 0.0, "rows_in": None, "rows_out": None,
+                      "peak_mb": None, "cache": "skipped"} for n, _ in pipeline.stages[:i]]
+            stats.append({"stage": name, "wall_s": time.perf_counter() - t0, "cpu_s": time.process_time() - c0,
+                          "rows_in": None, "rows_out": count_rows(data), "peak_mb": None, "cache": "hit"})
+            return i + 1, data, stats
+    return 0, None, []
+
+
+def run(pipeline, ctx, profile=None, profile_dir=".", trace_memory=False, cache=None):
+    """Run every stage in order (resuming from the stage cache if given); returns (data, stats)."""
+    if getattr(ctx, "charts", None) is None:
+        ctx.charts = ChartRenderer(getattr(ctx, "out_dir", "."), getattr(ctx, "render_workers", None),
+                                   getattr(ctx, "show", False), getattr(ctx, "render", True))
+    initial = dict(vars(ctx))
+    keys, start, data, stats = None, 0, None, []
+    if cache is not None and pipeline.cached:
+        params = {k: v for k, v in initial.items() if k not in RUNNER_ARGS}
+        keys = cache.stage_keys(pipeline.stages, pipeline.input_paths(ctx), params)
+        start, data, stats = _resume(pipeline, ctx, cache, keys)
+    rows_in = stats[-1]["rows_out"] if stats else None
+
+    for i, (name, fn) in enumerate(pipeline.stages[start:], start):
+        if trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        t0, c0 = time.perf_counter(), time.process_time()
+        if name == profile:
+            prof = cProfile.Profile()
+            data = prof.runcall(fn, data, ctx)
+            os.makedirs(profile_dir, exist_ok=True)
+            prof_path = os.path.join(profile_dir, f"{pipeline.name}-{name}.prof")
+            prof.dump_stats(prof_path)
+        else:
+            data = fn(data, ctx)
+        rec = {
+            "stage": name,
+            "wall_s": time.perf_counter() - t0,
+            "cpu_s": time.process_time() - c0,
+            "rows_in": rows_in,
+            "rows_out": count_rows(data),
+            "peak_mb": tracemalloc.get_traced_memory()[1] / 1e6 if trace_memory else None,
+        }
+        if name == profile:
+            rec["profile"] = prof_path
+        if keys is not None and name in pipeline.cached:
+            t1 = time.perf_counter()
+            stored = cache.put(keys[i], data, _ctx_updates(ctx, initial))
+            rec["cache"] = "stored" if stored else "uncacheable"
+            rec["cache_write_s"] = time.perf_counter() - t1
+        stats.append(rec)
+        rows_in = rec["rows_out"]
+    if trace_memory:
+        tracemalloc.stop()
+
+    # Charts still rendering in the pool: the wait is whatever didn't overlap with the stages
+    t0, c0 = time.perf_counter(), time.process_time()
+    rendered, unchanged = ctx.charts.wait()
+    if rendered or unchanged or ctx.charts.skipped:
+        note = f"{len(unchanged)} unchanged" if unchanged else ""
+        note = f"{len(ctx.charts.skipped)} skipped (--no-charts)" if ctx.charts.skipped else note
+        stats.append({"stage": "charts", "wall_s": time.perf_counter() - t0, "cpu_s": time.process_time() - c0,
+                      "rows_in": None, "rows_out": len(rendered), "peak_mb": None, "cache": note})
+    return data, stats
+
+
+def format_report(pipeline, stats):
+    fmt = lambda v, spec: "-" if v is None else format(v, spec)
+    lines = [f"Stage report: {pipeline.name}",
+             f"  {'stage':<10} {'wall s':>8} {'cpu s':>8} {'rows in':>11} {'rows out':>11} {'peak MB':>8}  cache"]
+    for r in stats:
+        note = r.get("cache", "")
+        if note == "stored":
+            note += f" ({r['cache_write_s']:.2f}s)"
+        lines.append(f"  {r['stage']:<10} {r['wall_s']:>8.2f} {r['cpu_s']:>8.2f} {fmt(r['rows_in'], ',d'):>11} "
+                     f"{fmt(r['rows_out'], ',d'):>11} {fmt(r['peak_mb'], '.1f'):>8}  {note}".rstrip())
+    lines.append(f"  {'total':<10} {sum(r['wall_s'] for r in stats):>8.2f} {sum(r['cpu_s'] for r in stats):>8.2f}")
+    for r in stats:
+        if "profile" in r:
+            out = io.StringIO()
+            pstats.Stats(r["profile"], stream=out).sort_stats("cumulative").print_stats(15)
+            lines += [f"cProfile of '{r['stage']}' ({r['profile']}):", out.getvalue().rstrip()]
+    return "\n".join(lines)
+
+
+def main(pipeline, argv=None, args=None):
+    """CLI entry point: parse args, run the pipeline, print (and optionally save) the report."""
+    args = args if args is not None else pipeline.parse_args(argv)
+    if not args.show:
+        # batch runs never need a window; set for the render workers without importing matplotlib here
+        os.environ.setdefault("MPLBACKEND", "Agg")
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    cache = None
+    if getattr(args, "cache", False):
+        from common.stage_cache import StageCache
+        cache = StageCache(args.cache_dir, args.cache_size_mb << 20)
+    data, stats = run(pipeline, args, args.profile, args.profile_dir, args.tracemalloc, cache)
+    print(format_report(pipeline, stats))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"pipeline": pipeline.name,
+                       "params": {k: str(v) for k, v in vars(args).items() if k != "charts"},
+                       "stages": stats}, f, indent=2)
+    return data, stats
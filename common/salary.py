@@ -0,0 +1,210 @@
+import re
+import time
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# =========================
+# Salary normalization (survey compensation buckets and job-posting snippets)
+# parse_salary turns one string into a Salary: min, max, midpoint, pay
+# period, currency, and the midpoint annualized in USD. It handles currency
+# symbols/codes, "k"/"m" suffixes (also shared across a range, "50-60k"), the
+# 2018 Kaggle shorthand "10-20,000", hourly/daily/weekly/monthly pay and
+# open-ended buckets ("> $500,000", "500,000+", "Up to $80,000"), whose midpoint
+# is their one known bound. Figures without a currency are taken as USD,
+# the currency of every Kaggle bucket. With no period they are taken as yearly.
+# The patterns are compiled once and parse_salary is LRU-memoized.
+# normalize_salaries does a whole column: it factorizes it, parses each
+# distinct string once and broadcasts the results back by code, so a
+# million answers cost one factorize plus a few dozen parses. Later batches
+# (survey chunks, scraped pages) mostly hit the memo.
+#
+#   parse_salary("$32.39 an hour").annual_usd              -> 67371.2
+#   normalize_salaries(df["Q24"])[["mid", "annual_usd"]]    # one row per answer
+# =========================
+MEMO_SIZE = 1 << 16
+
+# hours / days / weeks / months in a working year
+PER_YEAR = {"hour": 2080, "day": 260, "week": 52, "month": 12, "year": 1}
+# USD per unit of currency: fixed approximate rates (2022 averages), not live quotes
+USD_RATES = {"USD": 1.0, "EUR": 1.05, "GBP": 1.24, "INR": 0.0127, "CAD": 0.77, "AUD": 0.69,
+             "JPY": 0.0076, "CNY": 0.149, "BRL": 0.19}
+SYMBOLS = {"us$": "USD", "$": "USD", "r$": "BRL", "c$": "CAD", "ca$": "CAD", "a$": "AUD", "au$": "AUD",
+           "€": "EUR", "£": "GBP", "₹": "INR", "¥": "JPY"}
+
+# "1,000", "74.2K", "6,00,000" (lakh grouping); group 2 is the multiplier suffix
+NUMBER = re.compile(r"(\d+(?:,\d{2,3})*(?:\.\d+)?)\s?([km](?![a-z]))?", re.I)
+RANGE_SEP = re.compile(r"\s*(?:-|–|—|to|and)\s*(?:us\$|[a-z]{1,2}\$|[$€£₹¥]|[a-z]{3}\b)?\s*", re.I)
+LOWER_BOUND = re.compile(r"[>≥]|\b(?:over|above|more than|from|at least|starting at|min(?:imum)?)\b", re.I)
+UPPER_BOUND = re.compile(r"[<≤]|\b(?:up to|under|less than|below|max(?:imum)?)\b", re.I)
+CURRENCY = re.compile(r"(us\$|[rc]\$|ca\$|au?\$|\$|€|£|₹|¥)|\b(usd|eur|gbp|inr|cad|aud|jpy|cny|brl)\b", re.I)
+PERIOD = re.compile(r"(?P<hour>hour|\bhr\b|/\s*h\b)|(?P<day>\bday\b|daily)|(?P<week>week|\bwk\b)"
+                    r"|(?P<month>month|\bmo\b|\bmth\b)|(?P<year>year|annual|annum|\byr\b|\bp\.?a\b)", re.I)
+MULTIPLIER = {"k": 1e3, "m": 1e6}
+
+Salary = namedtuple("Salary", "min max mid period currency annual_usd")
+MISSING = Salary(np.nan, np.nan, np.nan, None, None, np.nan)
+
+
+def _number(m):
+    return float(m.group(1).replace(",", "")) * MULTIPLIER.get((m.group(2) or "").lower(), 1.0)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def parse_salary(text):
+    """Salary of one answer/snippet; MISSING when it holds no figure."""
+    nums = list(NUMBER.finditer(text))
+    if not nums:
+        return MISSING
+    first = nums[0]
+    lo = hi = _number(first)
+    if len(nums) > 1 and RANGE_SEP.fullmatch(text, first.end(), nums[1].start()):
+        hi = _number(nums[1])
+        if nums[1].group(2) and not first.group(2):
+            # "50-60k": the suffix applies to both ends when that keeps the range ordered
+            mult = MULTIPLIER[nums[1].group(2).lower()]
+            lo = lo * mult if lo * mult <= hi else lo
+        elif not first.group(2) and not nums[1].group(2) and lo < 1000 <= hi and "," in nums[1].group(1) \
+                and lo * 1000 <= hi:
+            lo *= 1000   # Kaggle 2018 buckets: "10-20,000" is 10,000-20,000
+    elif LOWER_BOUND.search(text, 0, first.start()) or text[first.end():first.end() + 2].strip().startswith("+"):
+        hi = np.nan
+    elif UPPER_BOUND.search(text, 0, first.start()):
+        lo = np.nan
+    mid = hi if lo != lo else lo if hi != hi else (lo + hi) / 2
+
+    m = CURRENCY.search(text)
+    currency = "USD" if m is None else SYMBOLS[m.group(1).lower()] if m.group(1) else m.group(2).upper()
+    m = PERIOD.search(text)
+    period = "year" if m is None else m.lastgroup
+    annual_usd = mid * PER_YEAR[period] * USD_RATES.get(currency, np.nan)
+    return Salary(float(lo), float(hi), float(mid), period, currency, float(annual_usd))
+
+
+def normalize_salaries(values):
+    """DataFrame of Salary fields (period/currency categorical) for a Series or array of strings."""
+    s = values if isinstance(values, pd.Series) else pd.Series(np.asarray(values, dtype=object))
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    parsed = [parse_salary(v if isinstance(v, str) else str(v)) for v in uniques]
+    # code -1 (missing) picks the trailing MISSING row
+    parsed.append(MISSING)
+    out = {}
+    for i, field in enumerate(Salary._fields):
+        col = [p[i] for p in parsed]
+        if field in ("period", "currency"):
+            cats = sorted({c for c in col if c is not None})
+            lookup = {c: j for j, c in enumerate(cats)}
+            cat_codes = np.array([lookup.get(c, -1) for c in col], dtype=np.int32)
+            out[field] = pd.Categorical.from_codes(cat_codes[codes], cats)
+        else:
+            out[field] = np.array(col, dtype="float64")[codes]
+    return pd.DataFrame(out, index=s.index)
+
+
+# =========================
+# Regression suite + benchmark
+# python common/salary.py [rows]
+# =========================
+# The compensation answer choices of the Kaggle DS surveys -> (min, max); yearly USD.
+# (2017 asked for a free-form amount plus a currency instead of buckets.)
+_BUCKETS_2019 = [
+    ("$0-999", 0, 999), ("1,000-1,999", 1_000, 1_999), ("2,000-2,999", 2_000, 2_999),
+    ("3,000-3,999", 3_000, 3_999), ("4,000-4,999", 4_000, 4_999), ("5,000-7,499", 5_000, 7_499),
+    ("7,500-9,999", 7_500, 9_999), ("10,000-14,999", 10_000, 14_999), ("15,000-19,999", 15_000, 19_999),
+    ("20,000-24,999", 20_000, 24_999), ("25,000-29,999", 25_000, 29_999), ("30,000-39,999", 30_000, 39_999),
+    ("40,000-49,999", 40_000, 49_999), ("50,000-59,999", 50_000, 59_999), ("60,000-69,999", 60_000, 69_999),
+    ("70,000-79,999", 70_000, 79_999), ("80,000-89,999", 80_000, 89_999), ("90,000-99,999", 90_000, 99_999),
+    ("100,000-124,999", 100_000, 124_999), ("125,000-149,999", 125_000, 149_999),
+    ("150,000-199,999", 150_000, 199_999), ("200,000-249,999", 200_000, 249_999),
+    ("250,000-299,999", 250_000, 299_999),
+]
+KAGGLE_BUCKETS = {
+    2018: [("0-10,000", 0, 10_000), ("10-20,000", 10_000, 20_000), ("20-30,000", 20_000, 30_000),
+           ("30-40,000", 30_000, 40_000), ("40-50,000", 40_000, 50_000), ("50-60,000", 50_000, 60_000),
+           ("60-70,000", 60_000, 70_000), ("70-80,000", 70_000, 80_000), ("80-90,000", 80_000, 90_000),
+           ("90-100,000", 90_000, 100_000), ("100-125,000", 100_000, 125_000), ("125-150,000", 125_000, 150_000),
+           ("150-200,000", 150_000, 200_000), ("200-250,000", 200_000, 250_000),
+           ("250-300,000", 250_000, 300_000), ("300-400,000", 300_000, 400_000),
+           ("400-500,000", 400_000, 500_000), ("500,000+", 500_000, np.nan)],
+    2019: _BUCKETS_2019 + [("300,000-500,000", 300_000, 500_000), ("> $500,000", 500_000, np.nan)],
+    2020: _BUCKETS_2019 + [("300,000-500,000", 300_000, 500_000), ("> $500,000", 500_000, np.nan)],
+    2021: _BUCKETS_2019 + [("300,000-499,999", 300_000, 499_999), ("$500,000-999,999", 500_000, 999_999),
+                           (">$1,000,000", 1_000_000, np.nan)],
+}
+NO_FIGURE = ["I do not wish to disclose my approximate yearly compensation", "nan", "", "Prefer not to say"]
+
+# Posting snippets (Indeed and similar) -> (min, max, period, currency, annual_usd)
+POSTINGS = [
+    ("$74.2K - $94K a year", 74_200, 94_000, "year", "USD", 84_100),
+    ("$55,000 - $65,000 a year", 55_000, 65_000, "year", "USD", 60_000),
+    ("$32.39 an hour", 32.39, 32.39, "hour", "USD", 32.39 * 2080),
+    ("$20 - $25 an hour", 20, 25, "hour", "USD", 22.5 * 2080),
+    ("Up to $80,000 a year", np.nan, 80_000, "year", "USD", 80_000),
+    ("From $4,000 a month", 4_000, np.nan, "month", "USD", 48_000),
+    ("$800 - $1,000 a week", 800, 1_000, "week", "USD", 900 * 52),
+    ("$250 a day", 250, 250, "day", "USD", 250 * 260),
+    ("50-60k", 50_000, 60_000, "year", "USD", 55_000),
+    ("£30,000 - £35,000 a year", 30_000, 35_000, "year", "GBP", 32_500 * 1.24),
+    ("€45k–55k per annum", 45_000, 55_000, "year", "EUR", 50_000 * 1.05),
+    ("₹6,00,000 a year", 600_000, 600_000, "year", "INR", 600_000 * 0.0127),
+    ("CAD 90,000 to 110,000 annually", 90_000, 110_000, "year", "CAD", 100_000 * 0.77),
+    ("R$ 8,000 /mo", 8_000, 8_000, "month", "BRL", 8_000 * 12 * 0.19),
+]
+
+
+def _check():
+    for year, buckets in KAGGLE_BUCKETS.items():
+        for text, lo, hi in buckets:
+            got = parse_salary(text)
+            mid = lo if hi != hi else (lo + hi) / 2
+            np.testing.assert_allclose([got.min, got.max, got.mid, got.annual_usd], [lo, hi, mid, mid],
+                                       err_msg=f"{year} {text!r}")
+            assert (got.period, got.currency) == ("year", "USD"), (text, got)
+    for text in NO_FIGURE:
+        assert parse_salary(text) == MISSING or np.isnan(parse_salary(text).mid), text
+    for text, lo, hi, period, currency, annual in POSTINGS:
+        got = parse_salary(text)
+        np.testing.assert_allclose([got.min, got.max, got.annual_usd], [lo, hi, annual], err_msg=text)
+        assert (got.period, got.currency) == (period, currency), (text, got)
+
+    # the batched path matches the per-string parse, with missing values and categorical input
+    texts = [t for b in KAGGLE_BUCKETS.values() for t, _, _ in b] + NO_FIGURE + [p[0] for p in POSTINGS]
+    s = pd.Series(texts + [None, np.nan] + texts[::-1], dtype=object)
+    for values in (s, s.astype("category"), s.to_numpy()):
+        got = normalize_salaries(values)
+        exp = pd.DataFrame([parse_salary(v) if isinstance(v, str) else MISSING for v in s], columns=Salary._fields)
+        same = lambda col: ["-" if pd.isna(v) else str(v) for v in col]
+        for field in Salary._fields:
+            assert same(got[field]) == same(exp[field]), field
+    n = sum(len(b) for b in KAGGLE_BUCKETS.values())
+    print(f"salary checks passed: {n} Kaggle buckets, {len(POSTINGS)} posting snippets, batched == per-string")
+
+
+def _bench(n_rows=2_000_000, seed=0):
+    texts = [t for b in KAGGLE_BUCKETS.values() for t, _, _ in b] + NO_FIGURE + [p[0] for p in POSTINGS]
+    rng = np.random.default_rng(seed)
+    s = pd.Series(np.array(texts + [None], dtype=object)[rng.integers(0, len(texts) + 1, n_rows)])
+
+    sample = s.iloc[:n_rows // 20]
+    t0 = time.perf_counter()
+    for v in sample:
+        if isinstance(v, str):
+            parse_salary.__wrapped__(v)
+    t_row = (time.perf_counter() - t0) * n_rows / len(sample)
+
+    parse_salary.cache_clear()
+    t0 = time.perf_counter()
+    normalize_salaries(s)
+    t_cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    normalize_salaries(s)
+    t_warm = time.perf_counter() - t0
+    print(f"rows={n_rows:,} ({len(texts)} distinct)  per-row parse={t_row:.2f}s (extrapolated)  "
+          f"batched: cold memo={t_cold:.3f}s  warm memo={t_warm:.3f}s  ({n_rows / t_warm / 1e6:.1f}M rows/s)")
+
+
+if __name__ == "__main__":
+    import sys
+    _check()
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import inspect
+import pandas as pd
+from common.excel_cache import HAS_ARROW, file_sha1
+
+# =========================
+# Content-addressed cache for pipeline stage outputs
+# A stage's key hashes four things:
+#   - the previous stage's key (which chains back to the content of the input files)
+#   - the stage's code: its own source, same-module helpers it calls, and the
+#     source files of repo modules it uses plus every repo module those import,
+#     transitively (a change in common/salary.py reaches a stage that only
+#     calls comp_parser)
+#   - the pipeline parameters
+#   - the pandas version
+# So a key only matches when the output would be the same. Entries are one
+# Parquet file per frame (pickle without pyarrow) plus meta.json in
+# <cache dir>/<key>/. When the cache grows past its size cap, the least
+# recently used entries are evicted.
+# =========================
+CACHE_VERSION = 1
+REPO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DEFAULT_DIR = os.path.join(REPO, ".cache", "stages")
+
+
+def _sha1(*parts):
+    h = hashlib.sha1()
+    for p in parts:
+        h.update(p if isinstance(p, bytes) else str(p).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def _repo_file(obj):
+    path = getattr(inspect.getmodule(obj), "__file__", None)
+    if path and os.path.normpath(os.path.abspath(path)).startswith(REPO + os.sep):
+        return path
+    return None
+
+
+def _names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):   # lambdas / nested functions
+            names |= _names(const)
+    return names
+
+
+def _repo_modules(module, paths):
+    """Add the file of `module` and of every repo module it imports (directly or by name) to paths."""
+    path = _repo_file(module)
+    if path is None or path in paths:
+        return
+    paths.add(path)
+    for value in list(vars(module).values()):
+        if inspect.ismodule(value) or inspect.isfunction(value) or inspect.isclass(value):
+            dep = inspect.getmodule(value)
+            if dep is not None:
+                _repo_modules(dep, paths)
+
+
+def code_fingerprint(fn, _seen=None):
+    """Hash of fn's source plus what it uses: same-module helpers and constants, other repo
+    modules' files and the repo modules they import."""
+    seen = _seen if _seen is not None else set()
+    seen.add(fn)
+    parts = [inspect.getsource(fn)]
+    for name in sorted(_names(fn.__code__)):
+        obj = fn.__globals__.get(name)
+        if isinstance(obj, (str, int, float, tuple, list, dict)):
+            parts.append(f"{name}={obj!r}")   # module-level constants (column lists, mappings)
+            continue
+        if not (inspect.isfunction(obj) or inspect.isclass(obj) or inspect.ismodule(obj)) or obj in seen:
+            continue
+        path = _repo_file(obj)
+        if path is None:
+            continue
+        if inspect.isfunction(obj) and obj.__module__ == fn.__module__:
+            parts.append(code_fingerprint(obj, seen))
+        else:
+            seen.add(obj)
+            paths = set()
+            _repo_modules(inspect.getmodule(obj), paths)
+            for path in sorted(paths - seen):
+                seen.add(path)
+                with open(path, "rb") as f:
+                    parts.append(_sha1(path, f.read()))
+    return _sha1(*parts)
+
+
+class StageCache:
+    def __init__(self, cache_dir=None, max_bytes=2 << 30):
+        self.dir = cache_dir or DEFAULT_DIR
+        self.max_bytes = max_bytes
+        os.makedirs(self.dir, exist_ok=True)
+        self._hash_index_path = os.path.join(self.dir, "file_hashes.json")
+        self._hash_index = None
+
+    # -----------------------------
+    # Keys
+    # -----------------------------
+    def file_hash(self, path):
+        # content hash, memoized on (mtime, size) so unchanged inputs are not re-read
+        if self._hash_index is None:
+            self._hash_index = {}
+            if os.path.exists(self._hash_index_path):
+                with open(self._hash_index_path, encoding="utf-8") as f:
+                    self._hash_index = json.load(f)
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            return "missing"
+        st = os.stat(path)
+        hit = self._hash_index.get(path)
+        if hit and (hit["mtime"], hit["size"]) == (st.st_mtime, st.st_size):
+            return hit["sha1"]
+        sha1 = file_sha1(path)
+        self._hash_index[path] = {"mtime": st.st_mtime, "size": st.st_size, "sha1": sha1}
+        with open(self._hash_index_path, "w", encoding="utf-8") as f:
+            json.dump(self._hash_index, f)
+        return sha1
+
+    def stage_keys(self, stages, input_paths, params):
+        """One key per stage, chained: key[i] depends on key[i-1], the stage code and params."""
+        key = _sha1(CACHE_VERSION, pd.__version__, sys.version_info[:2],
+                    *sorted(self.file_hash(p) for p in input_paths),
+                    json.dumps(params, sort_keys=True, default=str))
+        keys = []
+        for name, fn in stages:
+            key = _sha1(key, name, code_fingerprint(fn))
+            keys.append(key)
+        return keys
+
+    # -----------------------------
+    # Entries
+    # -----------------------------
+    def _entry(self, key):
+        return os.path.join(self.dir, key)
+
+    def has(self, key):
+        return os.path.exists(os.path.join(self._entry(key), "meta.json"))
+
+    def get(self, key):
+        """Returns (data, ctx updates) and marks the entry as recently used."""
+        entry = self._entry(key)
+        meta_path = os.path.join(entry, "meta.json")
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        os.utime(meta_path)   # LRU clock
+        items = {name: None if spec is None else _read_item(entry, spec) for name, spec in meta["items"].items()}
+        if meta["kind"] == "single":
+            data = items["data"]
+        elif meta["kind"] == "none":
+            data = None
+        else:
+            data = items
+        return data, meta["ctx"]
+
+    def put(self, key, data, ctx_updates):
+        """Store a stage output (None, a frame/series, or a dict of them or None); False if it can't be cached."""
+        if data is None:
+            kind, items = "none", {}
+        elif isinstance(data, (pd.DataFrame, pd.Series)):
+            kind, items = "single", {"data": data}
+        elif isinstance(data, dict) and all(v is None or isinstance(v, (pd.DataFrame, pd.Series))
+                                            for v in data.values()):
+            kind, items = "dict", data
+        else:
+            return False
+        try:
+            json.dumps(ctx_updates)
+        except TypeError:
+            return False
+
+        entry = self._entry(key)
+        tmp = entry + f".tmp{os.getpid()}"
+        os.makedirs(tmp, exist_ok=True)
+        specs = {name: None if value is None else _write_item(tmp, i, value)
+                 for i, (name, value) in enumerate(items.items())}
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"kind": kind, "items": specs, "ctx": ctx_updates, "created": time.time()}, f)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        self.evict()
+        return True
+
+    def entries(self):
+        """[(last used, bytes, path)] for every complete entry, oldest first."""
+        out = []
+        for name in os.listdir(self.dir):
+            path = os.path.join(self.dir, name)
+            meta = os.path.join(path, "meta.json")
+            if os.path.isdir(path) and os.path.exists(meta):
+                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                out.append((os.path.getmtime(meta), size, path))
+        return sorted(out)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+def _write_item(entry, i, value):
+    spec = {"series": isinstance(value, pd.Series)}
+    frame = value.to_frame(name="__series__") if spec["series"] else value
+    if spec["series"]:
+        spec["name"] = value.name if isinstance(value.name, (str, int, float, type(None))) else str(value.name)
+    if HAS_ARROW:
+        try:
+            frame.to_parquet(os.path.join(entry, f"{i}.parquet"))
+            spec["file"] = f"{i}.parquet"
+            return spec
+        except Exception:
+            pass   # e.g. non-string column names or mixed-type object columns
+    frame.to_pickle(os.path.join(entry, f"{i}.pkl"))
+    spec["file"] = f"{i}.pkl"
+    return spec
+
+
+def _read_item(entry, spec):
+    path = os.path.join(entry, spec["file"])
+    frame = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_pickle(path)
+    if spec["series"]:
+        s = frame["__series__"]
+        s.name = spec["name"]
+        return s
+    return frame